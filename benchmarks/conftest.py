@@ -0,0 +1,254 @@
+"""Offline fixtures for the benchmark suite.
+
+Forecast and search payloads are served from ``fixtures/`` by a local stub server so
+that every benchmark runs without network access. The payloads are synthetic: they
+follow the layout of MET's and Nominatim's documented responses, with made-up values.
+"""
+
+import copy
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+import pytest
+from rich.console import Console
+
+from yr_cli import alerts, api, archive, cache, interface, ratelimit, store
+from yr_cli.locationforecast import parsed
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_fixture(name: str):
+    with open(FIXTURES / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def rebase_forecast(forecast: dict, start: datetime) -> dict:
+    """
+    Move a fixture forecast onto a new timeline starting at ``start``, keeping MET's
+    layout of hourly steps followed by six-hourly steps at 00/06/12/18 UTC. The model
+    run is moved with it, so that it stays issued shortly before the first step.
+    """
+    rebased = copy.deepcopy(forecast)
+    timeseries = rebased["properties"]["timeseries"]
+    meta = rebased["properties"]["meta"]
+    time = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    issued_before = datetime.fromisoformat(
+        timeseries[0]["time"]
+    ) - datetime.fromisoformat(meta["updated_at"])
+    meta["updated_at"] = (time - issued_before).strftime("%Y-%m-%dT%H:%M:%SZ")
+    for index, timestep in enumerate(timeseries):
+        if index:
+            hourly = "next_1_hours" in timeseries[index - 1]["data"]
+            time += timedelta(hours=1)
+            while not hourly and time.hour % 6:
+                time += timedelta(hours=1)
+        timestep["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return rebased
+
+
+def forecast_times(forecast: dict) -> list[datetime]:
+    return [
+        datetime.strptime(timestep["time"], "%Y-%m-%dT%H:%M:%SZ").replace(
+            tzinfo=timezone.utc
+        )
+        for timestep in forecast["properties"]["timeseries"]
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    routes: dict = {}
+    delays: dict = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        route = self.routes.get(url.path)
+        if route is None:
+            self.send_error(404)
+            return
+        time.sleep(self.delays.get(url.path, 0))
+        status, headers, body = route(params)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _nominatim_route(params: dict):
+    results = load_fixture("nominatim.json").get(unquote_plus(params["q"]).lower(), [])
+    return 200, {"Content-Type": "application/json"}, json.dumps(results).encode()
+
+
+def _throttled_route(responses: list):
+    """Answer with 429 and a Retry-After header until ``responses`` runs out."""
+
+    def route(params: dict):
+        if responses:
+            return 429, {"Retry-After": str(responses.pop())}, b""
+        return 200, {"Content-Type": "application/json"}, b"{}"
+
+    return route
+
+
+def _forecast_route(payload: bytes):
+    def route(params: dict):
+        now = datetime.now(timezone.utc)
+        headers = {
+            "Content-Type": "application/json",
+            "Expires": format_datetime(now + timedelta(hours=1), usegmt=True),
+            "Last-Modified": format_datetime(now, usegmt=True),
+        }
+        return 200, headers, payload
+
+    return route
+
+
+@pytest.fixture(scope="session")
+def complete_forecast() -> dict:
+    return rebase_forecast(load_fixture("complete.json"), datetime.now(timezone.utc))
+
+
+@pytest.fixture(scope="session")
+def compact_forecast() -> dict:
+    return rebase_forecast(load_fixture("compact.json"), datetime.now(timezone.utc))
+
+
+@pytest.fixture(scope="session")
+def nowcast() -> dict:
+    nowcast = load_fixture("nowcast.json")
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start -= timedelta(minutes=start.minute % 5)
+    delta = start - datetime.fromisoformat(
+        nowcast["properties"]["timeseries"][0]["time"]
+    )
+    for timestep in nowcast["properties"]["timeseries"]:
+        time = datetime.fromisoformat(timestep["time"]) + delta
+        timestep["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ")
+    meta = nowcast["properties"]["meta"]
+    # nowcasts are issued a few minutes after their first step
+    updated_at = datetime.fromisoformat(meta["updated_at"]) + delta
+    meta["updated_at"] = min(updated_at, datetime.now(timezone.utc)).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+    return nowcast
+
+
+@pytest.fixture(scope="session")
+def stub_server(complete_forecast, compact_forecast, nowcast):
+    StubHandler.routes = {
+        "/search": _nominatim_route,
+        "/weatherapi/locationforecast/2.0/complete": _forecast_route(
+            json.dumps(complete_forecast).encode()
+        ),
+        "/weatherapi/locationforecast/2.0/compact": _forecast_route(
+            json.dumps(compact_forecast).encode()
+        ),
+        "/weatherapi/nowcast/2.0/complete": _forecast_route(
+            json.dumps(nowcast).encode()
+        ),
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def offline(stub_server, tmp_path, monkeypatch):
+    """Point every upstream URL and on-disk cache at the stub server and ``tmp_path``."""
+    monkeypatch.setattr(api, "NOMINATIM_URL", f"{stub_server}/search")
+    monkeypatch.setattr(
+        api, "MET_FORECAST_URL", f"{stub_server}/weatherapi/locationforecast/2.0"
+    )
+    monkeypatch.setattr(
+        api, "MET_NOWCAST_URL", f"{stub_server}/weatherapi/nowcast/2.0/complete"
+    )
+    monkeypatch.setattr(store, "FORECAST_STORE_DB", tmp_path / "forecasts.sqlite")
+    monkeypatch.setattr(store, "LEGACY_CACHE_PATH", tmp_path / "met_cache.sqlite")
+    monkeypatch.setattr(
+        api, "MET_NOWCAST_CACHE_PATH", (tmp_path / "met_nowcast.sqlite").as_posix()
+    )
+    monkeypatch.setattr(cache, "CACHE_DB", tmp_path / "yr_cli.sqlite")
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_DB", tmp_path / "ratelimit.sqlite")
+    monkeypatch.setattr(alerts, "ALERTS_DB", tmp_path / "alerts.sqlite")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(
+        parsed, "PARSED_FORECAST_DB", tmp_path / "parsed_forecasts.sqlite"
+    )
+    monkeypatch.setattr(parsed, "_parsed_forecasts", OrderedDict())
+    # pace the stub server like api.met.no
+    monkeypatch.setitem(ratelimit.HOST_RATES, "127.0.0.1", 20.0)
+    monkeypatch.delenv("ITERM_SESSION_ID", raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def throttled_url(stub_server, monkeypatch):
+    """A URL that is throttled twice, asking clients to retry after 0.1s."""
+    monkeypatch.setitem(StubHandler.routes, "/throttled", _throttled_route([0.1, 0.1]))
+    return f"{stub_server}/throttled"
+
+
+@pytest.fixture
+def long_throttled_url(stub_server, monkeypatch):
+    """A URL that is throttled, asking clients to retry after two minutes."""
+    monkeypatch.setitem(StubHandler.routes, "/long-throttled", _throttled_route([120]))
+    return f"{stub_server}/long-throttled"
+
+
+@pytest.fixture
+def slow_nowcast(offline, monkeypatch):
+    """Make the stub nowcast endpoint respond slower than the command waits for it."""
+    monkeypatch.setitem(StubHandler.delays, "/weatherapi/nowcast/2.0/complete", 2)
+
+
+@pytest.fixture
+def rich_console(monkeypatch) -> Console:
+    console = Console(
+        file=io.StringIO(), width=120, force_terminal=True, color_system="truecolor"
+    )
+    monkeypatch.setattr(interface, "console", console)
+    return console
+
+
+@pytest.fixture(scope="session")
+def view_time_series(complete_forecast) -> dict[str, list[datetime]]:
+    """Time series shaped like those requested by the now, summary and weekend views."""
+    times = forecast_times(complete_forecast)
+    six_hourly = [time for time in times if time.hour % 6 == 0]
+    return {
+        "now": times[1:26],
+        "summary": six_hourly[:20],
+        "weekend": six_hourly[-13:-1],
+    }
+
+
+@pytest.fixture(scope="session")
+def long_forecast(complete_forecast) -> dict:
+    """A forecast with 10 000 hourly steps, built by repeating the fixture data."""
+    forecast = copy.deepcopy(complete_forecast)
+    fixture_steps = forecast["properties"]["timeseries"]
+    start = forecast_times(forecast)[0]
+    forecast["properties"]["timeseries"] = [
+        {
+            "time": (start + timedelta(hours=hour)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "data": fixture_steps[hour % 60]["data"],
+        }
+        for hour in range(10_000)
+    ]
+    return forecast
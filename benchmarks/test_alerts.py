@@ -0,0 +1,180 @@
+import json
+import sqlite3
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from yr_cli import alerts, cache, store
+from yr_cli.alerts import evaluate_alerts, load_rules
+from yr_cli.cli import app
+from yr_cli.locationforecast import parsed
+
+SITE_COUNT = 2000
+RULES = [
+    {
+        "name": "rain",
+        "key": ["next_1_hours", "details", "precipitation_amount"],
+        "op": ">",
+        "threshold": 0.5,
+        "hours": 24,
+    },
+    {
+        "name": "gusts",
+        "key": ["instant", "details", "wind_speed_of_gust"],
+        "op": ">",
+        "threshold": 10,
+        "hours": 24,
+    },
+    {
+        "name": "frost",
+        "key": ["instant", "details", "air_temperature"],
+        "op": "<",
+        "threshold": 0,
+        "hours": 48,
+    },
+    {
+        "name": "heat",
+        "key": ["derived", "apparent_temperature"],
+        "op": ">",
+        "threshold": 30,
+        "hours": 48,
+    },
+]
+
+
+@pytest.fixture(scope="module")
+def alert_sites(tmp_path_factory, complete_forecast):
+    """Cached locations with a stored forecast each, in databases shared by the module."""
+    tmp_path = tmp_path_factory.mktemp("alerts")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(store, "FORECAST_STORE_DB", tmp_path / "forecasts.sqlite")
+        monkeypatch.setattr(cache, "CACHE_DB", tmp_path / "yr_cli.sqlite")
+        monkeypatch.setattr(alerts, "ALERTS_DB", tmp_path / "alerts.sqlite")
+        monkeypatch.setattr(
+            parsed, "PARSED_FORECAST_DB", tmp_path / "parsed_forecasts.sqlite"
+        )
+        for index in range(SITE_COUNT):
+            lat, lon = -34.0 + index / 100, 18.0 + (index % 50) / 100
+            cache.cache_location(
+                f"site {index}",
+                {"name": f"Site {index}", "lat": str(lat), "lon": str(lon)},
+            )
+            cache.cache_forecast_point(lat, lon)
+            store.store_forecast(
+                lat, lon, "complete", complete_forecast, time.time() + 3600, None
+            )
+        yield tmp_path
+
+
+def _change_forecasts(alert_sites, count: int):
+    with sqlite3.connect(alert_sites / "forecasts.sqlite") as conn:
+        conn.execute(
+            "UPDATE forecasts SET updated_at = ? WHERE rowid <= ?",
+            (str(time.time()), count),
+        )
+
+
+def test_evaluate_all_sites(benchmark, alert_sites):
+    matches = benchmark.pedantic(
+        evaluate_alerts, args=(RULES,), kwargs={"only_changed": False}, rounds=3
+    )
+    assert {match["location"] for match in matches} == {
+        f"site {index}" for index in range(SITE_COUNT)
+    }
+    assert not any("unavailable" in match for match in matches)
+
+
+def test_evaluate_all_sites_cold(benchmark, alert_sites):
+    def evaluate():
+        # decoding every stored forecast rather than the rule values kept parsed
+        parsed.clear_parsed_forecasts()
+        return evaluate_alerts(RULES, only_changed=False)
+
+    matches = benchmark.pedantic(evaluate, rounds=3)
+    assert len({match["location"] for match in matches}) == SITE_COUNT
+
+
+def test_evaluate_unchanged_sites(benchmark, alert_sites):
+    evaluate_alerts(RULES)
+
+    assert benchmark(evaluate_alerts, RULES) == []
+
+
+def test_evaluate_changed_sites(benchmark, alert_sites):
+    evaluate_alerts(RULES)
+
+    matches = benchmark.pedantic(
+        evaluate_alerts,
+        args=(RULES,),
+        setup=lambda: _change_forecasts(alert_sites, SITE_COUNT // 10),
+        rounds=5,
+    )
+    assert len({match["location"] for match in matches}) == SITE_COUNT // 10
+
+
+def test_alerts_command(offline, tmp_path):
+    runner = CliRunner()
+    assert runner.invoke(app, ["now", "stellenbosch"]).exit_code == 0
+    rules_path = tmp_path / "rules.json"
+    rules = [{**RULES[2], "name": "mild", "op": ">", "threshold": 10}]
+    rules_path.write_text(json.dumps(rules))
+
+    result = runner.invoke(app, ["alerts", str(rules_path)])
+    assert result.exit_code == 0, result.output
+    matches = [json.loads(line) for line in result.output.splitlines()]
+    assert {match["location"] for match in matches} == {"stellenbosch"}
+    assert runner.invoke(app, ["alerts", str(rules_path)]).output == ""
+
+
+def test_evaluate_skips_expired_forecasts(benchmark, offline, complete_forecast):
+    cache.cache_location("stellenbosch", {"lat": "-33.9321", "lon": "18.8602"})
+    cache.cache_forecast_point(-33.9321, 18.8602)
+    rules = [{**RULES[2], "name": "mild", "op": ">", "threshold": 10}]
+    store.store_forecast(
+        -33.9321, 18.8602, "complete", complete_forecast, time.time() + 3600, None
+    )
+    assert evaluate_alerts(rules, only_changed=False)
+    store.store_forecast(
+        -33.9321, 18.8602, "complete", complete_forecast, time.time() - 1, None
+    )
+
+    assert benchmark(evaluate_alerts, rules, only_changed=False) == []
+
+
+def test_evaluate_without_rules(benchmark, alert_sites):
+    assert benchmark(evaluate_alerts, [], only_changed=False) == []
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        {**RULES[0], "key": ["next_1_hours", "summary", "symbol_code"]},
+        {**RULES[0], "threshold": "heavy"},
+    ],
+)
+def test_load_rules_rejects_non_numeric(tmp_path, rule):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps([rule]))
+
+    with pytest.raises(ValueError, match="not a number"):
+        load_rules(str(rules_path))
+
+
+def test_evaluate_compact_forecast(offline, compact_forecast):
+    cache.cache_location("stellenbosch", {"lat": "-33.9321", "lon": "18.8602"})
+    cache.cache_forecast_point(-33.9321, 18.8602)
+    store.store_forecast(
+        -33.9321, 18.8602, "compact", compact_forecast, time.time() + 3600, None
+    )
+    rules = [
+        {**RULES[1], "threshold": -1},
+        {**RULES[2], "name": "mild", "op": ">", "threshold": -100},
+    ]
+
+    matches = {match["rule"]: match for match in evaluate_alerts(rules)}
+    # gusts are only in the complete forecast, so can't be compared with compact
+    assert matches["gusts"]["unavailable"] == (
+        "instant/details/wind_speed_of_gust is not in the stored compact forecast"
+    )
+    assert matches["mild"]["steps"] > 0
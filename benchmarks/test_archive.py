@@ -0,0 +1,195 @@
+import copy
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from typer.testing import CliRunner
+
+from yr_cli import api, archive
+from yr_cli.cli import app
+
+LOCATION = {"name": "Stellenbosch", "lat": "-33.9321", "lon": "18.8602"}
+# hourly runs for 91 points over 5 days, about a million steps of the fixture forecast
+ARCHIVE_DAYS = 5
+ARCHIVE_POINTS = [(-34.0 + index / 100, 18.5) for index in range(91)]
+FIRST_ISSUE = datetime(2024, 6, 17, tzinfo=timezone.utc)
+# a year of daily partitions, each holding one run for a single point
+YEAR_DAYS = 365
+
+
+@pytest.fixture(scope="module")
+def large_archive(tmp_path_factory, complete_forecast):
+    archive_dir = tmp_path_factory.mktemp("archive")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(archive, "ARCHIVE_DIR", archive_dir)
+        steps = [
+            (timestep["time"], archive._compress(timestep["data"]))
+            for timestep in complete_forecast["properties"]["timeseries"]
+        ]
+        for day in range(ARCHIVE_DAYS):
+            issue_day = FIRST_ISSUE + timedelta(days=day)
+            partition = archive._partition_path(f"{issue_day:%Y-%m-%d}")
+            archive.init_db(partition)
+            with sqlite3.connect(partition) as conn:
+                for hour in range(24):
+                    issued_at = archive._to_timestamp(issue_day + timedelta(hours=hour))
+                    conn.executemany(
+                        "INSERT INTO steps VALUES (?, ?, ?, ?, 'complete', ?)",
+                        (
+                            (lat, lon, issued_at, valid_at, data)
+                            for lat, lon in ARCHIVE_POINTS
+                            for valid_at, data in steps
+                        ),
+                    )
+        yield archive_dir
+
+
+@pytest.fixture(scope="module")
+def year_archive(tmp_path_factory, complete_forecast):
+    archive_dir = tmp_path_factory.mktemp("year_archive")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(archive, "ARCHIVE_DIR", archive_dir)
+        timestep = complete_forecast["properties"]["timeseries"][0]
+        for day in range(YEAR_DAYS):
+            issued_at = archive._to_timestamp(FIRST_ISSUE - timedelta(days=day))
+            partition = archive._partition_path(issued_at[:10])
+            archive.init_db(partition)
+            with sqlite3.connect(partition) as conn:
+                conn.execute(
+                    "INSERT INTO steps VALUES (?, ?, ?, ?, 'complete', ?)",
+                    (
+                        *ARCHIVE_POINTS[0],
+                        issued_at,
+                        timestep["time"],
+                        archive._compress(timestep["data"]),
+                    ),
+                )
+        yield archive_dir
+
+
+def test_archive_forecast(benchmark, offline, complete_forecast):
+    benchmark(
+        archive.archive_forecast, -33.9321, 18.8602, "complete", complete_forecast
+    )
+    partitions = list((offline / "archive").glob("*.sqlite"))
+    size = sum(partition.stat().st_size for partition in partitions)
+    benchmark.extra_info["bytes_per_step"] = size / len(
+        complete_forecast["properties"]["timeseries"]
+    )
+
+
+def test_archived_forecast_lookup(benchmark, monkeypatch, large_archive):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", large_archive)
+    lat, lon = ARCHIVE_POINTS[45]
+    issued = FIRST_ISSUE + timedelta(days=2, hours=13, minutes=30)
+
+    archived = benchmark(archive.get_archived_forecast, lat, lon, issued)
+    assert archived.issued_at == FIRST_ISSUE + timedelta(days=2, hours=13)
+    assert len(archived.forecast["properties"]["timeseries"]) == 92
+
+
+def test_archived_forecast_range(benchmark, monkeypatch, large_archive):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", large_archive)
+    lat, lon = ARCHIVE_POINTS[0]
+    timeseries = archive.get_archived_forecast(
+        lat, lon, FIRST_ISSUE + timedelta(days=ARCHIVE_DAYS)
+    ).forecast["properties"]["timeseries"]
+    valid_from = datetime.fromisoformat(timeseries[10]["time"])
+    valid_to = datetime.fromisoformat(timeseries[20]["time"])
+
+    archived = benchmark(
+        archive.get_archived_forecast,
+        lat,
+        lon,
+        FIRST_ISSUE + timedelta(days=ARCHIVE_DAYS),
+        valid_from,
+        valid_to,
+    )
+    assert archived.forecast["properties"]["timeseries"] == timeseries[10:21]
+
+
+def test_archived_forecast_missing_point(benchmark, monkeypatch, year_archive):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", year_archive)
+    lat, lon = ARCHIVE_POINTS[1]
+    assert benchmark(archive.get_archived_forecast, lat, lon, FIRST_ISSUE) is None
+
+    opened = []
+    is_readable = archive._is_readable
+    monkeypatch.setattr(
+        archive,
+        "_is_readable",
+        lambda partition: opened.append(partition) or is_readable(partition),
+    )
+    archive.get_archived_forecast(lat, lon, FIRST_ISSUE)
+    # only the partitions within the lookback are opened, not the whole year
+    assert len(opened) == archive.MAX_LOOKBACK_DAYS + 1
+
+
+def test_archived_forecast_lookback(monkeypatch, year_archive):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", year_archive)
+    lat, lon = ARCHIVE_POINTS[0]
+    issued = FIRST_ISSUE + timedelta(days=archive.MAX_LOOKBACK_DAYS)
+    assert archive.get_archived_forecast(lat, lon, issued).issued_at == FIRST_ISSUE
+    assert archive.get_archived_forecast(lat, lon, issued + timedelta(days=1)) is None
+
+
+def test_complete_replaces_compact(offline, complete_forecast, compact_forecast):
+    compact = copy.deepcopy(compact_forecast)
+    issued_at = complete_forecast["properties"]["meta"]["updated_at"]
+    compact["properties"]["meta"]["updated_at"] = issued_at
+    archive.archive_forecast(-33.9321, 18.8602, "compact", compact)
+    archive.archive_forecast(-33.9321, 18.8602, "complete", complete_forecast)
+    # compact archived again for the same run doesn't replace complete
+    archive.archive_forecast(-33.9321, 18.8602, "compact", compact)
+
+    archived = archive.get_archived_forecast(
+        -33.9321, 18.8602, archive._from_timestamp(issued_at)
+    )
+    assert archived.product == "complete"
+    assert archived.forecast["properties"]["timeseries"] == [
+        {"time": timestep["time"], "data": timestep["data"]}
+        for timestep in complete_forecast["properties"]["timeseries"]
+    ]
+
+
+def test_archive_error_does_not_fail_fetch(offline, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(api, "archive_forecast", locked)
+    result = CliRunner().invoke(app, ["now", "stellenbosch"])
+    assert result.exit_code == 0, result.output
+
+
+def test_archived_forecast_before_archive(monkeypatch, large_archive):
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", large_archive)
+    lat, lon = ARCHIVE_POINTS[0]
+    assert (
+        archive.get_archived_forecast(lat, lon, FIRST_ISSUE - timedelta(hours=1))
+        is None
+    )
+
+
+def test_history_command(offline, complete_forecast):
+    runner = CliRunner()
+    assert runner.invoke(app, ["now", "stellenbosch"]).exit_code == 0
+
+    result = runner.invoke(app, ["history", "stellenbosch", "--json"])
+    assert result.exit_code == 0, result.output
+    steps = [json.loads(line) for line in result.output.splitlines()]
+    assert [step["time"] for step in steps] == [
+        timestep["time"] for timestep in complete_forecast["properties"]["timeseries"]
+    ]
+
+    result = runner.invoke(app, ["history", "stellenbosch"])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("Forecast issued")
+
+    # the last step has no hourly summary, so there is nothing to display
+    last_step = datetime.fromisoformat(steps[-1]["time"]).astimezone()
+    result = runner.invoke(
+        app, ["history", "stellenbosch", "--from", f"{last_step:%Y-%m-%dT%H:%M}"]
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output == "No archived forecast steps in that time range.\n"
@@ -0,0 +1,69 @@
+import json
+import sqlite3
+
+from yr_cli import api, cache
+from yr_cli.locationforecast.data import fetch_and_filter_forecast
+
+
+def test_location_cache_hit(benchmark, offline):
+    location = api.get_openstreetmap_locations("stellenbosch", 10, "za")[0]
+    cache.cache_location("stellenbosch", location)
+
+    assert benchmark(cache.get_cached_location, "stellenbosch") == location
+
+
+def test_location_cache_miss(benchmark, offline):
+    cache.init_db()
+
+    assert benchmark(cache.get_cached_location, "nowhere") is None
+
+
+def test_location_points_migration(benchmark, offline):
+    # a cache from before location_points existed
+    with sqlite3.connect(cache.CACHE_DB) as conn:
+        conn.execute(
+            "CREATE TABLE locations "
+            "(query TEXT PRIMARY KEY, location_data JSON, timestamp DATETIME)"
+        )
+        conn.execute(
+            "INSERT INTO locations (query, location_data) VALUES (?, ?)",
+            ("stellenbosch", json.dumps({"lat": "-33.9321", "lon": "18.8602"})),
+        )
+    cache.init_db()
+    assert cache.get_nearby_locations(-33.9321, 18.8602, 1.0)[0][1] == "stellenbosch"
+
+    # the backfill runs once, later calls only make sure the tables exist
+    with sqlite3.connect(cache.CACHE_DB) as conn:
+        conn.execute("DELETE FROM location_points")
+    benchmark(cache.init_db)
+    assert cache.get_nearby_locations(-33.9321, 18.8602, 1.0) == []
+
+
+def test_forecast_cache_hit(benchmark, offline):
+    api.get_location_forecast(lat=-33.9321, lon=18.8602)
+
+    forecast = benchmark(api.get_location_forecast, lat=-33.9321, lon=18.8602)
+    assert forecast["properties"]["timeseries"]
+
+
+def test_nearby_forecast_points(benchmark, offline):
+    # a 100 x 100 grid of cached forecast points about 1 km apart
+    for row in range(100):
+        for column in range(100):
+            cache.cache_forecast_point(-34.0 + row / 100, 18.0 + column / 100)
+
+    nearby = benchmark(cache.get_nearby_forecast_points, -33.5, 18.5, 2.0)
+    assert nearby[0][1:] == (-33.5, 18.5)
+    assert all(distance <= 2.0 for distance, _, _ in nearby)
+
+
+def test_forecast_reuse_within_radius(benchmark, offline, view_time_series):
+    time_series = view_time_series["now"]
+    fetch_and_filter_forecast({"lat": "-33.9321", "lon": "18.8602"}, time_series)
+    # a point about 300 m away reuses the cached forecast
+    nearby_location = {"lat": "-33.9300", "lon": "18.8630"}
+
+    benchmark(fetch_and_filter_forecast, nearby_location, time_series)
+    assert cache.get_nearby_forecast_points(-33.9321, 18.8602, 1.0) == [
+        (0.0, -33.9321, 18.8602)
+    ]
@@ -0,0 +1,68 @@
+import pytest
+from typer.testing import CliRunner
+
+from yr_cli.cli import app
+from yr_cli.compare import compare_locations
+from yr_cli.interface import display_comparison, print_comparison_table
+from yr_cli.locationforecast import parsed
+
+# far enough apart that each site is fetched rather than reusing a nearby forecast
+SITES = [
+    {"name": f"Site {index}", "lat": str(-34.0 + index / 10), "lon": "18.8"}
+    for index in range(20)
+]
+NAMES = [site["name"] for site in SITES]
+HOURS = 72
+
+
+@pytest.fixture
+def comparison(offline):
+    return compare_locations(SITES, hours=HOURS)
+
+
+def test_compare_locations_cold(benchmark, offline):
+    comparison = benchmark.pedantic(compare_locations, args=(SITES, HOURS), rounds=1)
+    assert comparison
+    assert all(len(site_data) == len(SITES) for site_data in comparison.values())
+
+
+def test_compare_marks_daylight(comparison):
+    # the sites are around Cape Town, dark at midnight UTC and light at noon UTC
+    for time, site_data in comparison.items():
+        if time.hour in (0, 12):
+            assert all(data["is_day"] is (time.hour == 12) for data in site_data)
+
+
+def test_compare_locations_warm(benchmark, comparison):
+    def compare():
+        # skip the in-memory cache, reading parsed forecasts from disk
+        parsed._parsed_forecasts.clear()
+        return compare_locations(SITES, HOURS)
+
+    assert list(benchmark(compare)) == list(comparison)
+
+
+def test_display_comparison(benchmark, rich_console, comparison):
+    def render():
+        rich_console.file.seek(0)
+        rich_console.file.truncate()
+        display_comparison(comparison, NAMES, "72-Hour Weather Comparison")
+
+    benchmark(render)
+    assert "Site 0" in rich_console.file.getvalue()
+
+
+@pytest.mark.parametrize("output_method", ["iterm2", "kitty", "sixel"])
+def test_print_comparison_table(benchmark, capsysbinary, comparison, output_method):
+    benchmark(print_comparison_table, comparison, NAMES, output_method)
+    assert b"Site 19" in capsysbinary.readouterr().out
+
+
+def test_compare_command(offline):
+    result = CliRunner().invoke(
+        app, ["compare", "cape town", "stellenbosch", "--hours", "12"]
+    )
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    assert "Cape Town" in lines[1] and "Stellenbosch" in lines[1]
+    assert len(lines) == 2 + 12
@@ -0,0 +1,65 @@
+from conftest import forecast_times
+from typer.testing import CliRunner
+
+from yr_cli.cli import app
+from yr_cli.locationforecast.data import filter_location_forecast
+from yr_cli.locationforecast.derived import (
+    DERIVED,
+    DERIVED_INPUTS,
+    add_derived_metrics,
+    derive_metrics,
+)
+
+LOCATION_COUNT = 1000
+
+
+def test_derive_metrics_throughput(benchmark, complete_forecast):
+    details = [
+        timestep["data"]["instant"]["details"]
+        for timestep in complete_forecast["properties"]["timeseries"]
+    ]
+    names = list(DERIVED_INPUTS)
+    benchmark.extra_info["steps"] = LOCATION_COUNT * len(details)
+
+    def derive_all():
+        return [derive_metrics(details, names) for _ in range(LOCATION_COUNT)]
+
+    columns = benchmark.pedantic(derive_all, rounds=5)
+    assert all(None not in columns[0][name] for name in names)
+
+
+def test_add_derived_metrics_throughput(benchmark, complete_forecast):
+    names = list(DERIVED_INPUTS)
+
+    def add_all():
+        return [
+            add_derived_metrics(complete_forecast, names) for _ in range(LOCATION_COUNT)
+        ]
+
+    forecasts = benchmark.pedantic(add_all, rounds=5)
+    assert DERIVED not in complete_forecast["properties"]["timeseries"][0]["data"]
+    assert set(forecasts[0]["properties"]["timeseries"][0]["data"][DERIVED]) == set(
+        names
+    )
+
+
+def test_filter_derived_fields(benchmark, complete_forecast):
+    times = forecast_times(complete_forecast)
+    keys = [["instant", "details", "air_temperature"]] + [
+        [DERIVED, name] for name in DERIVED_INPUTS
+    ]
+
+    filtered = benchmark(filter_location_forecast, complete_forecast, times, keys)
+    assert set(filtered[times[0]]) == {"air_temperature", *DERIVED_INPUTS}
+
+
+def test_feels_like_option(benchmark, offline):
+    runner = CliRunner()
+    default = runner.invoke(app, ["now", "stellenbosch"])
+    assert default.exit_code == 0, default.output
+
+    result = benchmark(runner.invoke, app, ["now", "stellenbosch", "--feels-like"])
+    assert result.exit_code == 0, result.output
+    # apparent temperature follows the air temperature only when selected
+    assert "°C (" in result.output
+    assert "°C (" not in default.output
@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from yr_cli import api, ratelimit
+
+LOCATIONS = [(-34.0 + index / 100, 18.0 + index / 100) for index in range(50)]
+
+
+def fetch_all(product: str = "complete", max_workers: int = 8) -> list:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                lambda coords: api.get_location_forecast(*coords, product=product),
+                LOCATIONS,
+            )
+        )
+
+
+@pytest.mark.parametrize("product", ["compact", "complete"])
+def test_batch_fetch_cold(benchmark, offline, product):
+    def clear_forecast_cache():
+        for path in offline.glob("forecasts.sqlite*"):
+            path.unlink()
+
+    forecasts = benchmark.pedantic(
+        fetch_all, args=(product,), setup=clear_forecast_cache, rounds=5, iterations=1
+    )
+    assert len(forecasts) == len(LOCATIONS)
+
+
+def test_batch_fetch_warm(benchmark, offline):
+    fetch_all()
+
+    forecasts = benchmark(fetch_all)
+    assert len(forecasts) == len(LOCATIONS)
+
+
+def test_rate_limiter_acquire(benchmark, offline, monkeypatch):
+    # an unthrottled host, so that only the bookkeeping is measured
+    monkeypatch.setitem(ratelimit.HOST_RATES, "example.org", 1e9)
+
+    assert benchmark(ratelimit.acquire, "example.org") == 0
+
+
+def test_rate_limiter_retry_after(benchmark, offline, throttled_url):
+    session = ratelimit.mount_rate_limiter(requests.Session())
+
+    response = benchmark.pedantic(session.get, args=(throttled_url,), rounds=1)
+    assert response.status_code == 200
+    (stats,) = ratelimit.get_rate_limit_stats()
+    assert stats["throttled"] == 2
+    assert stats["requests"] == 3
+    assert stats["wait_seconds"] >= 0.2
+    assert stats["rate"] < ratelimit.HOST_RATES["127.0.0.1"]
+
+
+def test_rate_limiter_long_retry_after(benchmark, offline, long_throttled_url):
+    session = ratelimit.mount_rate_limiter(requests.Session())
+
+    def get():
+        started_at = time.monotonic()
+        with pytest.raises(requests.exceptions.RetryError):
+            session.get(long_throttled_url)
+        return time.monotonic() - started_at
+
+    # fails rather than waiting two minutes for the host
+    assert benchmark.pedantic(get, rounds=1) < ratelimit.MAX_WAIT_SECONDS
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from conftest import forecast_times
+
+from yr_cli.locationforecast.data import (
+    fetch_and_filter_forecast,
+    filter_location_forecast,
+)
+
+KEYS = [
+    ["next_6_hours", "summary", "symbol_code"],
+    ["instant", "details", "air_temperature"],
+    ["instant", "details", "wind_speed"],
+    ["instant", "details", "wind_from_direction"],
+    ["instant", "details", "cloud_area_fraction"],
+]
+
+
+@pytest.mark.parametrize("product", ["compact", "complete"])
+def test_forecast_parse(benchmark, request, product):
+    payload = request.getfixturevalue(f"{product}_forecast")
+    body = json.dumps(payload).encode()
+    benchmark.extra_info["bytes"] = len(body)
+
+    forecast = benchmark(json.loads, body)
+    assert forecast == payload
+
+
+@pytest.mark.parametrize("view", ["now", "summary", "weekend"])
+def test_fetch_and_filter_forecast(benchmark, offline, view_time_series, view):
+    location = {"lat": "-33.9321", "lon": "18.8602"}
+    time_series = view_time_series[view]
+    fetch_and_filter_forecast(location, time_series)
+
+    filtered = benchmark(fetch_and_filter_forecast, location, time_series)
+    assert list(filtered) == time_series
+
+
+def test_filter_large_time_list(benchmark, long_forecast):
+    times = forecast_times(long_forecast)
+
+    filtered = benchmark(filter_location_forecast, long_forecast, times, KEYS)
+    assert len(filtered) == len(times)
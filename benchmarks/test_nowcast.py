@@ -0,0 +1,71 @@
+import time
+
+from conftest import StubHandler
+from typer.testing import CliRunner
+
+from yr_cli.cli import app
+from yr_cli.nowcast.data import fetch_nowcast_in_background, merge_nowcast
+
+# nowcasts only cover the Nordic area
+LOCATION = {"name": "Oslo", "lat": "59.9133301", "lon": "10.7389701"}
+OUTSIDE_LOCATION = {"name": "Stellenbosch", "lat": "-33.9321", "lon": "18.8602"}
+
+
+def test_merge_nowcast(benchmark, offline, nowcast, view_time_series):
+    forecast = {time: {"precipitation_amount": 0.0} for time in view_time_series["now"]}
+
+    merged = benchmark(merge_nowcast, forecast, nowcast)
+    assert merged != forecast
+    # the forecast's own amount is kept alongside the nowcast's
+    assert all(row["precipitation_amount"] == 0.0 for row in merged.values())
+
+
+def test_nowcast_fetch(benchmark, offline):
+    def fetch():
+        return fetch_nowcast_in_background(LOCATION, grace_seconds=5)()
+
+    assert benchmark(fetch)["properties"]["meta"]["radar_coverage"] == "ok"
+
+
+def test_nowcast_outside_area(benchmark, slow_nowcast):
+    def fetch():
+        started_at = time.monotonic()
+        return fetch_nowcast_in_background(OUTSIDE_LOCATION, grace_seconds=5)(), (
+            time.monotonic() - started_at
+        )
+
+    nowcast, elapsed = benchmark(fetch)
+    assert nowcast is None
+    # the slow stub is never asked, so there is nothing to wait for
+    assert elapsed < 0.1
+
+
+def test_now_with_slow_nowcast(benchmark, slow_nowcast):
+    runner = CliRunner()
+    # prime the location and forecast caches
+    result = runner.invoke(app, ["now", "oslo"])
+    assert result.exit_code == 0, result.output
+
+    def run():
+        started_at = time.monotonic()
+        result = runner.invoke(app, ["now", "oslo"])
+        return result, time.monotonic() - started_at
+
+    result, elapsed = benchmark.pedantic(run, rounds=5, iterations=1)
+    assert result.exit_code == 0, result.output
+    # the stub nowcast takes two seconds, which the command must not wait for
+    assert elapsed < 1
+
+
+def test_nowcast_slower_than_grace(benchmark, offline, monkeypatch):
+    # the nowcast takes longer than the grace, but arrives within it of the forecast
+    monkeypatch.setitem(StubHandler.delays, "/weatherapi/nowcast/2.0/complete", 0.6)
+
+    def fetch():
+        get_nowcast = fetch_nowcast_in_background(LOCATION)
+        # the time taken fetching and filtering the forecast
+        time.sleep(0.5)
+        return get_nowcast()
+
+    nowcast = benchmark.pedantic(fetch, rounds=1, iterations=1)
+    assert nowcast is not None
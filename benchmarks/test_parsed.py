@@ -0,0 +1,132 @@
+import copy
+import sqlite3
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from yr_cli import store
+from yr_cli.cli import app
+from yr_cli.locationforecast import parsed
+from yr_cli.locationforecast.data import (
+    FORECAST_KEYS,
+    fetch_and_filter_forecast,
+    filter_location_forecast,
+)
+
+LOCATION = {"lat": "-33.9321", "lon": "18.8602"}
+
+
+@pytest.fixture
+def stored_forecast(offline, compact_forecast):
+    store.store_forecast(
+        float(LOCATION["lat"]),
+        float(LOCATION["lon"]),
+        "compact",
+        compact_forecast,
+        time.time() + 3600,
+        None,
+    )
+    return compact_forecast
+
+
+@pytest.mark.parametrize("layer", ["decode", "persistent", "memory"])
+def test_fetch_and_filter_reuse(benchmark, stored_forecast, view_time_series, layer):
+    time_series = view_time_series["now"]
+    fetch_and_filter_forecast(LOCATION, time_series)
+
+    def fetch():
+        if layer == "decode":
+            parsed.PARSED_FORECAST_DB.unlink()
+        if layer != "memory":
+            parsed._parsed_forecasts.clear()
+        return fetch_and_filter_forecast(LOCATION, time_series)
+
+    filtered = benchmark(fetch)
+    expected = filter_location_forecast(stored_forecast, time_series, FORECAST_KEYS)
+    for forecast_time, values in filtered.items():
+        assert values.pop("is_day") in (True, False)
+        assert values == expected[forecast_time]
+
+
+def test_new_model_run_is_parsed(stored_forecast, view_time_series):
+    time_series = view_time_series["now"]
+    fetch_and_filter_forecast(LOCATION, time_series)
+    forecast = copy.deepcopy(stored_forecast)
+    forecast["properties"]["meta"]["updated_at"] = "2099-01-01T00:00:00Z"
+    for timestep in forecast["properties"]["timeseries"]:
+        timestep["data"]["instant"]["details"]["air_temperature"] = 99.0
+    store.store_forecast(
+        float(LOCATION["lat"]),
+        float(LOCATION["lon"]),
+        "compact",
+        forecast,
+        time.time() + 3600,
+        None,
+    )
+
+    filtered = fetch_and_filter_forecast(LOCATION, time_series)
+    assert {values["air_temperature"] for values in filtered.values()} == {99.0}
+
+
+def test_parsed_forecast_eviction(benchmark, offline, monkeypatch):
+    steps = {
+        f"2024-06-21T{hour:02}:00:00Z": {"air_temperature": 20.0} for hour in range(24)
+    }
+    parsed.store_parsed_forecast(0.0, 0.0, "compact", FORECAST_KEYS, "run", steps)
+    monkeypatch.setattr(
+        parsed, "MAX_PARSED_FORECAST_BYTES", 20 * parsed.get_parsed_forecasts_size()
+    )
+
+    def fill():
+        for index in range(100):
+            parsed.store_parsed_forecast(
+                index / 10, 0.0, "compact", FORECAST_KEYS, "run", steps
+            )
+
+    benchmark.pedantic(fill, rounds=3)
+    assert parsed.get_parsed_forecasts_size() <= parsed.MAX_PARSED_FORECAST_BYTES
+    with sqlite3.connect(parsed.PARSED_FORECAST_DB) as conn:
+        (size,) = conn.execute("SELECT SUM(size) FROM parsed_forecasts").fetchone()
+    assert parsed.get_parsed_forecasts_size() == size
+
+
+def test_parsed_forecast_read_skips_write_lock(stored_forecast, view_time_series):
+    fetch_and_filter_forecast(LOCATION, view_time_series["now"])
+    parsed._parsed_forecasts.clear()
+    with sqlite3.connect(parsed.PARSED_FORECAST_DB, isolation_level=None) as writer:
+        # another process writing to the cache
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            filtered = fetch_and_filter_forecast(LOCATION, view_time_series["now"])
+        finally:
+            writer.execute("ROLLBACK")
+    assert filtered
+
+
+def test_parsed_forecast_migration(offline):
+    # the cache from before sizes and access times were recorded
+    with sqlite3.connect(parsed.PARSED_FORECAST_DB) as conn:
+        conn.execute(
+            "CREATE TABLE parsed_forecasts (lat REAL, lon REAL, product TEXT, "
+            "keys TEXT, updated_at TEXT, steps JSON, stored_at REAL, "
+            "PRIMARY KEY (lat, lon, product, keys))"
+        )
+        conn.execute(
+            "INSERT INTO parsed_forecasts VALUES (0, 0, 'compact', '[]', 'run', '{}', 0)"
+        )
+
+    assert parsed.get_parsed_forecast(0.0, 0.0, "compact", [], "run") is None
+    assert parsed.get_parsed_forecasts_size() == 0
+
+
+def test_clear_cache_clears_parsed_forecasts(stored_forecast, view_time_series):
+    fetch_and_filter_forecast(LOCATION, view_time_series["now"])
+    assert parsed.get_parsed_forecasts_size() > 0
+    store.LEGACY_CACHE_PATH.touch()
+
+    result = CliRunner().invoke(app, ["clear-cache"])
+    assert result.exit_code == 0, result.output
+    assert parsed.get_parsed_forecasts_size() == 0
+    assert not parsed._parsed_forecasts
+    assert not store.LEGACY_CACHE_PATH.exists()
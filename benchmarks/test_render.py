@@ -0,0 +1,101 @@
+import pytest
+from conftest import forecast_times
+
+from yr_cli.icons.atlas import load_atlas
+from yr_cli.interface import (
+    display_weather,
+    encode_icon,
+    print_plain_weather,
+    print_weather_table,
+    stream_weather,
+)
+from yr_cli.locationforecast.data import filter_location_forecast
+
+KEYS = [
+    ["next_6_hours", "summary", "symbol_code"],
+    ["instant", "details", "air_temperature"],
+    ["next_6_hours", "details", "precipitation_amount"],
+    ["instant", "details", "wind_speed"],
+    ["instant", "details", "wind_from_direction"],
+    ["instant", "details", "cloud_area_fraction"],
+]
+PANEL_TITLES = {
+    "now": "24-Hour Weather Forecast",
+    "summary": "Summary Weather Forecast",
+    "weekend": "Weekend Weather Forecast",
+}
+LOCATION = {"name": "Stellenbosch", "lat": "-33.9321", "lon": "18.8602"}
+
+
+@pytest.fixture(scope="module")
+def ten_day_forecast(long_forecast):
+    times = forecast_times(long_forecast)[:240]
+    return filter_location_forecast(long_forecast, times, KEYS)
+
+
+@pytest.fixture(scope="module")
+def view_forecasts(complete_forecast, view_time_series):
+    return {
+        view: filter_location_forecast(complete_forecast, time_series, KEYS)
+        for view, time_series in view_time_series.items()
+    }
+
+
+GRAPHICS_MARKERS = {"iterm2": b"1337;File=", "kitty": b"\033_Ga=T", "sixel": b"\033P"}
+
+
+def test_icon_atlas_load(benchmark):
+    def load():
+        load_atlas.cache_clear()
+        return load_atlas()
+
+    assert benchmark(load)
+
+
+@pytest.mark.parametrize("output_method", list(GRAPHICS_MARKERS))
+def test_icon_encoding(benchmark, output_method):
+    # uncached, so that each round builds the escape sequences
+    icon = benchmark(encode_icon.__wrapped__, "partlycloudy_day", output_method)
+    assert GRAPHICS_MARKERS[output_method] in icon
+
+
+@pytest.mark.parametrize("view", ["now", "summary", "weekend"])
+def test_rich_render(benchmark, rich_console, view_forecasts, view):
+    def render():
+        rich_console.file.seek(0)
+        rich_console.file.truncate()
+        display_weather(
+            forecast_timesteps=view_forecasts[view],
+            selected_location=LOCATION,
+            panel_title=PANEL_TITLES[view],
+        )
+
+    benchmark(render)
+    assert LOCATION["name"] in rich_console.file.getvalue()
+
+
+@pytest.mark.parametrize("output_method", list(GRAPHICS_MARKERS))
+@pytest.mark.parametrize("view", ["now", "summary", "weekend"])
+def test_graphics_render(benchmark, capsysbinary, view_forecasts, view, output_method):
+    benchmark(print_weather_table, view_forecasts[view], output_method)
+    assert GRAPHICS_MARKERS[output_method] in capsysbinary.readouterr().out
+
+
+@pytest.mark.parametrize("renderer", [display_weather, stream_weather])
+def test_rich_render_ten_days_hourly(
+    benchmark, rich_console, ten_day_forecast, renderer
+):
+    def render():
+        rich_console.file.seek(0)
+        rich_console.file.truncate()
+        renderer(ten_day_forecast, LOCATION, "10-Day Weather Forecast")
+
+    benchmark(render)
+    assert LOCATION["name"] in rich_console.file.getvalue()
+
+
+def test_plain_render_ten_days_hourly(benchmark, capsys, ten_day_forecast):
+    benchmark(
+        print_plain_weather, ten_day_forecast, LOCATION, "10-Day Weather Forecast"
+    )
+    assert LOCATION["name"] in capsys.readouterr().out
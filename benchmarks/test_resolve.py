@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from conftest import load_fixture
+from typer.testing import CliRunner
+
+from yr_cli import cache
+from yr_cli.cli import app
+from yr_cli.resolve import rank_locations, resolve_locations
+
+CACHED_QUERIES = [f"site {index}" for index in range(1000)]
+
+
+def test_rank_locations(benchmark):
+    candidates = load_fixture("nominatim.json")["cape town"]
+
+    ranked = benchmark(rank_locations, "cape town", candidates)
+    assert ranked[0][1]["name"] == "Cape Town"
+
+
+def test_resolve_cached_locations(benchmark, offline):
+    location = load_fixture("nominatim.json")["stellenbosch"][0]
+    for query in CACHED_QUERIES:
+        cache.cache_location(query, location)
+
+    resolutions = benchmark.pedantic(
+        resolve_locations, args=(CACHED_QUERIES, 10, "za"), rounds=3
+    )
+    assert all(resolution.location == location for resolution in resolutions)
+
+
+def test_resolve_uncached_locations(benchmark, offline):
+    # distinct queries, so that each is searched for
+    queries = [
+        variant(name)
+        for name in ("cape town", "stellenbosch")
+        for variant in (str.lower, str.upper, str.title, str.capitalize)
+    ]
+
+    resolutions = benchmark.pedantic(
+        resolve_locations,
+        args=(queries, 10, "za"),
+        kwargs={"no_cache": True},
+        rounds=1,
+    )
+    assert [resolution.location["name"] for resolution in resolutions] == [
+        "Cape Town"
+    ] * 4 + ["Stellenbosch"] * 4
+
+
+def test_now_without_tty(offline, rich_console):
+    # CliRunner's stdin isn't a terminal, so the best ranked match is picked
+    result = CliRunner().invoke(app, ["now", "cape town"])
+    assert result.exit_code == 0, result.output
+    assert cache.get_cached_location("cape town")["name"] == "Cape Town"
+
+
+def test_resolve_command(offline):
+    result = CliRunner().invoke(app, ["resolve", "cape town", "nowhere"])
+    assert result.exit_code == 0, result.output
+    resolved = [json.loads(line) for line in result.output.splitlines()]
+    assert [resolution["name"] for resolution in resolved] == ["Cape Town", None]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["resolve", "cape town", "--pick", "prompt"],
+        ["compare", "cape town", "stellenbosch", "--pick", "prompt"],
+        ["history", "cape town", "--pick", "maybe"],
+    ],
+)
+def test_invalid_pick_policy(offline, args):
+    result = CliRunner().invoke(app, args)
+    # rejected as a usage error rather than a traceback
+    assert result.exit_code == 2
+    assert "Invalid value for '--pick'" in result.output
@@ -0,0 +1,73 @@
+import math
+
+import pytest
+from conftest import forecast_times
+from typer.testing import CliRunner
+
+from yr_cli import api
+from yr_cli.cli import app
+from yr_cli.locationforecast.data import FORECAST_KEYS, filter_location_forecast
+from yr_cli.locationforecast.snapshot import ForecastSnapshot, write_snapshot
+
+LOCATIONS = [(-34.0 + index / 100, 18.0 + (index % 7) / 100) for index in range(1000)]
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory, complete_forecast):
+    path = tmp_path_factory.mktemp("snapshot") / "forecasts.snapshot"
+    write_snapshot(
+        path, [(lat, lon, complete_forecast) for lat, lon in LOCATIONS], FORECAST_KEYS
+    )
+    return path
+
+
+def test_write_snapshot(benchmark, tmp_path, complete_forecast):
+    forecasts = [(lat, lon, complete_forecast) for lat, lon in LOCATIONS]
+
+    benchmark.pedantic(
+        write_snapshot,
+        args=(tmp_path / "forecasts.snapshot", forecasts, FORECAST_KEYS),
+        rounds=3,
+    )
+
+
+def test_open_snapshot(benchmark, snapshot_path):
+    def open_and_close():
+        ForecastSnapshot(snapshot_path).close()
+
+    benchmark(open_and_close)
+
+
+def test_snapshot_filter(benchmark, snapshot_path, complete_forecast, view_time_series):
+    times = view_time_series["now"]
+    lat, lon = LOCATIONS[500]
+
+    with ForecastSnapshot(snapshot_path) as snapshot:
+        filtered = benchmark(snapshot.filter, lat, lon, times)
+    assert filtered == filter_location_forecast(complete_forecast, times, FORECAST_KEYS)
+
+
+def test_snapshot_point_lookup(benchmark, snapshot_path, complete_forecast):
+    time = forecast_times(complete_forecast)[10]
+    lat, lon = LOCATIONS[-1]
+
+    with ForecastSnapshot(snapshot_path) as snapshot:
+        assert benchmark(snapshot.get_values, lat, lon, time) is not None
+
+
+def test_snapshot_command(offline, tmp_path, view_time_series):
+    runner = CliRunner()
+    assert runner.invoke(app, ["now", "stellenbosch"]).exit_code == 0
+    # both products stored for the location are written as one
+    api.get_location_forecast(-33.9321, 18.8602, product="compact")
+    api.get_location_forecast(-33.9321, 18.8602, product="complete")
+
+    result = runner.invoke(app, ["snapshot", str(tmp_path / "cli.snapshot")])
+    assert result.exit_code == 0, result.output
+    assert "Wrote forecasts for 1 locations" in result.output
+    with ForecastSnapshot(tmp_path / "cli.snapshot") as snapshot:
+        assert [key for key, _, _ in snapshot.locations()] == ["-33.9321,18.8602"]
+        # derived metrics are exported alongside the forecast fields
+        values = snapshot.get_values(-33.9321, 18.8602, view_time_series["now"][0])
+        assert not math.isnan(values["apparent_temperature"])
+        assert not math.isnan(values["dew_point_comfort"])
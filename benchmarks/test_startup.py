@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from yr_cli.cli import app
+
+
+def test_cold_cli_startup(benchmark):
+    def run():
+        subprocess.run(
+            [sys.executable, "-m", "yr_cli.cli", "--help"],
+            check=True,
+            capture_output=True,
+        )
+
+    benchmark.pedantic(run, rounds=5, iterations=1)
+
+
+def test_warm_cli_startup(benchmark, offline, rich_console):
+    runner = CliRunner()
+    # prime the location and forecast caches
+    result = runner.invoke(app, ["now", "stellenbosch"])
+    assert result.exit_code == 0, result.output
+
+    result = benchmark(runner.invoke, app, ["now", "stellenbosch"])
+    assert result.exit_code == 0, result.output
@@ -0,0 +1,82 @@
+import sqlite3
+import time
+
+import pytest
+from requests_cache import CachedSession
+
+from yr_cli import store
+
+LOCATIONS = [(-34.0 + index / 100, 18.0 + index / 100) for index in range(200)]
+
+
+@pytest.fixture
+def requests_cache_session(offline):
+    return CachedSession(
+        (offline / "requests_cache.sqlite").as_posix(), cache_control=True
+    )
+
+
+@pytest.fixture
+def forecast_url(stub_server):
+    return f"{stub_server}/weatherapi/locationforecast/2.0/complete"
+
+
+def test_requests_cache_read(benchmark, offline, requests_cache_session, forecast_url):
+    for lat, lon in LOCATIONS:
+        requests_cache_session.get(forecast_url, params={"lat": lat, "lon": lon})
+    size = (offline / "requests_cache.sqlite").stat().st_size
+    benchmark.extra_info["bytes_per_location"] = size / len(LOCATIONS)
+
+    def read():
+        response = requests_cache_session.get(
+            forecast_url, params={"lat": LOCATIONS[0][0], "lon": LOCATIONS[0][1]}
+        )
+        return response.json()
+
+    assert benchmark(read)["properties"]["timeseries"]
+
+
+def test_forecast_store_read(benchmark, offline, complete_forecast):
+    for lat, lon in LOCATIONS:
+        store.store_forecast(
+            lat, lon, "complete", complete_forecast, time.time() + 3600, None
+        )
+    size = sum(path.stat().st_size for path in offline.glob("forecasts.sqlite*"))
+    benchmark.extra_info["bytes_per_location"] = size / len(LOCATIONS)
+    benchmark.extra_info["compressed_bytes_per_location"] = (
+        store.get_store_size() / len(LOCATIONS)
+    )
+
+    stored = benchmark(store.get_stored_forecast, *LOCATIONS[0], "complete")
+    assert stored.forecast == complete_forecast
+
+
+def test_forecast_store_eviction(benchmark, offline, complete_forecast, monkeypatch):
+    store.store_forecast(*LOCATIONS[0], "complete", complete_forecast, 0, None)
+    monkeypatch.setattr(store, "MAX_STORE_BYTES", 20 * store.get_store_size())
+
+    def fill():
+        for lat, lon in LOCATIONS:
+            store.store_forecast(lat, lon, "complete", complete_forecast, 0, None)
+
+    benchmark.pedantic(fill, rounds=3)
+    assert store.get_store_size() <= store.MAX_STORE_BYTES
+    with sqlite3.connect(store.FORECAST_STORE_DB) as conn:
+        (size,) = conn.execute("SELECT SUM(size) FROM forecasts").fetchone()
+    # the running total is kept through replaced and evicted forecasts
+    assert store.get_store_size() == size
+
+
+def test_forecast_store_migration(benchmark, offline, complete_forecast):
+    store.LEGACY_CACHE_PATH.touch()
+    store.store_forecast(*LOCATIONS[0], "complete", complete_forecast, 0, None)
+    size = store.get_store_size()
+    # a store from before its size was kept as a running total
+    with sqlite3.connect(store.FORECAST_STORE_DB) as conn:
+        conn.execute("DROP TABLE store_size")
+        conn.execute("PRAGMA user_version = 0")
+
+    benchmark(store.init_db)
+    assert store.get_store_size() == size
+    # the requests-cache database the store replaced is left for clear-cache
+    assert store.LEGACY_CACHE_PATH.exists()
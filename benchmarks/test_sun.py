@@ -0,0 +1,70 @@
+import random
+from datetime import date
+
+from yr_cli import sun
+from yr_cli.locationforecast.data import fetch_and_filter_forecast
+
+LOCATION_COUNT = 1000
+DAY = date(2024, 6, 21)
+
+
+def random_points(count: int) -> list[tuple[float, float]]:
+    rng = random.Random(38)
+    return [(rng.uniform(-60, 60), rng.uniform(-180, 180)) for _ in range(count)]
+
+
+def test_sun_times_cold(benchmark):
+    def compute():
+        sun._sun_times_memo.clear()
+        return sun.get_sun_times(-33.9249, 18.4241, DAY)
+
+    sun_times = benchmark(compute)
+    assert sun_times.sunrise < sun_times.sunset
+
+
+def test_sun_times_batch_cold(benchmark):
+    points = random_points(LOCATION_COUNT)
+
+    def compute():
+        sun._sun_times_memo.clear()
+        return sun.get_sun_times_batch(points, DAY)
+
+    batch = benchmark(compute)
+    assert batch == [sun.get_sun_times(lat, lon, DAY) for lat, lon in points]
+
+
+def test_sun_times_batch_warm(benchmark):
+    points = random_points(LOCATION_COUNT)
+    sun.get_sun_times_batch(points, DAY)
+
+    batch = benchmark(sun.get_sun_times_batch, points, DAY)
+    assert len(batch) == LOCATION_COUNT
+
+
+def test_is_daylight_view(benchmark, view_time_series):
+    times = view_time_series["now"]
+
+    def mark():
+        return [sun.is_daylight(-33.9321, 18.8602, time) for time in times]
+
+    marks = benchmark(mark)
+    assert True in marks or False in marks
+
+
+def test_is_daylight_batch(benchmark, view_time_series):
+    points = random_points(LOCATION_COUNT // 10)
+    times = view_time_series["now"]
+
+    marks = benchmark(sun.is_daylight_batch, points, times)
+    assert marks == [
+        [sun.is_daylight(lat, lon, time) for time in times] for lat, lon in points
+    ]
+
+
+def test_fetch_and_filter_marks_daylight(offline, view_time_series):
+    location = {"lat": "-33.9321", "lon": "18.8602"}
+    filtered = fetch_and_filter_forecast(location, view_time_series["now"])
+    # Cape Town is dark at midnight UTC and light at noon UTC all year round
+    for time, values in filtered.items():
+        if time.hour in (0, 12):
+            assert values["is_day"] is (time.hour == 12)
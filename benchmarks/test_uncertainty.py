@@ -0,0 +1,109 @@
+import copy
+import math
+
+import pytest
+from conftest import forecast_times
+from typer.testing import CliRunner
+
+from yr_cli.cli import app
+from yr_cli.interface import display_weather
+from yr_cli.locationforecast.data import (
+    FORECAST_KEYS,
+    fetch_and_filter_forecast,
+    parse_forecast_steps,
+    select_forecast_steps,
+)
+from yr_cli.locationforecast.snapshot import ForecastSnapshot
+from yr_cli.locationforecast.uncertainty import UNCERTAINTY_FIELDS, UNCERTAINTY_KEYS
+
+LOCATION = {"name": "Stellenbosch", "lat": "-33.9321", "lon": "18.8602"}
+
+
+@pytest.mark.parametrize("uncertainty", [False, True])
+def test_parse_forecast_steps(benchmark, complete_forecast, uncertainty):
+    keys = FORECAST_KEYS + UNCERTAINTY_KEYS if uncertainty else FORECAST_KEYS
+
+    steps = benchmark(parse_forecast_steps, complete_forecast, keys)
+    first_step = next(iter(steps.values()))
+    assert all((field in first_step) is uncertainty for field in UNCERTAINTY_FIELDS)
+
+
+def test_parse_uncertainty_without_six_hourly_thunder(complete_forecast):
+    # the fixture, like MET outside some regions, has no six-hourly thunder
+    timeseries = complete_forecast["properties"]["timeseries"]
+    assert not any(
+        "probability_of_thunder" in timestep["data"]["next_6_hours"]["details"]
+        for timestep in timeseries
+        if "next_6_hours" in timestep["data"]
+    )
+
+    steps = parse_forecast_steps(complete_forecast, FORECAST_KEYS + UNCERTAINTY_KEYS)
+    assert steps.keys() == parse_forecast_steps(complete_forecast, FORECAST_KEYS).keys()
+    for timestep in timeseries:
+        if timestep["time"] in steps:
+            # read from the next hour where there is one, and None otherwise
+            expected = (
+                timestep["data"]
+                .get("next_1_hours", {})
+                .get("details", {})
+                .get("probability_of_thunder")
+            )
+            assert steps[timestep["time"]]["probability_of_thunder"] == expected
+    assert any(step["probability_of_thunder"] is None for step in steps.values())
+
+
+def test_parse_uncertainty_six_hourly_thunder(complete_forecast):
+    forecast = copy.deepcopy(complete_forecast)
+    for timestep in forecast["properties"]["timeseries"]:
+        timestep["data"].pop("next_1_hours", None)
+        if "next_6_hours" in timestep["data"]:
+            timestep["data"]["next_6_hours"]["details"]["probability_of_thunder"] = 4.2
+
+    steps = parse_forecast_steps(forecast, FORECAST_KEYS + UNCERTAINTY_KEYS)
+    assert steps
+    assert {step["probability_of_thunder"] for step in steps.values()} == {4.2}
+
+
+def test_rich_render_uncertainty(
+    benchmark, rich_console, complete_forecast, view_time_series
+):
+    forecast_timesteps = select_forecast_steps(
+        parse_forecast_steps(complete_forecast, FORECAST_KEYS + UNCERTAINTY_KEYS),
+        view_time_series["summary"],
+    )
+
+    def render():
+        rich_console.file.seek(0)
+        rich_console.file.truncate()
+        display_weather(forecast_timesteps, LOCATION, "Summary Weather Forecast")
+
+    benchmark(render)
+    output = rich_console.file.getvalue()
+    assert "Thunder" in output and "in the wettest 6 hours" in output
+
+
+def test_fetch_uncertainty(offline, view_time_series):
+    filtered = fetch_and_filter_forecast(
+        LOCATION, view_time_series["now"], keys=FORECAST_KEYS + UNCERTAINTY_KEYS
+    )
+    assert all(
+        values[field] is not None
+        for values in filtered.values()
+        for field in UNCERTAINTY_FIELDS
+    )
+
+
+def test_snapshot_exports_uncertainty(offline, tmp_path, complete_forecast):
+    runner = CliRunner()
+    assert runner.invoke(app, ["now", "stellenbosch", "--uncertainty"]).exit_code == 0
+    assert (
+        runner.invoke(app, ["snapshot", str(tmp_path / "cli.snapshot")]).exit_code == 0
+    )
+
+    with ForecastSnapshot(tmp_path / "cli.snapshot") as snapshot:
+        values = snapshot.get_values(
+            float(LOCATION["lat"]),
+            float(LOCATION["lon"]),
+            forecast_times(complete_forecast)[1],
+        )
+    assert not any(math.isnan(values[field]) for field in UNCERTAINTY_FIELDS)
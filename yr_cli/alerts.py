@@ -0,0 +1,305 @@
+import hashlib
+import json
+import operator
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, TypedDict
+
+from .cache import get_location_forecast_points
+from .locationforecast.data import DEFAULT_REUSE_RADIUS_KM
+from .locationforecast.derived import DERIVED, derive_metrics, derived_names
+from .locationforecast.parsed import (
+    ParsedSteps,
+    get_parsed_forecasts,
+    store_parsed_forecasts,
+)
+from .locationforecast.type import METJSONForecast
+from .store import get_stored_versions, iter_stored_forecasts_by_key
+
+ALERTS_DB = Path.home() / ".yr_cli_alerts.sqlite"
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+# fields of a forecast step that hold text or other fields rather than a number
+NON_NUMERIC_FIELDS = {"symbol_code", "summary", "details", "instant", "data"}
+# leads the keys that rule values are kept parsed under, as they are stored by key path
+# rather than by field name like the steps parsed for views
+RULE_VALUES_KEY = "alerts"
+
+
+class AlertRule(TypedDict):
+    name: str
+    key: List[str]
+    op: Literal[">", ">=", "<", "<="]
+    threshold: float
+    hours: int
+
+
+def init_db():
+    with sqlite3.connect(ALERTS_DB) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alert_state (
+                query TEXT,
+                rules_hash TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (query, rules_hash)
+            )
+        """
+        )
+
+
+def load_rules(path: str) -> List[AlertRule]:
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} should hold a list of alert rules")
+    for index, rule in enumerate(rules):
+        missing = set(AlertRule.__annotations__) - set(rule)
+        if missing:
+            raise ValueError(
+                f"Alert rule {index} is missing {', '.join(sorted(missing))}"
+            )
+        if rule["op"] not in OPERATORS:
+            raise ValueError(
+                f"Alert rule {rule['name']!r} has unknown operator {rule['op']!r}"
+            )
+        if not isinstance(rule["key"], list):
+            rule["key"] = [rule["key"]]
+        if rule["key"][-1] in NON_NUMERIC_FIELDS:
+            raise ValueError(
+                f"Alert rule {rule['name']!r} compares {rule['key'][-1]!r}, "
+                "which is not a number"
+            )
+        threshold = rule["threshold"]
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)):
+            raise ValueError(
+                f"Alert rule {rule['name']!r} has a threshold {threshold!r}, "
+                "which is not a number"
+            )
+    return rules
+
+
+def evaluate_alerts(
+    rules: List[AlertRule],
+    only_changed: bool = True,
+    reuse_radius_km: float = DEFAULT_REUSE_RADIUS_KM,
+    now: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    Evaluate ``rules`` over the stored forecast of every cached location. Locations
+    whose stored forecast has expired are skipped until it is fetched again. Unless
+    ``only_changed`` is False, a location is also skipped when its forecast comes from
+    the same model run as the last time these rules were evaluated for it. Rules on a
+    field the stored forecast doesn't have are reported as unavailable for it.
+    """
+    if not rules:
+        return []
+    init_db()
+    now = now or datetime.now(timezone.utc)
+    rules_hash = hashlib.sha1(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+    versions = get_stored_versions()
+    with sqlite3.connect(ALERTS_DB) as conn:
+        evaluated = dict(
+            conn.execute(
+                "SELECT query, updated_at FROM alert_state WHERE rules_hash = ?",
+                (rules_hash,),
+            )
+        )
+    # locations near each other share a forecast point, which is only parsed once
+    sites_by_key = defaultdict(list)
+    for query, location, lat, lon in get_location_forecast_points(reuse_radius_km):
+        if (lat, lon) not in versions:
+            continue
+        product, updated_at = versions[(lat, lon)]
+        if only_changed and evaluated.get(query) == updated_at:
+            continue
+        sites_by_key[(lat, lon, product)].append((query, location))
+
+    # only the values the rules compare are decoded, once per model run
+    keys = [RULE_VALUES_KEY, *_rule_keys(rules)]
+    site_values = get_parsed_forecasts(
+        keys, [(*key, versions[key[:2]][1]) for key in sites_by_key]
+    )
+    parsed = []
+    for key, stored in iter_stored_forecasts_by_key(
+        key for key in sites_by_key if key not in site_values
+    ):
+        site_values[key] = extract_rule_values(stored.forecast, rules)
+        parsed.append((*key, stored.updated_at, site_values[key]))
+    store_parsed_forecasts(keys, parsed)
+
+    alerts = []
+    evaluated_sites = []
+    for key, sites in sites_by_key.items():
+        if key not in site_values:
+            continue
+        lat, lon, product = key
+        updated_at = versions[(lat, lon)][1]
+        matches = match_rules(site_values[key], rules, now)
+        # rules on fields the stored forecast doesn't have, such as those only in
+        # the complete product when compact is stored, are reported rather than
+        # never matching
+        available = set().union(*site_values[key].values())
+        matches.extend(
+            {"rule": rule["name"], "unavailable": _unavailable(rule, product)}
+            for rule in rules
+            if _path_name(rule["key"]) not in available
+        )
+        for query, location in sites:
+            evaluated_sites.append((query, rules_hash, updated_at))
+            alerts.extend(
+                {
+                    "location": query,
+                    "name": location.get("name", query),
+                    "lat": float(location["lat"]),
+                    "lon": float(location["lon"]),
+                    "updated_at": updated_at,
+                    **match,
+                }
+                for match in matches
+            )
+    with sqlite3.connect(ALERTS_DB) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO alert_state (query, rules_hash, updated_at) "
+            "VALUES (?, ?, ?)",
+            evaluated_sites,
+        )
+    return alerts
+
+
+def extract_rule_values(
+    forecast: METJSONForecast, rules: List[AlertRule]
+) -> ParsedSteps:
+    """
+    The numeric values at the keys of ``rules`` in every step of ``forecast``, keyed by
+    time and then by key path, leaving out those a step doesn't have and steps without
+    any.
+
+    >>> forecast = {"properties": {"timeseries": [
+    ...     {"time": "2024-01-01T00:00:00Z",
+    ...      "data": {"instant": {"details": {"air_temperature": 2.0}}}},
+    ... ]}}
+    >>> rules = [{"key": ["instant", "details", "air_temperature"]},
+    ...          {"key": ["instant", "details", "wind_speed_of_gust"]}]
+    >>> extract_rule_values(forecast, rules)
+    {'2024-01-01T00:00:00Z': {'instant/details/air_temperature': 2.0}}
+    """
+    keys = _rule_keys(rules)
+    timeseries = forecast["properties"]["timeseries"]
+    names = derived_names(keys)
+    # derived metrics are computed column by column rather than on a copy of the steps
+    derived = (
+        derive_metrics(
+            [timestep["data"]["instant"]["details"] for timestep in timeseries], names
+        )
+        if names
+        else {}
+    )
+    fields = [(_path_name(key), key) for key in keys if key[-1] not in derived]
+    steps = {}
+    for index, timestep in enumerate(timeseries):
+        values = {}
+        for name, key in fields:
+            value = timestep["data"]
+            try:
+                for part in key:
+                    value = value[part]
+            except (KeyError, TypeError):
+                continue
+            # fields that aren't numbers in this step, such as null, never match
+            if isinstance(value, (int, float)):
+                values[name] = value
+        for metric, column in derived.items():
+            if column[index] is not None:
+                values[_path_name([DERIVED, metric])] = column[index]
+        if values:
+            steps[timestep["time"]] = values
+    return steps
+
+
+def match_rules(
+    steps: ParsedSteps, rules: List[AlertRule], now: datetime
+) -> List[dict]:
+    """
+    The rules that the values of ``steps``, as from ``extract_rule_values``, meet within
+    their window from the current hour, each with the first matching time, the most
+    extreme value and the number of matching steps.
+
+    >>> steps = {
+    ...     f"2024-01-01T{hour:0>2}:00:00Z": {"instant/details/air_temperature": 2.0 - hour}
+    ...     for hour in range(6)
+    ... }
+    >>> rule = {"name": "frost", "key": ["instant", "details", "air_temperature"],
+    ...         "op": "<", "threshold": 0, "hours": 5}
+    >>> match_rules(steps, [rule], datetime(2024, 1, 1, 0, 30, tzinfo=timezone.utc))
+    [{'rule': 'frost', 'time': '2024-01-01T03:00:00Z', 'value': -2.0, 'steps': 2}]
+    >>> match_rules(steps, [], datetime(2024, 1, 1, tzinfo=timezone.utc))
+    []
+    """
+    if not rules:
+        return []
+    # MET times are all UTC in the same format, so compare them as strings
+    start = now.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    ends = [
+        (start + timedelta(hours=rule["hours"])).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for rule in rules
+    ]
+    start_time = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+    timeseries = sorted(
+        (time, values)
+        for time, values in steps.items()
+        if start_time <= time < max(ends)
+    )
+    matches: Dict[str, dict] = {}
+    for rule, end in zip(rules, ends):
+        compare = OPERATORS[rule["op"]]
+        name = _path_name(rule["key"])
+        for time, values in timeseries:
+            if time >= end:
+                break
+            value = values.get(name)
+            if value is None or not compare(value, rule["threshold"]):
+                continue
+            match = matches.get(rule["name"])
+            if match is None:
+                match = matches[rule["name"]] = {
+                    "rule": rule["name"],
+                    "time": time,
+                    "value": value,
+                    "steps": 0,
+                }
+            # the highest value for upper thresholds, the lowest for lower ones
+            elif compare(value, match["value"]):
+                match["value"] = value
+            match["steps"] += 1
+    return list(matches.values())
+
+
+def _rule_keys(rules: List[AlertRule]) -> List[List[str]]:
+    """
+    >>> _rule_keys([{"key": ["a", "b"]}, {"key": ["c"]}, {"key": ["a", "b"]}])
+    [['a', 'b'], ['c']]
+    """
+    keys = []
+    for rule in rules:
+        if rule["key"] not in keys:
+            keys.append(rule["key"])
+    return keys
+
+
+def _path_name(key: List[str]) -> str:
+    return "/".join(key)
+
+
+def _unavailable(rule: AlertRule, product: str) -> str:
+    """
+    >>> _unavailable({"key": ["instant", "details", "wind_speed_of_gust"]}, "compact")
+    'instant/details/wind_speed_of_gust is not in the stored compact forecast'
+    """
+    return f"{_path_name(rule['key'])} is not in the stored {product} forecast"
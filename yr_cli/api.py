@@ -1,17 +1,32 @@
+import sqlite3
+import time
 from datetime import timedelta
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import List
+from typing import List, Literal, Optional, Tuple
 from urllib.parse import quote_plus
 
 import requests
 from requests_cache import CachedSession
 
+from .archive import archive_forecast
 from .locationforecast.type import METJSONForecast
+from .nowcast.type import METJSONNowcast
+from .ratelimit import mount_rate_limiter
+from .store import (
+    get_stored_forecast,
+    get_stored_version,
+    refresh_stored_forecast,
+    store_forecast,
+)
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-MET_FORECAST_URL = "https://api.met.no/weatherapi/locationforecast/2.0/complete"
+MET_FORECAST_URL = "https://api.met.no/weatherapi/locationforecast/2.0"
+MET_NOWCAST_URL = "https://api.met.no/weatherapi/nowcast/2.0/complete"
 USER_AGENT_HEADER = {"User-Agent": "YrCLI/0.1 github.com/yr-cli"}
-MET_CACHE_PATH = (Path.home() / ".met_cache.sqlite").as_posix()
+MET_DEFAULT_EXPIRE_AFTER = timedelta(days=1)
+MET_NOWCAST_CACHE_PATH = (Path.home() / ".met_nowcast_cache.sqlite").as_posix()
+NOWCAST_TIMEOUT_SECONDS = 5
 
 
 def get_openstreetmap_locations(
@@ -22,20 +37,96 @@ def get_openstreetmap_locations(
         "format": "json",
         "limit": limit,
         "countrycodes": country_code,
+        # includes the population of places, used to rank them
+        "extratags": 1,
     }
-    response = requests.get(NOMINATIM_URL, params=params, headers=USER_AGENT_HEADER)
+    session = mount_rate_limiter(requests.Session())
+    response = session.get(NOMINATIM_URL, params=params, headers=USER_AGENT_HEADER)
     response.raise_for_status()
     return response.json()
 
 
-def get_location_forecast(lat: float, lon: float) -> METJSONForecast:
-    session = CachedSession(
-        MET_CACHE_PATH,
-        cache_control=True,
-        expire_after=timedelta(days=1),
-    )
+def get_location_forecast(
+    lat: float, lon: float, product: Literal["compact", "complete"] = "complete"
+) -> METJSONForecast:
+    stored = get_stored_forecast(lat, lon, product)
+    if product == "compact" and not (stored and stored.is_fresh):
+        # a fresh stored complete forecast has every field of the compact one
+        stored_complete = get_stored_forecast(lat, lon, "complete")
+        if stored_complete and stored_complete.is_fresh:
+            return stored_complete.forecast
+    if stored and stored.is_fresh:
+        return stored.forecast
+
+    session = mount_rate_limiter(requests.Session())
     params = {"lat": lat, "lon": lon}
-    response = session.get(MET_FORECAST_URL, params=params, headers=USER_AGENT_HEADER)
+    headers = dict(USER_AGENT_HEADER)
+    if stored and stored.last_modified:
+        # MET asks clients to revalidate rather than refetch unchanged forecasts
+        headers["If-Modified-Since"] = stored.last_modified
+    response = session.get(
+        f"{MET_FORECAST_URL}/{product}", params=params, headers=headers
+    )
+    if response.status_code == 304 and stored:
+        refresh_stored_forecast(lat, lon, product, _get_expires(response))
+        return stored.forecast
     response.raise_for_status()
     location_forecast: METJSONForecast = response.json()
+    store_forecast(
+        lat,
+        lon,
+        product,
+        location_forecast,
+        expires=_get_expires(response),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    try:
+        archive_forecast(lat, lon, product, location_forecast)
+    except (sqlite3.Error, OSError):
+        # the archive only serves history, so failing to write it, such as while
+        # another process holds the partition, mustn't fail the fetch
+        pass
     return location_forecast
+
+
+def get_fresh_forecast_version(
+    lat: float, lon: float, product: Literal["compact", "complete"] = "complete"
+) -> Optional[Tuple[str, str]]:
+    """
+    The product and model run ``get_location_forecast`` would return from the store
+    without a request, or None if it would make one.
+    """
+    products = [product, "complete"] if product == "compact" else [product]
+    for stored_product in products:
+        version = get_stored_version(lat, lon, stored_product)
+        if version and version[1] > time.time():
+            return stored_product, version[0]
+    return None
+
+
+def get_nowcast(lat: float, lon: float) -> METJSONNowcast:
+    # nowcasts are updated every five minutes, so keep them out of the forecast cache
+    session = mount_rate_limiter(
+        CachedSession(
+            MET_NOWCAST_CACHE_PATH,
+            cache_control=True,
+            expire_after=timedelta(minutes=5),
+        )
+    )
+    params = {"lat": lat, "lon": lon}
+    response = session.get(
+        MET_NOWCAST_URL,
+        params=params,
+        headers=USER_AGENT_HEADER,
+        timeout=NOWCAST_TIMEOUT_SECONDS,
+    )
+    response.raise_for_status()
+    nowcast: METJSONNowcast = response.json()
+    return nowcast
+
+
+def _get_expires(response: requests.Response) -> float:
+    try:
+        return parsedate_to_datetime(response.headers["Expires"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time() + MET_DEFAULT_EXPIRE_AFTER.total_seconds()
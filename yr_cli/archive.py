@@ -0,0 +1,239 @@
+"""
+Archive of every model run fetched, for looking back at forecasts as they were issued.
+
+Runs are partitioned into a SQLite file per UTC day they were issued on. A lookup opens
+the partitions of its issue day and the days before it, latest first, until one holds a
+run for its point, and looks back at most ``MAX_LOOKBACK_DAYS`` however long the
+archive grows. Each step is a row keyed by (lat, lon, issued_at, valid_at) holding its
+data as JSON, compressed with a preset dictionary of a typical step since single steps
+are too small for zlib to find much repetition in.
+"""
+
+import json
+import sqlite3
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from .locationforecast.type import METJSONForecast
+
+ARCHIVE_DIR = Path.home() / ".yr_cli_archive"
+# partitions of another format are skipped, as their steps can't be decompressed
+ARCHIVE_FORMAT = 1
+COMPRESSION_LEVEL = 6
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# partitions of days longer than this before a lookup's issue day aren't searched
+MAX_LOOKBACK_DAYS = 31
+# the preset dictionary of format 1, which must not change once steps are written
+ZDICT = json.dumps(
+    {
+        "instant": {
+            "details": {
+                "air_pressure_at_sea_level": 1016.2,
+                "air_temperature": 20.6,
+                "air_temperature_percentile_10": 19.3,
+                "air_temperature_percentile_90": 21.8,
+                "cloud_area_fraction": 76.4,
+                "cloud_area_fraction_high": 25.2,
+                "cloud_area_fraction_low": 26.9,
+                "cloud_area_fraction_medium": 19.0,
+                "dew_point_temperature": 11.4,
+                "fog_area_fraction": 0.0,
+                "relative_humidity": 54.2,
+                "ultraviolet_index_clear_sky": 2.1,
+                "wind_from_direction": 20,
+                "wind_speed": 7.1,
+                "wind_speed_of_gust": 11.4,
+                "wind_speed_percentile_10": 5.0,
+                "wind_speed_percentile_90": 9.3,
+            }
+        },
+        "next_1_hours": {
+            "summary": {"symbol_code": "fair_day"},
+            "details": {
+                "precipitation_amount": 0.0,
+                "precipitation_amount_max": 0.0,
+                "precipitation_amount_min": 0.0,
+                "probability_of_precipitation": 3.6,
+                "probability_of_thunder": 0.2,
+            },
+        },
+        "next_6_hours": {
+            "summary": {"symbol_code": "fair_day"},
+            "details": {
+                "air_temperature_max": 22.6,
+                "air_temperature_min": 18.6,
+                "precipitation_amount": 0.0,
+                "precipitation_amount_max": 0.0,
+                "precipitation_amount_min": 0.0,
+                "probability_of_precipitation": 14.4,
+                "probability_of_thunder": 1.0,
+                "ultraviolet_index_clear_sky_max": 3.1,
+            },
+        },
+        "next_12_hours": {
+            "summary": {"symbol_code": "fair_day"},
+            "details": {"probability_of_precipitation": 100},
+        },
+    },
+    separators=(",", ":"),
+).encode()
+
+
+class ArchivedForecast(NamedTuple):
+    lat: float
+    lon: float
+    product: str
+    issued_at: datetime
+    # the archived steps as a forecast, without units
+    forecast: METJSONForecast
+
+
+def init_db(partition: Path):
+    partition.parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(partition) as conn:
+        conn.execute(f"PRAGMA user_version = {ARCHIVE_FORMAT}")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS steps (
+                lat REAL,
+                lon REAL,
+                issued_at TEXT,
+                valid_at TEXT,
+                product TEXT,
+                data BLOB,
+                PRIMARY KEY (lat, lon, issued_at, valid_at)
+            ) WITHOUT ROWID
+        """
+        )
+
+
+def archive_forecast(lat: float, lon: float, product: str, forecast: METJSONForecast):
+    """
+    Add the steps of a model run to the archive. Steps already archived for the run
+    are kept as they are, unless they are compact and these are complete, which has
+    every field of compact.
+    """
+    issued_at = forecast["properties"]["meta"]["updated_at"]
+    partition = _partition_path(issued_at[:10])
+    init_db(partition)
+    rows = [
+        (lat, lon, issued_at, timestep["time"], product, _compress(timestep["data"]))
+        for timestep in forecast["properties"]["timeseries"]
+    ]
+    with sqlite3.connect(partition) as conn:
+        conn.executemany(
+            "INSERT INTO steps (lat, lon, issued_at, valid_at, product, data) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (lat, lon, issued_at, valid_at) DO UPDATE SET "
+            "product = excluded.product, data = excluded.data "
+            "WHERE excluded.product = 'complete' AND product = 'compact'",
+            rows,
+        )
+
+
+def get_archived_forecast(
+    lat: float,
+    lon: float,
+    issued_at: datetime,
+    valid_from: Optional[datetime] = None,
+    valid_to: Optional[datetime] = None,
+) -> Optional[ArchivedForecast]:
+    """
+    The latest run for a point issued at or before ``issued_at``, with its steps valid
+    between ``valid_from`` and ``valid_to``, or None if none is archived.
+    """
+    issued = _to_timestamp(issued_at)
+    for partition in _partitions_until(issued_at.astimezone(timezone.utc).date()):
+        with sqlite3.connect(partition) as conn:
+            row = conn.execute(
+                "SELECT MAX(issued_at) FROM steps "
+                "WHERE lat = ? AND lon = ? AND issued_at <= ?",
+                (lat, lon, issued),
+            ).fetchone()
+            if row[0] is None:
+                continue
+            rows = conn.execute(
+                "SELECT valid_at, product, data FROM steps "
+                "WHERE lat = ? AND lon = ? AND issued_at = ? "
+                "AND valid_at >= ? AND valid_at <= ? ORDER BY valid_at",
+                (
+                    lat,
+                    lon,
+                    row[0],
+                    _to_timestamp(valid_from) if valid_from else "",
+                    _to_timestamp(valid_to) if valid_to else "~",
+                ),
+            ).fetchall()
+        return ArchivedForecast(
+            lat,
+            lon,
+            # the product of the first step archived, as a run is normally from one
+            rows[0][1] if rows else "",
+            _from_timestamp(row[0]),
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {
+                    "meta": {"updated_at": row[0]},
+                    "timeseries": [
+                        {"time": valid_at, "data": _decompress(data)}
+                        for valid_at, _, data in rows
+                    ],
+                },
+            },
+        )
+    return None
+
+
+def _partition_path(day: str) -> Path:
+    return ARCHIVE_DIR / f"{day}.sqlite"
+
+
+def _partitions_until(day: date) -> Iterator[Path]:
+    """
+    Readable partitions of ``day`` and the ``MAX_LOOKBACK_DAYS`` days before, latest
+    first.
+    """
+    for days_before in range(MAX_LOOKBACK_DAYS + 1):
+        partition = _partition_path(f"{day - timedelta(days=days_before):%Y-%m-%d}")
+        if _is_readable(partition):
+            yield partition
+
+
+def _is_readable(partition: Path) -> bool:
+    if not partition.is_file():
+        return False
+    with sqlite3.connect(partition) as conn:
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+    return version == ARCHIVE_FORMAT
+
+
+def _compress(data: dict) -> bytes:
+    """
+    >>> _decompress(_compress({"instant": {"details": {"air_temperature": 4.5}}}))
+    {'instant': {'details': {'air_temperature': 4.5}}}
+    """
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=ZDICT)
+    return (
+        compressor.compress(json.dumps(data, separators=(",", ":")).encode())
+        + compressor.flush()
+    )
+
+
+def _decompress(data: bytes) -> dict:
+    decompressor = zlib.decompressobj(zdict=ZDICT)
+    return json.loads(decompressor.decompress(data) + decompressor.flush())
+
+
+def _to_timestamp(time: datetime) -> str:
+    return time.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def _from_timestamp(timestamp: str) -> datetime:
+    """
+    >>> _from_timestamp("2024-06-21T06:15:32Z")
+    datetime.datetime(2024, 6, 21, 6, 15, 32, tzinfo=datetime.timezone.utc)
+    """
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
@@ -1,9 +1,14 @@
 import json
 import sqlite3
+from collections import defaultdict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+from .db import migrate
+from .geo import geohash_cells, geohash_encode, haversine_km
 
 CACHE_DB = Path.home() / ".yr_cli_cache.sqlite"
+SCHEMA_VERSION = 1
 
 
 def init_db():
@@ -17,6 +22,53 @@ def init_db():
             )
         """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS location_points (
+                query TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                geohash TEXT
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS forecast_points (
+                lat REAL,
+                lon REAL,
+                geohash TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (lat, lon)
+            )
+        """
+        )
+        for table in ("location_points", "forecast_points"):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_geohash ON {table} (geohash)"
+            )
+        migrate(conn, SCHEMA_VERSION, _migrate)
+
+
+def _migrate(conn: sqlite3.Connection, version: int):
+    if version < 1:
+        # index locations cached before location_points existed
+        conn.create_function("geohash", 2, geohash_encode, deterministic=True)
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO location_points (query, lat, lon, geohash)
+            SELECT query, lat, lon, geohash(lat, lon)
+            FROM (
+                -- Nominatim gives coordinates as strings
+                SELECT
+                    query,
+                    CAST(json_extract(location_data, '$.lat') AS REAL) AS lat,
+                    CAST(json_extract(location_data, '$.lon') AS REAL) AS lon
+                FROM locations
+            )
+            WHERE query NOT IN (SELECT query FROM location_points)
+        """
+        )
 
 
 def get_cached_location(query: str) -> Optional[dict]:
@@ -33,6 +85,25 @@ def get_cached_location(query: str) -> Optional[dict]:
     return None
 
 
+def get_cached_locations(queries: List[str]) -> Dict[str, dict]:
+    """Cached locations for many queries over a single connection."""
+    init_db()
+    cached_locations = {}
+    unique_queries = list(dict.fromkeys(queries))
+    with sqlite3.connect(CACHE_DB) as conn:
+        # stay well within SQLite's limit on query parameters
+        for start in range(0, len(unique_queries), 500):
+            chunk = unique_queries[start : start + 500]
+            rows = conn.execute(
+                "SELECT query, json(location_data) FROM locations "
+                f"WHERE query IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            for query, location_data in rows:
+                cached_locations[query] = json.loads(location_data)
+    return cached_locations
+
+
 def cache_location(query: str, location: dict):
     init_db()
     with sqlite3.connect(CACHE_DB) as conn:
@@ -40,10 +111,126 @@ def cache_location(query: str, location: dict):
             "INSERT OR REPLACE INTO locations (query, location_data) VALUES (?, json(?))",
             (query, json.dumps(location)),
         )
+        lat, lon = float(location["lat"]), float(location["lon"])
+        conn.execute(
+            "INSERT OR REPLACE INTO location_points (query, lat, lon, geohash) "
+            "VALUES (?, ?, ?, ?)",
+            (query, lat, lon, geohash_encode(lat, lon)),
+        )
+
+
+def cache_forecast_point(lat: float, lon: float):
+    init_db()
+    with sqlite3.connect(CACHE_DB) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO forecast_points (lat, lon, geohash) VALUES (?, ?, ?)",
+            (lat, lon, geohash_encode(lat, lon)),
+        )
+
+
+def get_nearby_locations(
+    lat: float, lon: float, radius_km: float
+) -> List[Tuple[float, str, dict]]:
+    """Cached locations within ``radius_km`` as (distance, query, location), nearest first."""
+    init_db()
+    with sqlite3.connect(CACHE_DB) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = _query_nearby(
+            conn,
+            "SELECT location_points.lat, location_points.lon, location_points.query, "
+            "json(location_data) AS location_data FROM location_points "
+            "JOIN locations USING (query)",
+            lat,
+            lon,
+            radius_km,
+        )
+        return [
+            (distance, row["query"], json.loads(row["location_data"]))
+            for distance, row in rows
+        ]
+
+
+def get_nearby_forecast_points(
+    lat: float, lon: float, radius_km: float
+) -> List[Tuple[float, float, float]]:
+    """Points with cached forecasts within ``radius_km`` as (distance, lat, lon)."""
+    init_db()
+    with sqlite3.connect(CACHE_DB) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = _query_nearby(
+            conn, "SELECT lat, lon FROM forecast_points", lat, lon, radius_km
+        )
+        return [(distance, row["lat"], row["lon"]) for distance, row in rows]
+
+
+def get_location_forecast_points(
+    radius_km: float,
+) -> List[Tuple[str, dict, float, float]]:
+    """
+    Every cached location with the nearest point within ``radius_km`` that has a cached
+    forecast, as (query, location, lat, lon). Locations without one are left out.
+    """
+    init_db()
+    location_forecast_points = []
+    with sqlite3.connect(CACHE_DB) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT query, lat, lon, json(location_data) AS location_data "
+            "FROM location_points JOIN locations USING (query) ORDER BY query"
+        ).fetchall()
+        # the geohash cells around every location, looked up in a single query
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS nearby_cells (query TEXT, low TEXT, high TEXT)"
+        )
+        conn.execute("DELETE FROM nearby_cells")
+        conn.executemany(
+            "INSERT INTO nearby_cells (query, low, high) VALUES (?, ?, ?)",
+            (
+                (row["query"], cell, cell + "~")
+                for row in rows
+                for cell in geohash_cells(row["lat"], row["lon"], radius_km)
+            ),
+        )
+        candidates = defaultdict(list)
+        for query, lat, lon in conn.execute(
+            "SELECT nearby_cells.query, forecast_points.lat, forecast_points.lon "
+            "FROM nearby_cells JOIN forecast_points "
+            "ON forecast_points.geohash >= nearby_cells.low "
+            "AND forecast_points.geohash < nearby_cells.high"
+        ):
+            candidates[query].append((lat, lon))
+    for row in rows:
+        distances = [
+            (haversine_km(row["lat"], row["lon"], lat, lon), lat, lon)
+            for lat, lon in candidates[row["query"]]
+        ]
+        distances = [item for item in distances if item[0] <= radius_km]
+        if distances:
+            _, lat, lon = min(distances)
+            location_forecast_points.append(
+                (row["query"], json.loads(row["location_data"]), lat, lon)
+            )
+    return location_forecast_points
 
 
 def clear_cache():
     init_db()
     with sqlite3.connect(CACHE_DB) as conn:
         conn.execute("DELETE FROM locations")
+        conn.execute("DELETE FROM location_points")
+        conn.execute("DELETE FROM forecast_points")
     return True
+
+
+def _query_nearby(
+    conn: sqlite3.Connection, select: str, lat: float, lon: float, radius_km: float
+) -> List[Tuple[float, sqlite3.Row]]:
+    # geohash prefixes of neighbouring cells give index range scans on the geohash column
+    cells = geohash_cells(lat, lon, radius_km)
+    ranges = " OR ".join("(geohash >= ? AND geohash < ?)" for _ in cells)
+    params = [bound for cell in cells for bound in (cell, cell + "~")]
+    rows = conn.execute(f"{select} WHERE {ranges}", params).fetchall()
+    distances = [(haversine_km(lat, lon, row["lat"], row["lon"]), row) for row in rows]
+    return sorted(
+        (item for item in distances if item[0] <= radius_km), key=lambda item: item[0]
+    )
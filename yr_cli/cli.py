@@ -1,13 +1,56 @@
-from typing import Optional
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
 
 import typer
 
-from .commands import now_command, summary_command, weekend_command
-from .interface import display_clear_cache
+from .commands import (
+    alerts_command,
+    compare_command,
+    history_command,
+    nearby_command,
+    now_command,
+    resolve_command,
+    snapshot_command,
+    summary_command,
+    weekend_command,
+)
+from .interface import display_clear_cache, display_rate_limits
+from .locationforecast.data import DEFAULT_REUSE_RADIUS_KM
+from .ratelimit import get_rate_limit_stats
+from .resolve import DEFAULT_MIN_CONFIDENCE
 
 app = typer.Typer()
 
 
+class PickOption(str, Enum):
+    """The pick policies of ``resolve.PICK_POLICIES``."""
+
+    prompt = "prompt"
+    best = "best"
+    first = "first"
+
+
+class UnattendedPickOption(str, Enum):
+    """The pick policies of ``resolve.UNATTENDED_PICK_POLICIES``."""
+
+    best = "best"
+    first = "first"
+
+
+PICK_HELP = (
+    "How to choose between matching locations: prompt, best or first "
+    "(default: prompt in a terminal, best otherwise)"
+)
+UNATTENDED_PICK_HELP = "How to choose between matching locations: best or first"
+MIN_CONFIDENCE_HELP = "Lead the best location needs over the next to be picked"
+TIME_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M"]
+UNCERTAINTY_HELP = "Show the likely ranges of rain and temperature for each day"
+FEELS_LIKE_HELP = (
+    "Show what the temperature feels like, accounting for humidity and wind"
+)
+
+
 @app.command(help="Detailed forecast for the next 24 hours")
 def now(
     location: Optional[str] = typer.Argument(None),
@@ -19,6 +62,17 @@ def now(
     show_map: bool = typer.Option(
         False, "--map", "-m", help="Show a map of the selected location"
     ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Reuse cached forecasts within this many km"
+    ),
+    pick: Optional[PickOption] = typer.Option(None, help=PICK_HELP),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+    uncertainty: bool = typer.Option(
+        False, "--uncertainty", "-u", help=UNCERTAINTY_HELP
+    ),
+    feels_like: bool = typer.Option(False, "--feels-like", "-f", help=FEELS_LIKE_HELP),
 ):
     now_command(
         location=location,
@@ -26,6 +80,11 @@ def now(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        reuse_radius_km=reuse_radius,
+        pick=pick.value if pick else None,
+        min_confidence=min_confidence,
+        uncertainty=uncertainty,
+        feels_like=feels_like,
     )
 
 
@@ -41,6 +100,17 @@ def summary(
     show_map: bool = typer.Option(
         False, "--map", "-m", help="Show a map of the selected location"
     ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Reuse cached forecasts within this many km"
+    ),
+    pick: Optional[PickOption] = typer.Option(None, help=PICK_HELP),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+    uncertainty: bool = typer.Option(
+        False, "--uncertainty", "-u", help=UNCERTAINTY_HELP
+    ),
+    feels_like: bool = typer.Option(False, "--feels-like", "-f", help=FEELS_LIKE_HELP),
 ):
     summary_command(
         location=location,
@@ -49,6 +119,11 @@ def summary(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        reuse_radius_km=reuse_radius,
+        pick=pick.value if pick else None,
+        min_confidence=min_confidence,
+        uncertainty=uncertainty,
+        feels_like=feels_like,
     )
 
 
@@ -63,6 +138,17 @@ def weekend(
     show_map: bool = typer.Option(
         False, "--map", "-m", help="Show a map of the selected location"
     ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Reuse cached forecasts within this many km"
+    ),
+    pick: Optional[PickOption] = typer.Option(None, help=PICK_HELP),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+    uncertainty: bool = typer.Option(
+        False, "--uncertainty", "-u", help=UNCERTAINTY_HELP
+    ),
+    feels_like: bool = typer.Option(False, "--feels-like", "-f", help=FEELS_LIKE_HELP),
 ):
     weekend_command(
         location=location,
@@ -70,10 +156,172 @@ def weekend(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        reuse_radius_km=reuse_radius,
+        pick=pick.value if pick else None,
+        min_confidence=min_confidence,
+        uncertainty=uncertainty,
+        feels_like=feels_like,
+    )
+
+
+@app.command(help="Compare the forecasts of several locations over the next <hours>")
+def compare(
+    locations: List[str] = typer.Argument(..., help="Location names to compare"),
+    hours: int = typer.Option(24, help="Number of hours to compare"),
+    limit: int = typer.Option(10, help="Maximum number of location results"),
+    country_code: str = typer.Option("za", help="Country code for location search"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass cache and fetch fresh data"
+    ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Reuse cached forecasts within this many km"
+    ),
+    pick: UnattendedPickOption = typer.Option(
+        UnattendedPickOption.best, help=UNATTENDED_PICK_HELP
+    ),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+):
+    compare_command(
+        queries=locations,
+        hours=hours,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        reuse_radius_km=reuse_radius,
+        pick=pick.value,
+        min_confidence=min_confidence,
     )
 
 
-@app.command(help="Clear the cache of saved locations")
+@app.command(help="Cached locations and forecasts near a location")
+def nearby(
+    location: Optional[str] = typer.Argument(None),
+    radius: float = typer.Option(5.0, help="Search radius in km"),
+    limit: int = typer.Option(10, help="Maximum number of location results"),
+    country_code: str = typer.Option("za", help="Country code for location search"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass cache and fetch fresh data"
+    ),
+    show_map: bool = typer.Option(
+        False, "--map", "-m", help="Show a map of the selected location"
+    ),
+    pick: Optional[PickOption] = typer.Option(None, help=PICK_HELP),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+):
+    nearby_command(
+        location=location,
+        radius_km=radius,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        show_map=show_map,
+        pick=pick.value if pick else None,
+        min_confidence=min_confidence,
+    )
+
+
+@app.command(help="Resolve location names without prompting, as JSON lines")
+def resolve(
+    locations: List[str] = typer.Argument(..., help="Location names to resolve"),
+    limit: int = typer.Option(10, help="Maximum number of location results"),
+    country_code: str = typer.Option("za", help="Country code for location search"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass cache and fetch fresh data"
+    ),
+    pick: UnattendedPickOption = typer.Option(
+        UnattendedPickOption.best, help=UNATTENDED_PICK_HELP
+    ),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+):
+    resolve_command(
+        queries=locations,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        pick=pick.value,
+        min_confidence=min_confidence,
+    )
+
+
+@app.command(help="Evaluate alert rules over the cached forecasts of saved locations")
+def alerts(
+    rules: str = typer.Argument(..., help="JSON file with a list of alert rules"),
+    all_locations: bool = typer.Option(
+        False, "--all", help="Evaluate every location, not only updated forecasts"
+    ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Use cached forecasts within this many km"
+    ),
+):
+    alerts_command(
+        rules_path=rules,
+        only_changed=not all_locations,
+        reuse_radius_km=reuse_radius,
+    )
+
+
+@app.command(help="A forecast for a location as it was issued at a past time")
+def history(
+    location: Optional[str] = typer.Argument(None),
+    issued: Optional[datetime] = typer.Option(
+        None,
+        formats=TIME_FORMATS,
+        help="Show the latest forecast issued by this local time (default: now)",
+    ),
+    valid_from: Optional[datetime] = typer.Option(
+        None, "--from", formats=TIME_FORMATS, help="Only show steps from this time"
+    ),
+    valid_to: Optional[datetime] = typer.Option(
+        None, "--to", formats=TIME_FORMATS, help="Only show steps up to this time"
+    ),
+    as_json: bool = typer.Option(
+        False, "--json", help="Print every archived field of each step as JSON lines"
+    ),
+    limit: int = typer.Option(10, help="Maximum number of location results"),
+    country_code: str = typer.Option("za", help="Country code for location search"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass cache and fetch fresh data"
+    ),
+    reuse_radius: float = typer.Option(
+        DEFAULT_REUSE_RADIUS_KM, help="Use forecasts archived within this many km"
+    ),
+    pick: Optional[PickOption] = typer.Option(None, help=PICK_HELP),
+    min_confidence: float = typer.Option(
+        DEFAULT_MIN_CONFIDENCE, help=MIN_CONFIDENCE_HELP
+    ),
+):
+    history_command(
+        location=location,
+        issued=issued,
+        valid_from=valid_from,
+        valid_to=valid_to,
+        as_json=as_json,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        reuse_radius_km=reuse_radius,
+        pick=pick.value if pick else None,
+        min_confidence=min_confidence,
+    )
+
+
+@app.command(help="Export cached forecasts to a memory-mappable snapshot file")
+def snapshot(path: str = typer.Argument(..., help="Snapshot file to write")):
+    snapshot_command(path=path)
+
+
+@app.command(help="Request counters and current rates for upstream APIs")
+def rate_limits():
+    display_rate_limits(get_rate_limit_stats())
+
+
+@app.command(help="Clear the cache of saved locations and of parsed forecasts")
 def clear_cache():
     display_clear_cache()
 
@@ -1,14 +1,33 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from itertools import chain
+from typing import List, Optional
 
+from .alerts import evaluate_alerts, load_rules
+from .archive import get_archived_forecast
+from .cache import get_nearby_forecast_points, get_nearby_locations
+from .compare import compare_locations
 from .interface import (
-    display_weather,
+    console,
+    display_nearby,
     get_selected_location,
     handle_command_errors,
-    print_weather_table,
+    print_json_lines,
+    render_comparison,
+    render_forecast,
 )
-from .locationforecast.data import fetch_and_filter_forecast
-from .utils import get_output_method
+from .locationforecast.data import (
+    DERIVED_KEYS,
+    FEELS_LIKE_KEYS,
+    FORECAST_KEYS,
+    fetch_and_filter_forecast,
+    parse_forecast_steps,
+)
+from .locationforecast.snapshot import write_snapshot
+from .locationforecast.uncertainty import UNCERTAINTY_KEYS
+from .nowcast.data import fetch_nowcast_in_background, merge_nowcast
+from .resolve import PickPolicy, resolve_locations
+from .store import iter_stored_forecasts
+from .sun import is_daylight_batch
 
 
 @handle_command_errors
@@ -18,6 +37,11 @@ def now_command(
     country_code: str,
     no_cache: bool,
     show_map: bool,
+    reuse_radius_km: float,
+    pick: Optional[PickPolicy],
+    min_confidence: float,
+    uncertainty: bool,
+    feels_like: bool,
 ):
     selected_location = get_selected_location(
         location=location,
@@ -25,26 +49,34 @@ def now_command(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        pick=pick,
+        min_confidence=min_confidence,
     )
     if not selected_location:
         return
 
+    # fetched alongside the forecast, for high-resolution precipitation in the next hours
+    get_nowcast = fetch_nowcast_in_background(selected_location)
+
     now_dt = datetime.now().astimezone()
     start_time = now_dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
     time_series = [start_time + timedelta(hours=hours) for hours in range(25)]
 
     filtered_forecast_timesteps = fetch_and_filter_forecast(
-        selected_location, time_series
+        selected_location,
+        time_series,
+        keys=_forecast_keys(uncertainty, feels_like),
+        reuse_radius_km=reuse_radius_km,
+    )
+    filtered_forecast_timesteps = merge_nowcast(
+        filtered_forecast_timesteps, get_nowcast()
     )
 
-    if get_output_method() == "iterm2":
-        print_weather_table(filtered_forecast_timesteps)
-    else:
-        display_weather(
-            forecast_timesteps=filtered_forecast_timesteps,
-            selected_location=selected_location,
-            panel_title="24-Hour Weather Forecast",
-        )
+    render_forecast(
+        forecast_timesteps=filtered_forecast_timesteps,
+        selected_location=selected_location,
+        panel_title="24-Hour Weather Forecast",
+    )
 
 
 @handle_command_errors
@@ -55,6 +87,11 @@ def summary_command(
     country_code: str,
     no_cache: bool,
     show_map: bool,
+    reuse_radius_km: float,
+    pick: Optional[PickPolicy],
+    min_confidence: float,
+    uncertainty: bool,
+    feels_like: bool,
 ):
     selected_location = get_selected_location(
         location=location,
@@ -62,6 +99,8 @@ def summary_command(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        pick=pick,
+        min_confidence=min_confidence,
     )
     if not selected_location:
         return
@@ -89,17 +128,17 @@ def summary_command(
         )
 
     filtered_forecast_timesteps = fetch_and_filter_forecast(
-        selected_location, time_series
+        selected_location,
+        time_series,
+        keys=_forecast_keys(uncertainty, feels_like),
+        reuse_radius_km=reuse_radius_km,
     )
 
-    if get_output_method() == "iterm2":
-        print_weather_table(filtered_forecast_timesteps)
-    else:
-        display_weather(
-            forecast_timesteps=filtered_forecast_timesteps,
-            selected_location=selected_location,
-            panel_title="Summary Weather Forecast",
-        )
+    render_forecast(
+        forecast_timesteps=filtered_forecast_timesteps,
+        selected_location=selected_location,
+        panel_title="Summary Weather Forecast",
+    )
 
 
 @handle_command_errors
@@ -109,6 +148,11 @@ def weekend_command(
     country_code: str,
     no_cache: bool,
     show_map: bool,
+    reuse_radius_km: float,
+    pick: Optional[PickPolicy],
+    min_confidence: float,
+    uncertainty: bool,
+    feels_like: bool,
 ):
     selected_location = get_selected_location(
         location=location,
@@ -116,6 +160,8 @@ def weekend_command(
         country_code=country_code,
         no_cache=no_cache,
         show_map=show_map,
+        pick=pick,
+        min_confidence=min_confidence,
     )
     if not selected_location:
         return
@@ -161,14 +207,238 @@ def weekend_command(
         time_series.extend(hours_for_day)
 
     filtered_forecast_timesteps = fetch_and_filter_forecast(
-        selected_location, time_series
+        selected_location,
+        time_series,
+        keys=_forecast_keys(uncertainty, feels_like),
+        reuse_radius_km=reuse_radius_km,
+    )
+
+    render_forecast(
+        forecast_timesteps=filtered_forecast_timesteps,
+        selected_location=selected_location,
+        panel_title="Weekend Weather Forecast",
+    )
+
+
+@handle_command_errors
+def compare_command(
+    queries: List[str],
+    hours: int,
+    limit: int,
+    country_code: str,
+    no_cache: bool,
+    reuse_radius_km: float,
+    pick: PickPolicy,
+    min_confidence: float,
+):
+    resolutions = resolve_locations(
+        queries,
+        limit=limit,
+        country_code=country_code,
+        policy=pick,
+        min_confidence=min_confidence,
+        no_cache=no_cache,
+    )
+    unresolved = [
+        resolution.query for resolution in resolutions if resolution.location is None
+    ]
+    if unresolved:
+        console.print(
+            "[bold red]Error:[/bold red] No single location found for "
+            f"{', '.join(repr(query) for query in unresolved)}. "
+            "Try more specific names."
+        )
+        return
+
+    comparison = compare_locations(
+        [resolution.location for resolution in resolutions],
+        hours=hours,
+        reuse_radius_km=reuse_radius_km,
+    )
+    render_comparison(
+        comparison,
+        names=[
+            resolution.location.get("name") or resolution.query
+            for resolution in resolutions
+        ],
+        panel_title=f"{hours}-Hour Weather Comparison",
+    )
+
+
+@handle_command_errors
+def nearby_command(
+    location: Optional[str],
+    radius_km: float,
+    limit: int,
+    country_code: str,
+    no_cache: bool,
+    show_map: bool,
+    pick: Optional[PickPolicy],
+    min_confidence: float,
+):
+    selected_location = get_selected_location(
+        location=location,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        show_map=show_map,
+        pick=pick,
+        min_confidence=min_confidence,
+    )
+    if not selected_location:
+        return
+
+    lat, lon = float(selected_location["lat"]), float(selected_location["lon"])
+    display_nearby(
+        selected_location=selected_location,
+        radius_km=radius_km,
+        nearby_locations=get_nearby_locations(lat, lon, radius_km),
+        nearby_forecast_points=get_nearby_forecast_points(lat, lon, radius_km),
+    )
+
+
+@handle_command_errors
+def history_command(
+    location: Optional[str],
+    issued: Optional[datetime],
+    valid_from: Optional[datetime],
+    valid_to: Optional[datetime],
+    as_json: bool,
+    limit: int,
+    country_code: str,
+    no_cache: bool,
+    reuse_radius_km: float,
+    pick: Optional[PickPolicy],
+    min_confidence: float,
+):
+    selected_location = get_selected_location(
+        location=location,
+        limit=limit,
+        country_code=country_code,
+        no_cache=no_cache,
+        show_map=False,
+        pick=pick,
+        min_confidence=min_confidence,
+    )
+    if not selected_location:
+        return
+
+    lat, lon = float(selected_location["lat"]), float(selected_location["lon"])
+    nearby_forecast_points = get_nearby_forecast_points(lat, lon, reuse_radius_km)
+    if nearby_forecast_points:
+        # forecasts are archived for the point they were fetched for
+        _, lat, lon = nearby_forecast_points[0]
+    issued = (issued or datetime.now()).astimezone()
+    archived = get_archived_forecast(
+        lat,
+        lon,
+        issued,
+        valid_from=valid_from and valid_from.astimezone(),
+        valid_to=valid_to and valid_to.astimezone(),
+    )
+    if archived is None:
+        console.print(
+            "[bold red]Error:[/bold red] No forecast archived for "
+            f"{selected_location['name']} issued by {issued:%Y-%m-%d %H:%M}."
+        )
+        return
+
+    timeseries = archived.forecast["properties"]["timeseries"]
+    if as_json:
+        print_json_lines(
+            [
+                {
+                    "issued_at": archived.forecast["properties"]["meta"]["updated_at"],
+                    "time": timestep["time"],
+                    **timestep["data"],
+                }
+                for timestep in timeseries
+            ]
+        )
+        return
+
+    filtered_forecast_timesteps = {
+        datetime.fromisoformat(timestamp).astimezone(): values
+        for timestamp, values in parse_forecast_steps(
+            archived.forecast, FORECAST_KEYS
+        ).items()
+    }
+    # steps missing the displayed values, such as the last six-hourly ones, are left out
+    if not filtered_forecast_timesteps:
+        console.print("No archived forecast steps in that time range.")
+        return
+    (daylight,) = is_daylight_batch([(lat, lon)], list(filtered_forecast_timesteps))
+    for values, is_day in zip(filtered_forecast_timesteps.values(), daylight):
+        values["is_day"] = is_day
+    render_forecast(
+        forecast_timesteps=filtered_forecast_timesteps,
+        selected_location=selected_location,
+        panel_title=(
+            f"Forecast issued {archived.issued_at.astimezone():%A %d. %B %H:%M}"
+        ),
+    )
+
+
+@handle_command_errors
+def snapshot_command(path: str):
+    # complete forecasts come last so they win over compact ones for a location
+    forecasts = chain(
+        iter_stored_forecasts("compact"), iter_stored_forecasts("complete")
+    )
+    # uncertainty fields and gusts missing from compact forecasts are stored as NaN
+    location_count = write_snapshot(
+        path, forecasts, keys=FORECAST_KEYS + UNCERTAINTY_KEYS + DERIVED_KEYS
     )
+    console.print(
+        f"[bold green]Wrote forecasts for {location_count} locations to {path}"
+        "[/bold green]"
+    )
+
 
-    if get_output_method() == "iterm2":
-        print_weather_table(filtered_forecast_timesteps)
-    else:
-        display_weather(
-            forecast_timesteps=filtered_forecast_timesteps,
-            selected_location=selected_location,
-            panel_title="Weekend Weather Forecast",
+@handle_command_errors
+def alerts_command(rules_path: str, only_changed: bool, reuse_radius_km: float):
+    rules = load_rules(rules_path)
+    print_json_lines(
+        evaluate_alerts(
+            rules, only_changed=only_changed, reuse_radius_km=reuse_radius_km
         )
+    )
+
+
+@handle_command_errors
+def resolve_command(
+    queries: List[str],
+    limit: int,
+    country_code: str,
+    no_cache: bool,
+    pick: PickPolicy,
+    min_confidence: float,
+):
+    resolutions = resolve_locations(
+        queries,
+        limit=limit,
+        country_code=country_code,
+        policy=pick,
+        min_confidence=min_confidence,
+        no_cache=no_cache,
+    )
+    print_json_lines(
+        [
+            {
+                "query": resolution.query,
+                "name": location and location.get("name"),
+                "display_name": location and location.get("display_name"),
+                "lat": location and float(location["lat"]),
+                "lon": location and float(location["lon"]),
+                "confidence": round(resolution.confidence, 3),
+            }
+            for resolution in resolutions
+            for location in [resolution.location]
+        ]
+    )
+
+
+def _forecast_keys(uncertainty: bool, feels_like: bool) -> List[str | List[str]]:
+    # uncertainty is filtered in the same pass, but needs the complete product
+    keys = FORECAST_KEYS + UNCERTAINTY_KEYS if uncertainty else FORECAST_KEYS
+    return keys + FEELS_LIKE_KEYS if feels_like else keys
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .locationforecast.data import (
+    DEFAULT_REUSE_RADIUS_KM,
+    FORECAST_KEYS,
+    fetch_forecast_steps,
+    select_forecast_steps,
+)
+from .locationforecast.parsed import ParsedSteps
+from .sun import is_daylight_batch
+
+MAX_COMPARE_WORKERS = 8
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def compare_locations(
+    locations: List[dict],
+    hours: int,
+    keys: List[str | List[str]] = FORECAST_KEYS,
+    reuse_radius_km: float = DEFAULT_REUSE_RADIUS_KM,
+    now: Optional[datetime] = None,
+) -> Dict[datetime, List[dict]]:
+    """
+    Forecasts for ``locations``, fetched concurrently, at each time in the next
+    ``hours`` hours that all of them have a step for. Each time maps to the values of
+    every location, in order, marked with whether it is daytime there.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    def fetch_steps(location: dict) -> Tuple[float, float, ParsedSteps]:
+        return fetch_forecast_steps(location, keys, reuse_radius_km)
+
+    workers = min(MAX_COMPARE_WORKERS, len(locations))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = list(executor.map(fetch_steps, locations))
+    site_steps = [steps for _, _, steps in fetched]
+    # timestamps are ISO 8601 in UTC, so compare in time order as strings
+    start, end = (
+        time.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        for time in (now, now + timedelta(hours=hours))
+    )
+    times = [
+        datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+        .replace(tzinfo=timezone.utc)
+        .astimezone()
+        for timestamp in sorted(set.intersection(*(set(steps) for steps in site_steps)))
+        if start < timestamp <= end
+    ]
+    site_forecasts = [select_forecast_steps(steps, times) for steps in site_steps]
+    daylight = is_daylight_batch([(lat, lon) for lat, lon, _ in fetched], times)
+    for site_forecast, site_daylight in zip(site_forecasts, daylight):
+        for values, is_day in zip(site_forecast.values(), site_daylight):
+            values["is_day"] = is_day
+    return {
+        time: [site_forecast[time] for site_forecast in site_forecasts]
+        for time in times
+    }
@@ -0,0 +1,135 @@
+"""
+Helpers shared by yr's SQLite databases: schema migrations gated on ``user_version``,
+and size-capped tables whose least recently read rows are evicted.
+
+A capped table has ``size`` and ``accessed_at`` columns. Triggers keep the total of its
+sizes in a one-row table, so that writes needn't sum them. Rows are written with
+upserts, as the deletes of INSERT OR REPLACE don't fire triggers.
+"""
+
+import sqlite3
+import time
+from typing import Callable, NamedTuple, Tuple
+
+# reads only record their access time for eviction when it is older than this
+ACCESS_TIME_RESOLUTION_SECONDS = 3600
+# eviction goes down to this fraction of the cap, so that it doesn't run on every write
+EVICT_TO_FRACTION = 0.9
+
+
+class CappedTable(NamedTuple):
+    name: str
+    # the one-row table holding the total size of the rows
+    size_table: str
+    # the primary key, identifying the rows to evict
+    key_columns: Tuple[str, ...]
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    schema_version: int,
+    migrations: Callable[[sqlite3.Connection, int], None],
+):
+    """
+    Run ``migrations`` from the database's ``user_version``, if it is older than
+    ``schema_version``, and record that they have run. They run in one transaction, so
+    that processes and threads opening a new database at once migrate it only once.
+    """
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version >= schema_version:
+        return
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version < schema_version:
+        migrations(conn, version)
+        conn.execute(f"PRAGMA user_version = {schema_version}")
+    conn.commit()
+
+
+def use_wal(conn: sqlite3.Connection):
+    """
+    Switch a database to write-ahead logging, so that readers aren't blocked by a
+    concurrent writer. The mode is kept in the database file, so it is only set once.
+    """
+    (mode,) = conn.execute("PRAGMA journal_mode").fetchone()
+    if mode == "wal":
+        return
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.OperationalError:
+        # other connections have the database open, so a later connection switches it
+        pass
+
+
+def create_size_total(conn: sqlite3.Connection, table: CappedTable):
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {table.name}_accessed_at "
+        f"ON {table.name} (accessed_at)"
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {table.size_table} (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            size INTEGER
+        )
+    """
+    )
+    for suffix, event, change in (
+        ("inserted", "INSERT", "NEW.size"),
+        ("updated", "UPDATE OF size", "NEW.size - OLD.size"),
+        ("deleted", "DELETE", "-OLD.size"),
+    ):
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table.name}_{suffix} "
+            f"AFTER {event} ON {table.name} "
+            f"BEGIN UPDATE {table.size_table} SET size = size + {change}; END"
+        )
+
+
+def seed_size_total(conn: sqlite3.Connection, table: CappedTable):
+    """Set the total from the rows, from a migration that adds it to a table."""
+    conn.execute(
+        f"INSERT OR REPLACE INTO {table.size_table} (id, size) "
+        f"SELECT 1, COALESCE(SUM(size), 0) FROM {table.name}"
+    )
+
+
+def get_size_total(conn: sqlite3.Connection, table: CappedTable) -> int:
+    (size,) = conn.execute(f"SELECT size FROM {table.size_table}").fetchone()
+    return size
+
+
+def touch(conn: sqlite3.Connection, table: CappedTable, key: tuple, accessed_at: float):
+    """Record that a row was read, unless it was recently, to avoid the write lock."""
+    now = time.time()
+    if now - accessed_at > ACCESS_TIME_RESOLUTION_SECONDS:
+        conn.execute(
+            f"UPDATE {table.name} SET accessed_at = ? WHERE {_key_condition(table)}",
+            (now, *key),
+        )
+
+
+def evict(conn: sqlite3.Connection, table: CappedTable, max_bytes: int):
+    """Evict the least recently read rows once their total size passes ``max_bytes``."""
+    size = get_size_total(conn, table)
+    if size <= max_bytes:
+        return
+    evicted = []
+    for *key, row_size in conn.execute(
+        f"SELECT {', '.join(table.key_columns)}, size FROM {table.name} "
+        "ORDER BY accessed_at"
+    ):
+        if size <= max_bytes * EVICT_TO_FRACTION:
+            break
+        evicted.append(key)
+        size -= row_size
+    conn.executemany(f"DELETE FROM {table.name} WHERE {_key_condition(table)}", evicted)
+
+
+def _key_condition(table: CappedTable) -> str:
+    """
+    >>> _key_condition(CappedTable("forecasts", "store_size", ("lat", "lon")))
+    'lat = ? AND lon = ?'
+    """
+    return " AND ".join(f"{column} = ?" for column in table.key_columns)
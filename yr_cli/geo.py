@@ -0,0 +1,92 @@
+import math
+from typing import List, Tuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def geohash_encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    >>> geohash_encode(57.64911, 10.40744, 11)
+    'u4pruydqqvj'
+    >>> geohash_encode(-33.9249, 18.4241, 6)
+    'k3vp52'
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash = []
+    bits, bit_count, even = 0, 0, True
+    while len(geohash) < precision:
+        value, value_range = (lon, lon_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = bits * 2 + 1
+            value_range[0] = mid
+        else:
+            bits *= 2
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """
+    Height and width in degrees of a geohash cell.
+
+    >>> geohash_cell_size(5)
+    (0.0439453125, 0.0439453125)
+    >>> geohash_cell_size(6)
+    (0.0054931640625, 0.010986328125)
+    """
+    lat_bits = 5 * precision // 2
+    lon_bits = 5 * precision - lat_bits
+    return 180 / 2**lat_bits, 360 / 2**lon_bits
+
+
+def geohash_cells(lat: float, lon: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes of the cell containing a point and its eight neighbours, sized so
+    that together they cover every point within ``radius_km``.
+
+    >>> geohash_cells(-33.9249, 18.4241, 0.5)
+    ['k3vngp', 'k3vngr', 'k3vngx', 'k3vp50', 'k3vp52', 'k3vp58', 'k3vp51', 'k3vp53', 'k3vp59']
+    """
+    precision = GEOHASH_PRECISION
+    while precision > 1:
+        height, width = geohash_cell_size(precision)
+        width_km = width * KM_PER_DEGREE * math.cos(math.radians(lat))
+        if height * KM_PER_DEGREE >= radius_km and width_km >= radius_km:
+            break
+        precision -= 1
+    height, width = geohash_cell_size(precision)
+    cells = []
+    for lat_offset in (-height, 0, height):
+        for lon_offset in (-width, 0, width):
+            cell_lat = max(-90.0, min(90.0, lat + lat_offset))
+            cell_lon = (lon + lon_offset + 180) % 360 - 180
+            cell = geohash_encode(cell_lat, cell_lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    >>> round(haversine_km(-33.9249, 18.4241, -33.9321, 18.8602), 1)
+    40.2
+    >>> haversine_km(10.0, 10.0, 10.0, 10.0)
+    0.0
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
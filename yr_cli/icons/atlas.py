@@ -0,0 +1,104 @@
+"""
+Weather icons pre-scaled to standard terminal cell sizes and packed into a single
+resource by ``python -m yr_cli.icons.build``. The atlas is::
+
+    magic      8 bytes
+    length     uint32 length of the index
+    index      JSON mapping cell sizes and icon names to blob offsets and lengths
+    blobs      PNG data of every icon at every cell size
+
+Only PNGs are stored to keep the atlas small, and the encodings terminals need are made
+from them when an icon is drawn.
+"""
+
+import base64
+import io
+import json
+import struct
+from functools import lru_cache
+from importlib import resources
+from typing import Dict, NamedTuple, Tuple
+
+ATLAS_RESOURCE = "icons.atlas"
+MAGIC = b"YRICONS\x02"
+INDEX_LENGTH = struct.Struct("<I")
+# pixel width and height of terminal cells icons are pre-scaled for
+CELL_SIZES = [(8, 16), (10, 20), (12, 24), (16, 32)]
+# icons span two cells of a row
+ICON_CELLS = (2, 1)
+
+CellSize = Tuple[int, int]
+
+
+class Icon(NamedTuple):
+    png: bytes
+    width: int
+    height: int
+
+    @property
+    def png_base64(self) -> bytes:
+        return base64.b64encode(self.png)
+
+    @property
+    def sixel(self) -> bytes:
+        # Pillow is only imported by terminals that draw sixels
+        from PIL import Image
+
+        from .sixel import encode_sixel
+
+        with Image.open(io.BytesIO(self.png)) as image:
+            return encode_sixel(image)
+
+
+@lru_cache(maxsize=None)
+def load_atlas() -> Dict[CellSize, Dict[str, Icon]]:
+    atlas_file = resources.files("yr_cli.icons").joinpath(ATLAS_RESOURCE)
+    if not atlas_file.is_file():
+        raise FileNotFoundError(
+            f"Icon atlas '{atlas_file}' not found, build it with "
+            "'python -m yr_cli.icons.build'."
+        )
+    data = atlas_file.read_bytes()
+    if data[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"'{atlas_file}' is not an icon atlas")
+    (index_length,) = INDEX_LENGTH.unpack_from(data, len(MAGIC))
+    blobs_offset = len(MAGIC) + INDEX_LENGTH.size + index_length
+    index = json.loads(data[len(MAGIC) + INDEX_LENGTH.size : blobs_offset])
+    atlas = {}
+    for cell_size, icons in index.items():
+        width, height = map(int, cell_size.split("x"))
+        atlas[(width, height)] = {
+            name: Icon(
+                png=data[blobs_offset + png[0] : blobs_offset + png[0] + png[1]],
+                width=size[0],
+                height=size[1],
+            )
+            for name, (png, size) in icons.items()
+        }
+    return atlas
+
+
+def get_icon(name: str, cell_size: CellSize) -> Icon:
+    icons = load_atlas()[nearest_cell_size(cell_size)]
+    if name not in icons:
+        raise FileNotFoundError(f"Icon '{name}' not found in the icon atlas.")
+    return icons[name]
+
+
+def nearest_cell_size(cell_size: CellSize) -> CellSize:
+    """
+    The largest standard cell size that fits in ``cell_size``, or the smallest one.
+
+    >>> nearest_cell_size((9, 18))
+    (8, 16)
+    >>> nearest_cell_size((14, 28))
+    (12, 24)
+    >>> nearest_cell_size((6, 12))
+    (8, 16)
+    """
+    fitting = [
+        size
+        for size in CELL_SIZES
+        if size[0] <= cell_size[0] and size[1] <= cell_size[1]
+    ]
+    return max(fitting) if fitting else CELL_SIZES[0]
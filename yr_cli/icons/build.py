@@ -0,0 +1,41 @@
+"""
+Build the icon atlas from the icon PNGs in this package::
+
+    python -m yr_cli.icons.build
+"""
+
+import io
+import json
+from pathlib import Path
+
+from PIL import Image
+
+from .atlas import ATLAS_RESOURCE, CELL_SIZES, ICON_CELLS, INDEX_LENGTH, MAGIC
+
+ICONS_DIR = Path(__file__).parent
+
+
+def build_atlas(icons_dir: Path = ICONS_DIR, output: Path = ICONS_DIR / ATLAS_RESOURCE):
+    index = {}
+    blobs = io.BytesIO()
+    for cell_width, cell_height in CELL_SIZES:
+        icons = index[f"{cell_width}x{cell_height}"] = {}
+        box = (ICON_CELLS[0] * cell_width, ICON_CELLS[1] * cell_height)
+        for icon_path in sorted(icons_dir.glob("*.png")):
+            with Image.open(icon_path) as img:
+                img = img.convert("RGBA")
+                img.thumbnail(box, Image.LANCZOS)
+            png = io.BytesIO()
+            img.save(png, format="PNG", optimize=True)
+            icons[icon_path.stem] = [[blobs.tell(), png.tell()], list(img.size)]
+            blobs.write(png.getvalue())
+    encoded_index = json.dumps(index, separators=(",", ":")).encode()
+    with open(output, "wb") as f:
+        f.write(MAGIC)
+        f.write(INDEX_LENGTH.pack(len(encoded_index)))
+        f.write(encoded_index)
+        f.write(blobs.getvalue())
+
+
+if __name__ == "__main__":
+    build_atlas()
@@ -0,0 +1,67 @@
+"""
+DEC sixel encoding of icons, for terminals without iTerm2's or kitty's image protocols.
+"""
+
+from itertools import groupby
+from typing import List
+
+from PIL import Image
+
+SIXEL_COLORS = 64
+
+
+def encode_sixel(image: Image.Image) -> bytes:
+    """
+    DEC sixel data for ``image``, leaving transparent pixels unpainted.
+
+    >>> encode_sixel(Image.new("RGBA", (3, 2), (255, 0, 0, 255)))
+    b'\\x1bP0;1;0q"1;1;3;2#0;2;100;0;0#0BBB-\\x1b\\\\'
+    """
+    width, height = image.size
+    rgba = image.convert("RGBA")
+    opaque = [alpha >= 128 for alpha in rgba.getchannel("A").tobytes()]
+    paletted = rgba.convert("RGB").quantize(SIXEL_COLORS)
+    colors = list(paletted.tobytes())
+    palette = paletted.getpalette()
+    used_colors = sorted(
+        {color for color, is_opaque in zip(colors, opaque) if is_opaque}
+    )
+
+    sixel = ['\033P0;1;0q"1;1;', f"{width};{height}"]
+    for color in used_colors:
+        red, green, blue = (
+            value * 100 // 255 for value in palette[3 * color : 3 * color + 3]
+        )
+        sixel.append(f"#{color};2;{red};{green};{blue}")
+    for band_top in range(0, height, 6):
+        band = range(band_top, min(band_top + 6, height))
+        rows = []
+        for color in used_colors:
+            sixels = [
+                chr(
+                    63
+                    + sum(
+                        1 << bit
+                        for bit, y in enumerate(band)
+                        if opaque[y * width + x] and colors[y * width + x] == color
+                    )
+                )
+                for x in range(width)
+            ]
+            if any(character != "?" for character in sixels):
+                rows.append(f"#{color}" + _run_length(sixels).rstrip("?"))
+        sixel.append("$".join(rows) + "-")
+    sixel.append("\033\\")
+    return "".join(sixel).encode()
+
+
+def _run_length(sixels: List[str]) -> str:
+    """
+    >>> _run_length(list("???~~~~~@"))
+    '???!5~@'
+    """
+    encoded = []
+    for character, run in groupby(sixels):
+        count = len(list(run))
+        encoded.append(f"!{count}{character}" if count > 3 else character * count)
+    return "".join(encoded)
@@ -1,12 +1,10 @@
-import base64
-import io
+import json
 import sys
 from datetime import date, datetime
-from functools import wraps
-from typing import Callable, Dict, List, Optional
+from functools import lru_cache, wraps
+from typing import Callable, Dict, List, Optional, Tuple, get_args
 
 import inquirer
-from PIL import Image
 from rich import box
 from rich.console import Console, Group
 from rich.panel import Panel
@@ -14,19 +12,45 @@ from rich.table import Table
 from rich.text import Text
 from rich.traceback import install
 
-from . import get_icon_path
 from .api import get_openstreetmap_locations
 from .cache import cache_location, clear_cache, get_cached_location
+from .icons.atlas import ICON_CELLS, get_icon, nearest_cell_size
+from .locationforecast.parsed import clear_parsed_forecasts
+from .locationforecast.type import WeatherSymbol
+from .locationforecast.uncertainty import (
+    sparkline,
+    summarise_uncertainty,
+    uncertainty_values,
+)
 from .maps import create_map_with_box
-from .utils import get_output_method
+from .resolve import (
+    DEFAULT_MIN_CONFIDENCE,
+    PickPolicy,
+    default_pick_policy,
+    pick_location,
+)
+from .store import clear_legacy_cache
+from .utils import (
+    DEFAULT_CELL_SIZE,
+    GRAPHICS_OUTPUT_METHODS,
+    get_cell_size,
+    get_output_method,
+)
 
 OSC = b"\033]"
 ST = b"\007"
+APC = b"\033_"
+ESC_ST = b"\033\\"
+SAVE_CURSOR = b"\0337"
+RESTORE_CURSOR = b"\0338"
+# kitty limits the base64 payload of each graphics escape sequence
+KITTY_CHUNK_SIZE = 4096
 
 
 class AnsiStyles:
     RESET = b"\033[0m"
     BOLD = b"\033[1m"
+    DIM = b"\033[2m"
     RED = b"\033[31m"
     LIGHT_BLUE = b"\033[94m"
     YELLOW = b"\033[33m"
@@ -35,37 +59,62 @@ class AnsiStyles:
 
 console = Console()
 
+SYMBOL_SUMMARIES = {
+    symbol: symbol.replace("_", " ").title() for symbol in get_args(WeatherSymbol)
+}
+# forecasts with more rows than this are streamed day by day rather than in one panel
+MAX_PANEL_ROWS = 48
+COMPARISON_TIME_WIDTH = 7
+COMPARISON_CELL_WIDTH = 13
 
-def encode_image(image_path: str, max_width: int = 2, max_height: int = 1) -> bytes:
-    with Image.open(image_path) as img:
-        img.thumbnail((max_width * 10, max_height * 20))
-        buffered = io.BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue())
+
+@lru_cache(maxsize=None)
+def encode_icon(
+    icon_name: str,
+    output_method: str = "iterm2",
+    cell_size: Tuple[int, int] = DEFAULT_CELL_SIZE,
+) -> bytes:
+    """Escape sequences that draw an icon from the atlas over the next two cells."""
+    icon = get_icon(icon_name, cell_size)
+    width, height = ICON_CELLS
+    if output_method == "sixel":
+        # terminals leave the cursor below sixel images, so step over the icon instead
+        return SAVE_CURSOR + icon.sixel + RESTORE_CURSOR + f"\033[{width}C".encode()
+    if output_method == "kitty":
+        chunks = [
+            icon.png_base64[offset : offset + KITTY_CHUNK_SIZE]
+            for offset in range(0, len(icon.png_base64), KITTY_CHUNK_SIZE)
+        ]
         return b"".join(
-            [
-                OSC,
-                b"1337;File=inline=1;width=",
-                str(max_width).encode(),
-                b";height=",
-                str(max_height).encode(),
-                b":",
-                img_str,
-                ST,
-            ]
+            APC
+            + (f"Ga=T,f=100,q=2,c={width},r={height}," if index == 0 else "G").encode()
+            + f"m={int(index < len(chunks) - 1)};".encode()
+            + chunk
+            + ESC_ST
+            for index, chunk in enumerate(chunks)
         )
+    return b"".join(
+        [
+            OSC,
+            b"1337;File=inline=1;width=",
+            str(width).encode(),
+            b";height=",
+            str(height).encode(),
+            b":",
+            icon.png_base64,
+            ST,
+        ]
+    )
 
 
-def format_table_row(
-    columns: list, image_column: Optional[int] = None, image_path: Optional[str] = None
-) -> bytes:
+def format_table_row(columns: list, images: Optional[Dict[int, bytes]] = None) -> bytes:
+    """Columns of (text, width, color), with ``images`` drawn in place of some columns."""
+    images = images or {}
     row = []
     for i, (col, width, color) in enumerate(columns):
-        if i == image_column and image_path:
-            icon = encode_image(image_path)
-            # assume icon takes 2 characters
-            padding = b" " * (width - 2)
-            row.append(icon + padding)
+        if images.get(i):
+            padding = b" " * (width - ICON_CELLS[0])
+            row.append(images[i] + padding)
         else:
             colored_text = (
                 color
@@ -125,11 +174,14 @@ def get_wind_direction_arrow(degrees: float) -> str:
     return directions[index][1]
 
 
-def print_weather_table(forecast_timesteps: Dict[datetime, dict]):
+def print_weather_table(
+    forecast_timesteps: Dict[datetime, dict], output_method: str = "iterm2"
+):
+    cell_size = nearest_cell_size(get_cell_size())
     columns = [
         ("Time", 10, AnsiStyles.DEFAULT),
         ("", 10, AnsiStyles.DEFAULT),
-        ("Temp (°C)", 10, AnsiStyles.RED),
+        ("Temp (°C)", _temperature_width(forecast_timesteps, 10), AnsiStyles.RED),
         ("Rain (mm)", 10, AnsiStyles.LIGHT_BLUE),
         ("Wind (m/s)", 10, AnsiStyles.DEFAULT),
         ("Cloud (%)", 10, AnsiStyles.YELLOW),
@@ -152,11 +204,13 @@ def print_weather_table(forecast_timesteps: Dict[datetime, dict]):
                 + AnsiStyles.RESET
             )
 
+        # night hours are dimmed
+        time_style = AnsiStyles.DIM if data.get("is_day") is False else columns[0][2]
         formatted_row = [
-            (timestamp.strftime("%H:%M"), columns[0][1], columns[0][2]),
+            (timestamp.strftime("%H:%M"), columns[0][1], time_style),
             ("", columns[1][1], columns[1][2]),
-            (f"{data['air_temperature']:.1f}°", columns[2][1], columns[2][2]),
-            (f"{data['precipitation_amount']:.1f}", columns[3][1], columns[3][2]),
+            (_format_temperature(data, unit="°"), columns[2][1], columns[2][2]),
+            (_format_precipitation(data, unit=""), columns[3][1], columns[3][2]),
             (
                 f"{data['wind_speed']:.1f}{get_wind_direction_arrow(data['wind_from_direction'])}",
                 columns[4][1],
@@ -167,17 +221,71 @@ def print_weather_table(forecast_timesteps: Dict[datetime, dict]):
         output.append(
             format_table_row(
                 formatted_row,
-                image_column=1,
-                image_path=get_icon_path(data["symbol_code"]),
+                images={1: encode_icon(data["symbol_code"], output_method, cell_size)},
             )
         )
 
-    full_output = b"".join(output)
+    _write_synchronised(b"".join(output))
+
 
+def print_comparison_table(
+    comparison: Dict[datetime, List[dict]],
+    names: List[str],
+    output_method: str = "iterm2",
+):
+    cell_size = nearest_cell_size(get_cell_size())
+    # each location has an icon column followed by a text column
+    header = [("Time", COMPARISON_TIME_WIDTH, AnsiStyles.BOLD)]
+    for name in names:
+        header.append(("", ICON_CELLS[0] + 1, AnsiStyles.DEFAULT))
+        header.append(
+            (
+                _truncate(name, COMPARISON_CELL_WIDTH - 1),
+                COMPARISON_CELL_WIDTH,
+                AnsiStyles.BOLD,
+            )
+        )
+    output = [format_table_row(header)]
+    current_day = None
+    for timestamp, site_data in comparison.items():
+        if timestamp.date() != current_day:
+            current_day = timestamp.date()
+            output.append(
+                AnsiStyles.BOLD
+                + f"{current_day.strftime('%A %d. %B')}\n".encode()
+                + AnsiStyles.RESET
+            )
+        formatted_row = [
+            (timestamp.strftime("%H:%M"), COMPARISON_TIME_WIDTH, AnsiStyles.DEFAULT)
+        ]
+        images = {}
+        for data in site_data:
+            images[len(formatted_row)] = encode_icon(
+                data["symbol_code"], output_method, cell_size
+            )
+            formatted_row.append(("", ICON_CELLS[0] + 1, AnsiStyles.DEFAULT))
+            formatted_row.append(
+                (
+                    _format_comparison_cell(data),
+                    COMPARISON_CELL_WIDTH,
+                    # night hours at each location are dimmed
+                    (
+                        AnsiStyles.DIM
+                        if data.get("is_day") is False
+                        else AnsiStyles.DEFAULT
+                    ),
+                )
+            )
+        output.append(format_table_row(formatted_row, images=images))
+
+    _write_synchronised(b"".join(output))
+
+
+def _write_synchronised(output: bytes):
     # use buffering to display output as a single block
     sys.stdout.buffer.write(b"\033[?2026h")
     sys.stdout.buffer.flush()
-    sys.stdout.buffer.write(full_output)
+    sys.stdout.buffer.write(output)
     sys.stdout.buffer.flush()
     sys.stdout.buffer.write(b"\033[?2026l")
     sys.stdout.buffer.flush()
@@ -189,12 +297,23 @@ def get_selected_location(
     country_code: str,
     no_cache: bool,
     show_map: bool,
+    pick: Optional[PickPolicy] = None,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
 ) -> Optional[dict]:
+    pick = pick or default_pick_policy()
     if location is None:
+        if pick != "prompt":
+            console.print("[bold red]Error:[/bold red] No location given.")
+            return None
         location = prompt_location()
     if no_cache:
         selected_location = get_location(
-            query=location, limit=limit, country_code=country_code, show_map=show_map
+            query=location,
+            limit=limit,
+            country_code=country_code,
+            show_map=show_map,
+            pick=pick,
+            min_confidence=min_confidence,
         )
     else:
         cached_location = get_cached_location(location)
@@ -210,6 +329,8 @@ def get_selected_location(
                 limit=limit,
                 country_code=country_code,
                 show_map=show_map,
+                pick=pick,
+                min_confidence=min_confidence,
             )
             if selected_location:
                 cache_location(location, selected_location)
@@ -234,19 +355,38 @@ def select_location(locations: List[dict]) -> dict:
 
 
 def get_location(
-    query: str, limit: int, country_code: str, show_map: bool
+    query: str,
+    limit: int,
+    country_code: str,
+    show_map: bool,
+    pick: PickPolicy = "prompt",
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
 ) -> Optional[dict]:
     locations = get_openstreetmap_locations(query, limit, country_code)
     if not locations:
         console.print("[bold red]Error:[/bold red] No locations found.")
         return None
-    if len(locations) > 1:
+    if len(locations) > 1 and pick == "prompt":
         selected_location = select_location(locations)
         # always show map if there are multiple locations
         if get_output_method() == "iterm2":
             create_map_with_box(
                 float(selected_location["lat"]), float(selected_location["lon"])
             )
+    elif len(locations) > 1:
+        resolution = pick_location(query, locations, pick, min_confidence)
+        if resolution.location is None:
+            console.print(
+                f"[bold red]Error:[/bold red] {len(locations)} locations match "
+                f"'{query}' and none stands out (confidence "
+                f"{resolution.confidence:.2f}). Try a more specific name."
+            )
+            return None
+        selected_location = resolution.location
+        if show_map and get_output_method() == "iterm2":
+            create_map_with_box(
+                float(selected_location["lat"]), float(selected_location["lon"])
+            )
     else:
         selected_location = locations[0]
         if show_map and get_output_method() == "iterm2":
@@ -256,46 +396,418 @@ def get_location(
     return selected_location
 
 
+def render_forecast(
+    forecast_timesteps: Dict[datetime, dict],
+    selected_location: dict,
+    panel_title: str,
+):
+    output_method = get_output_method()
+    if output_method in GRAPHICS_OUTPUT_METHODS:
+        print_weather_table(forecast_timesteps, output_method)
+    elif output_method == "plain":
+        print_plain_weather(forecast_timesteps, selected_location, panel_title)
+    elif len(forecast_timesteps) > MAX_PANEL_ROWS:
+        stream_weather(forecast_timesteps, selected_location, panel_title)
+    else:
+        display_weather(forecast_timesteps, selected_location, panel_title)
+
+
 def display_weather(
     forecast_timesteps: Dict[datetime, dict],
     selected_location: dict,
     panel_title: str,
 ):
+    content = Group(_location_text(selected_location), "")
+    for weather_table in _iter_weather_tables(forecast_timesteps):
+        content.renderables.append(weather_table)
+
+    weather_panel = Panel(
+        content,
+        title=f"[bold blue]{panel_title}[/bold blue]",
+        expand=False,
+        border_style="blue",
+    )
+
+    console.print(weather_panel)
+
+
+def stream_weather(
+    forecast_timesteps: Dict[datetime, dict],
+    selected_location: dict,
+    panel_title: str,
+):
+    console.rule(f"[bold blue]{panel_title}[/bold blue]", style="blue")
+    console.print(_location_text(selected_location))
+    for weather_table in _iter_weather_tables(forecast_timesteps):
+        console.print(weather_table)
+
+
+def print_plain_weather(
+    forecast_timesteps: Dict[datetime, dict],
+    selected_location: dict,
+    panel_title: str,
+):
+    lines = [f"{panel_title}: {selected_location['name']}"]
+    temperature_width = _temperature_width(forecast_timesteps, 8)
+    current_day = None
+    for forecast_time, data in forecast_timesteps.items():
+        if forecast_time.date() != current_day:
+            current_day = forecast_time.date()
+            lines.append(f"\n{current_day.strftime('%A %d. %B')}")
+        summary, temp, rain, wind, cloud = _format_weather_row(data)
+        lines.append(
+            f"{_get_24_hr_fmt(forecast_time.hour)}  {summary:<34}"
+            f"{temp:>{temperature_width}}"
+            f"{rain:>9}{wind:>10}{cloud:>6}"
+        )
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def render_comparison(
+    comparison: Dict[datetime, List[dict]], names: List[str], panel_title: str
+):
+    output_method = get_output_method()
+    if output_method in GRAPHICS_OUTPUT_METHODS:
+        print_comparison_table(comparison, names, output_method)
+    elif output_method == "plain":
+        print_plain_comparison(comparison, names, panel_title)
+    else:
+        display_comparison(comparison, names, panel_title)
+
+
+def display_comparison(
+    comparison: Dict[datetime, List[dict]], names: List[str], panel_title: str
+):
+    # sites that don't fit across the console go in further tables below
+    sites_per_table = max(
+        1,
+        (console.width - COMPARISON_TIME_WIDTH - 2) // (COMPARISON_CELL_WIDTH + 3),
+    )
+    for first_site in range(0, len(names), sites_per_table):
+        sites = slice(first_site, first_site + sites_per_table)
+        comparison_table = Table(
+            box=box.SIMPLE_HEAD,
+            title=f"[bold blue]{panel_title}[/bold blue]" if not first_site else None,
+            caption=(
+                "°C, wind m/s, rain mm"
+                if first_site + sites_per_table >= len(names)
+                else None
+            ),
+        )
+        comparison_table.add_column(
+            "Time", style="cyan", no_wrap=True, width=COMPARISON_TIME_WIDTH
+        )
+        for name in names[sites]:
+            comparison_table.add_column(
+                name, no_wrap=True, overflow="ellipsis", width=COMPARISON_CELL_WIDTH
+            )
+        current_day = None
+        for forecast_time, site_data in comparison.items():
+            if forecast_time.date() != current_day:
+                if current_day is not None:
+                    comparison_table.add_section()
+                current_day = forecast_time.date()
+            comparison_table.add_row(
+                forecast_time.strftime("%a %H"),
+                *(
+                    # night hours at each location are dimmed
+                    Text(
+                        _format_comparison_cell(data),
+                        style="dim" if data.get("is_day") is False else "",
+                    )
+                    for data in site_data[sites]
+                ),
+            )
+        console.print(comparison_table)
+
+
+def print_plain_comparison(
+    comparison: Dict[datetime, List[dict]], names: List[str], panel_title: str
+):
+    lines = [
+        f"{panel_title} (°C, wind m/s, rain mm)",
+        "Time".ljust(COMPARISON_TIME_WIDTH + 2)
+        + "".join(
+            _truncate(name, COMPARISON_CELL_WIDTH - 1).ljust(COMPARISON_CELL_WIDTH)
+            for name in names
+        ).rstrip(),
+    ]
+    for forecast_time, site_data in comparison.items():
+        lines.append(
+            forecast_time.strftime("%a %H").ljust(COMPARISON_TIME_WIDTH + 2)
+            + "".join(
+                _format_comparison_cell(data).ljust(COMPARISON_CELL_WIDTH)
+                for data in site_data
+            ).rstrip()
+        )
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _iter_weather_tables(forecast_timesteps: Dict[datetime, dict]):
     current_day = min(forecast_timesteps).date()
-    location_text = Text()
-    location_text.append("📍 ", style="bold green")
-    location_text.append(selected_location["name"], style="bold")
-    content = Group(location_text, "")
     weather_table = create_weather_table(current_day)
+    day_data = []
     for forecast_time, data in forecast_timesteps.items():
         if forecast_time.date() != current_day:
             current_day = forecast_time.date()
             if weather_table.rows:
-                content.renderables.append(weather_table)
+                weather_table.caption = _format_uncertainty(day_data)
+                yield weather_table
                 weather_table = create_weather_table(current_day)
-        summary = data["symbol_code"].replace("_", " ").title()
-        temp = f"{data['air_temperature']:.1f}°C"
-        precipitation_amount = data["precipitation_amount"]
-        rain = "" if float(precipitation_amount) == 0 else f"{precipitation_amount} mm"
-        wind = f"{data['wind_speed']:.1f} m/s"
-        cloud = f"{data['cloud_area_fraction']:.0f}%"
-        time_str = f"{_get_24_hr_fmt(forecast_time.hour)}"
-        weather_table.add_row(time_str, summary, temp, rain, wind, cloud)
+                day_data = []
+        day_data.append(data)
+        weather_table.add_row(
+            _get_24_hr_fmt(forecast_time.hour),
+            *_format_weather_row(data),
+            # night hours are dimmed
+            style="dim" if data.get("is_day") is False else None,
+        )
     if weather_table.rows:
-        content.renderables.append(weather_table)
+        weather_table.caption = _format_uncertainty(day_data)
+        yield weather_table
 
-    weather_panel = Panel(
-        content,
-        title=f"[bold blue]{panel_title}[/bold blue]",
-        expand=False,
-        border_style="blue",
+
+def _format_weather_row(data: dict) -> tuple:
+    """
+    >>> _format_weather_row({
+    ...     "symbol_code": "partlycloudy_day",
+    ...     "air_temperature": 14.25,
+    ...     "precipitation_amount": 0.0,
+    ...     "wind_speed": 3.04,
+    ...     "cloud_area_fraction": 40.6,
+    ... })
+    ('Partlycloudy Day', '14.2°C', '', '3.0 m/s', '41%')
+    >>> _format_weather_row({
+    ...     "symbol_code": "rain",
+    ...     "air_temperature": 4.0,
+    ...     "apparent_temperature": -1.3,
+    ...     "precipitation_amount": 2.1,
+    ...     "wind_speed": 7.5,
+    ...     "cloud_area_fraction": 100.0,
+    ... })
+    ('Rain', '4.0°C (-1°)', '2.1 mm', '7.5 m/s', '100%')
+    """
+    symbol_code = data["symbol_code"]
+    summary = SYMBOL_SUMMARIES.get(symbol_code) or symbol_code.replace("_", " ").title()
+    precipitation_amount = data.get(
+        "nowcast_precipitation_amount", data["precipitation_amount"]
+    )
+    return (
+        summary,
+        _format_temperature(data),
+        "" if float(precipitation_amount) == 0 else _format_precipitation(data),
+        f"{data['wind_speed']:.1f} m/s",
+        f"{data['cloud_area_fraction']:.0f}%",
     )
 
-    console.print(weather_panel)
+
+def _format_precipitation(data: dict, unit: str = " mm") -> str:
+    """
+    >>> _format_precipitation({"precipitation_amount": 2.1})
+    '2.1 mm'
+    >>> _format_precipitation(
+    ...     {"precipitation_amount": 2.1, "nowcast_precipitation_amount": 0.4}
+    ... )
+    '0.4 mm (1h)'
+    """
+    # rows covered by the nowcast show its amount for the hour, labelled as such
+    if "nowcast_precipitation_amount" in data:
+        return f"{data['nowcast_precipitation_amount']:.1f}{unit} (1h)"
+    return f"{data['precipitation_amount']:.1f}{unit}"
+
+
+def _temperature_width(forecast_timesteps: Dict[datetime, dict], width: int) -> int:
+    # widened for what it feels like only when apparent temperature was selected
+    if any("apparent_temperature" in data for data in forecast_timesteps.values()):
+        return width + 6
+    return width
+
+
+def _format_temperature(data: dict, unit: str = "°C") -> str:
+    # followed by what it feels like when apparent temperature was selected
+    temperature = f"{data['air_temperature']:.1f}{unit}"
+    if data.get("apparent_temperature") is not None:
+        temperature += f" ({data['apparent_temperature']:.0f}°)"
+    return temperature
+
+
+def _format_uncertainty(day_data: List[dict]) -> Optional[str]:
+    """
+    Sparklines of the chance of rain and thunder through a day, with the likely ranges
+    of temperature and rain.
+
+    >>> print(_format_uncertainty([
+    ...     {"precipitation_amount_min": 0.1, "precipitation_amount_max": 0.7,
+    ...      "probability_of_precipitation": 6.9, "probability_of_thunder": 2.3,
+    ...      "air_temperature_percentile_10": 18.5, "air_temperature_percentile_90": 20.8},
+    ...     {"precipitation_amount_min": 1.1, "precipitation_amount_max": 5.2,
+    ...      "probability_of_precipitation": 85.9, "probability_of_thunder": 0.2,
+    ...      "air_temperature_percentile_10": 9.1, "air_temperature_percentile_90": 13.4},
+    ... ]))
+    Rain ▁▇ 86%  Thunder ▁▁ 2%
+    Likely 9–21°C, 1.1–5.2 mm in the wettest 6 hours
+    >>> print(_format_uncertainty([
+    ...     {"precipitation_amount_min": 0.1, "precipitation_amount_max": 0.7,
+    ...      "probability_of_precipitation": 6.9, "probability_of_thunder": None,
+    ...      "air_temperature_percentile_10": 18.5, "air_temperature_percentile_90": 20.8},
+    ... ]))
+    Rain ▁ 7%
+    Likely 18–21°C, 0.1–0.7 mm in the wettest 6 hours
+    >>> _format_uncertainty([{"air_temperature": 14.0}]) is None
+    True
+    """
+    summary = summarise_uncertainty(day_data)
+    if summary is None:
+        return None
+    # fields the forecast doesn't give for the day are left out
+    chances = "  ".join(
+        f"{label} {sparkline(uncertainty_values(day_data, field))} {summary[field]:.0f}%"
+        for label, field in (
+            ("Rain", "probability_of_precipitation"),
+            ("Thunder", "probability_of_thunder"),
+        )
+        if summary[field] is not None
+    )
+    ranges = ", ".join(
+        range_format.format(summary[low], summary[high])
+        for range_format, low, high in (
+            (
+                "{:.0f}–{:.0f}°C",
+                "air_temperature_percentile_10",
+                "air_temperature_percentile_90",
+            ),
+            (
+                "{:.1f}–{:.1f} mm in the wettest 6 hours",
+                "precipitation_amount_min",
+                "precipitation_amount_max",
+            ),
+        )
+        if summary[low] is not None and summary[high] is not None
+    )
+    return "\n".join(
+        line for line in (chances, f"Likely {ranges}" if ranges else "") if line
+    )
+
+
+def _format_comparison_cell(data: dict) -> str:
+    """
+    Temperature, wind and any rain in a compact cell.
+
+    >>> _format_comparison_cell({
+    ...     "air_temperature": 14.25,
+    ...     "precipitation_amount": 2.1,
+    ...     "wind_speed": 5.4,
+    ...     "wind_from_direction": 45,
+    ... })
+    '14° 5↙ 2.1'
+    >>> _format_comparison_cell({
+    ...     "air_temperature": -0.4,
+    ...     "precipitation_amount": 0.0,
+    ...     "wind_speed": 0.3,
+    ...     "wind_from_direction": 180,
+    ... })
+    '0° 0↑'
+    """
+    cell = (
+        f"{round(data['air_temperature'])}° {round(data['wind_speed'])}"
+        f"{get_wind_direction_arrow(data['wind_from_direction'])}"
+    )
+    if float(data["precipitation_amount"]):
+        cell += f" {data['precipitation_amount']:.1f}"
+    return cell
+
+
+def _truncate(text: str, width: int) -> str:
+    """
+    >>> _truncate("Stellenbosch", 8)
+    'Stellen…'
+    >>> _truncate("Paarl", 8)
+    'Paarl'
+    """
+    return text if len(text) <= width else text[: width - 1] + "…"
+
+
+def _location_text(selected_location: dict) -> Text:
+    location_text = Text()
+    location_text.append("📍 ", style="bold green")
+    location_text.append(selected_location["name"], style="bold")
+    return location_text
+
+
+def display_nearby(
+    selected_location: dict,
+    radius_km: float,
+    nearby_locations: List[Tuple[float, str, dict]],
+    nearby_forecast_points: List[Tuple[float, float, float]],
+):
+    nearby_table = Table(
+        box=box.ROUNDED,
+        title=f"[bold blue]Cached within {radius_km:g} km[/bold blue]",
+    )
+    nearby_table.add_column("Distance", style="cyan", justify="right", no_wrap=True)
+    nearby_table.add_column("Cached", style="magenta", no_wrap=True)
+    nearby_table.add_column("Name", style="yellow")
+    nearby_table.add_column("Lat", style="green", justify="right", no_wrap=True)
+    nearby_table.add_column("Lon", style="green", justify="right", no_wrap=True)
+    rows = [
+        (distance, "location", query, float(location["lat"]), float(location["lon"]))
+        for distance, query, location in nearby_locations
+    ] + [
+        (distance, "forecast", "", lat, lon)
+        for distance, lat, lon in nearby_forecast_points
+    ]
+    for distance, kind, name, lat, lon in sorted(rows, key=lambda row: row[0]):
+        nearby_table.add_row(
+            f"{distance:.2f} km", kind, name, f"{lat:.4f}", f"{lon:.4f}"
+        )
+
+    console.print(_location_text(selected_location))
+    if nearby_table.rows:
+        console.print(nearby_table)
+    else:
+        console.print(f"Nothing cached within {radius_km:g} km.")
+
+
+def display_rate_limits(rate_limit_stats: List[dict]):
+    if not rate_limit_stats:
+        console.print("No requests have been made yet.")
+        return
+    rate_limit_table = Table(
+        box=box.ROUNDED, title="[bold blue]Upstream rate limits[/bold blue]"
+    )
+    rate_limit_table.add_column("Host", style="cyan", no_wrap=True)
+    rate_limit_table.add_column("Rate (req/s)", style="green", justify="right")
+    rate_limit_table.add_column("Requests", style="yellow", justify="right")
+    rate_limit_table.add_column("Throttled", style="red", justify="right")
+    rate_limit_table.add_column("Waited (s)", style="magenta", justify="right")
+    rate_limit_table.add_column("Blocked until", style="red", no_wrap=True)
+    for stats in rate_limit_stats:
+        blocked_until = datetime.fromtimestamp(stats["blocked_until"]).astimezone()
+        rate_limit_table.add_row(
+            stats["host"],
+            f"{stats['rate']:g}",
+            str(stats["requests"]),
+            str(stats["throttled"]),
+            f"{stats['wait_seconds']:.1f}",
+            (
+                blocked_until.strftime("%H:%M:%S")
+                if blocked_until > datetime.now().astimezone()
+                else ""
+            ),
+        )
+    console.print(rate_limit_table)
+
+
+def print_json_lines(records: List[dict]):
+    # one JSON object per line, for piping into other tools
+    sys.stdout.write("".join(json.dumps(record) + "\n" for record in records))
+    sys.stdout.flush()
 
 
 def display_clear_cache():
-    if clear_cache():
+    if clear_cache() and clear_parsed_forecasts() and clear_legacy_cache():
         console.print("[bold green]Cache cleared successfully![/bold green]")
     else:
         console.print("[bold red]Failed to clear cache.[/bold red]")
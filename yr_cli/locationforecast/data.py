@@ -1,36 +1,135 @@
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List
+from typing import Dict, List, Literal, Tuple
 
-from ..api import get_location_forecast
+from ..api import get_fresh_forecast_version, get_location_forecast
+from ..cache import cache_forecast_point, get_nearby_forecast_points
+from ..sun import is_daylight_batch
+from .derived import DERIVED, DERIVED_INPUTS, add_derived_metrics, derived_names
+from .parsed import ParsedSteps, get_parsed_forecast, store_parsed_forecast
 from .type import ForecastTimeStep, METJSONForecast
+from .uncertainty import UNCERTAINTY_FALLBACKS, UNCERTAINTY_KEYS
+
+FORECAST_KEYS = [
+    ["next_6_hours", "summary", "symbol_code"],
+    ["instant", "details", "air_temperature"],
+    ["next_6_hours", "details", "precipitation_amount"],
+    ["instant", "details", "wind_speed"],
+    ["instant", "details", "wind_from_direction"],
+    ["instant", "details", "cloud_area_fraction"],
+]
+# shown next to the air temperature when selected alongside FORECAST_KEYS
+FEELS_LIKE_KEYS = [[DERIVED, "apparent_temperature"]]
+# every derived metric, as exported alongside FORECAST_KEYS by snapshots
+DERIVED_KEYS = [[DERIVED, name] for name in DERIVED_INPUTS]
+# key paths provided by the compact product, which is less than half the size of
+# complete; summaries hold only the symbol code, which both products provide
+COMPACT_PATHS = {
+    *(
+        ("instant", "details", field)
+        for field in (
+            "air_pressure_at_sea_level",
+            "air_temperature",
+            "cloud_area_fraction",
+            "relative_humidity",
+            "wind_from_direction",
+            "wind_speed",
+        )
+    ),
+    *(
+        path
+        for period in ("next_1_hours", "next_6_hours", "next_12_hours")
+        for path in ((period, "summary"), (period, "summary", "symbol_code"))
+    ),
+    ("next_1_hours", "details", "precipitation_amount"),
+    ("next_6_hours", "details", "precipitation_amount"),
+}
+# steps lacking these are kept with None for the field rather than left out, as MET
+# only gives them for some steps and regions
+OPTIONAL_PATHS = {tuple(key) for key in UNCERTAINTY_KEYS}
+# forecasts already fetched for a point within this distance are reused
+DEFAULT_REUSE_RADIUS_KM = 0.5
 
 
 def fetch_and_filter_forecast(
-    selected_location: dict, time_series: List[datetime]
+    selected_location: dict,
+    time_series: List[datetime],
+    keys: List[str | List[str]] = FORECAST_KEYS,
+    reuse_radius_km: float = DEFAULT_REUSE_RADIUS_KM,
 ) -> Dict[datetime, dict]:
-    forecast: METJSONForecast = get_location_forecast(
-        lat=float(selected_location["lat"]), lon=float(selected_location["lon"])
-    )
-    filtered_forecast_timesteps = filter_location_forecast(
-        forecast,
-        time_series,
-        keys=[
-            ["next_6_hours", "summary", "symbol_code"],
-            ["instant", "details", "air_temperature"],
-            ["next_6_hours", "details", "precipitation_amount"],
-            ["instant", "details", "wind_speed"],
-            ["instant", "details", "wind_from_direction"],
-            ["instant", "details", "cloud_area_fraction"],
-        ],
-    )
+    lat, lon, steps = fetch_forecast_steps(selected_location, keys, reuse_radius_km)
+    filtered_forecast_timesteps = select_forecast_steps(steps, time_series)
+    # lets views mark night hours
+    (daylight,) = is_daylight_batch([(lat, lon)], list(filtered_forecast_timesteps))
+    for values, is_day in zip(filtered_forecast_timesteps.values(), daylight):
+        values["is_day"] = is_day
     return filtered_forecast_timesteps
 
 
+def fetch_forecast_steps(
+    selected_location: dict,
+    keys: List[str | List[str]] = FORECAST_KEYS,
+    reuse_radius_km: float = DEFAULT_REUSE_RADIUS_KM,
+) -> Tuple[float, float, ParsedSteps]:
+    """
+    Every step of the forecast for a location filtered for ``keys``, with the point it
+    was fetched for.
+    """
+    lat, lon = float(selected_location["lat"]), float(selected_location["lon"])
+    nearby_forecast_points = get_nearby_forecast_points(lat, lon, reuse_radius_km)
+    if nearby_forecast_points:
+        # snap to the nearest point already fetched so that its cached forecast is used
+        _, lat, lon = nearby_forecast_points[0]
+    product = select_product(keys)
+    steps = None
+    version = get_fresh_forecast_version(lat, lon, product)
+    if version:
+        product, updated_at = version
+        # a model run already filtered for these keys needn't be decoded again
+        steps = get_parsed_forecast(lat, lon, product, keys, updated_at)
+    if steps is None:
+        forecast: METJSONForecast = get_location_forecast(
+            lat=lat, lon=lon, product=product
+        )
+        steps = parse_forecast_steps(forecast, keys)
+        store_parsed_forecast(
+            lat, lon, product, keys, forecast["properties"]["meta"]["updated_at"], steps
+        )
+    cache_forecast_point(lat, lon)
+    return lat, lon, steps
+
+
+def select_product(keys: List[str | List[str]]) -> Literal["compact", "complete"]:
+    """
+    >>> select_product(FORECAST_KEYS)
+    'compact'
+    >>> select_product(FORECAST_KEYS + [["instant", "details", "wind_speed_of_gust"]])
+    'complete'
+    >>> select_product([["next_1_hours", "summary"]])
+    'compact'
+    >>> select_product([["instant", "details"]])
+    'complete'
+    >>> select_product([[DERIVED, "gust_beaufort"]])
+    'complete'
+    >>> select_product([["next_12_hours", "details", "precipitation_amount"]])
+    'complete'
+    """
+    paths = {tuple(key) if isinstance(key, list) else (key,) for key in keys}
+    # derived metrics need the fields they are computed from
+    for name in derived_names(keys):
+        paths = paths - {(DERIVED, name)} | {
+            ("instant", "details", field) for field in DERIVED_INPUTS[name]
+        }
+    return "compact" if paths <= COMPACT_PATHS else "complete"
+
+
 def filter_location_forecast(
     location_forecast: METJSONForecast,
     times: List[datetime],
     keys: Dict[str, str | Dict[str, dict]],
 ):
+    names = derived_names(keys)
+    if names:
+        location_forecast = add_derived_metrics(location_forecast, names)
     filter_start_index = 0
     timeseries: List[ForecastTimeStep] = location_forecast["properties"]["timeseries"]
     filtered_results: Dict[str, Dict[str, str]] = dict()
@@ -51,6 +150,47 @@ def filter_location_forecast(
     return filtered_results
 
 
+def parse_forecast_steps(
+    location_forecast: METJSONForecast, keys: List[str | List[str]]
+) -> ParsedSteps:
+    """
+    The values at ``keys`` of every step of a forecast, keyed by its UTC timestamp.
+    Steps missing any of the keys, such as the last steps of six-hourly summaries, are
+    left out, unless the key is in ``OPTIONAL_PATHS``.
+    """
+    names = derived_names(keys)
+    if names:
+        location_forecast = add_derived_metrics(location_forecast, names)
+    steps = {}
+    for forecast_timestep in location_forecast["properties"]["timeseries"]:
+        try:
+            steps[forecast_timestep["time"]] = nested_lookup(
+                forecast_timestep["data"], keys
+            )
+        except KeyError:
+            continue
+    return steps
+
+
+def select_forecast_steps(
+    steps: ParsedSteps, times: List[datetime]
+) -> Dict[datetime, dict]:
+    """
+    >>> steps = {"2024-06-21T12:00:00Z": {"air_temperature": 14.2}}
+    >>> time = datetime(2024, 6, 21, 11, 40, tzinfo=timezone.utc)
+    >>> select_forecast_steps(steps, [time])[time]
+    {'air_temperature': 14.2}
+    """
+    filtered_results = {}
+    for time in times:
+        utc_timestamp = _to_utc_timestamp(_to_nearest_hour(time))
+        if utc_timestamp not in steps:
+            raise ValueError(f"Time {utc_timestamp} not found")
+        # copied, as callers add their own values to steps
+        filtered_results[time] = dict(steps[utc_timestamp])
+    return filtered_results
+
+
 def get_nested_value(data: dict, keys: List[str]) -> dict | str:
     """
     >>> data = {"a": {"b": {"c": "d"}}, "e": "f"}
@@ -77,11 +217,38 @@ def nested_lookup(data: dict, lookup: List[str | List[str]]) -> dict:
         for key_lookup in lookup
     ]
     return {
-        lookup_list[-1]: get_nested_value(data, lookup_list)
+        lookup_list[-1]: get_step_value(data, lookup_list)
         for lookup_list in lookup_lists
     }
 
 
+def get_step_value(data: dict, keys: List[str]) -> dict | str | float | None:
+    """
+    ``get_nested_value``, reading the paths in ``UNCERTAINTY_FALLBACKS`` where a step
+    lacks the key path, and giving None where it lacks one in ``OPTIONAL_PATHS``.
+
+    >>> thunder = ["next_1_hours", "details", "probability_of_thunder"]
+    >>> get_step_value({"next_6_hours": {"details": {"probability_of_thunder": 1.2}}}, thunder)
+    1.2
+    >>> get_step_value({}, thunder) is None
+    True
+    >>> get_step_value({}, ["instant", "details", "air_temperature"])
+    Traceback (most recent call last):
+    KeyError: 'instant'
+    """
+    try:
+        return get_nested_value(data, keys)
+    except KeyError:
+        for fallback in UNCERTAINTY_FALLBACKS.get(tuple(keys), []):
+            try:
+                return get_nested_value(data, fallback)
+            except KeyError:
+                continue
+        if tuple(keys) in OPTIONAL_PATHS:
+            return None
+        raise
+
+
 def _to_utc_timestamp(time: datetime) -> str:
     """
     >>> _to_utc_timestamp(datetime(2023, 5, 15, 14, 30, 0, tzinfo=timezone.utc))
@@ -0,0 +1,233 @@
+"""
+Metrics derived from the instant details of a forecast.
+
+Select them like any other field with a ``["derived", <name>]`` key. They are computed
+column by column over a whole timeseries: each input is pulled out of the nested
+timesteps once and every metric is a single pass over those columns.
+"""
+
+import math
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from .type import METJSONForecast
+
+DERIVED = "derived"
+# instant details each metric is computed from
+DERIVED_INPUTS = {
+    "apparent_temperature": ("air_temperature", "relative_humidity", "wind_speed"),
+    "wind_chill": ("air_temperature", "wind_speed"),
+    "heat_index": ("air_temperature", "relative_humidity"),
+    "dew_point": ("air_temperature", "relative_humidity"),
+    "dew_point_comfort": ("air_temperature", "relative_humidity"),
+    "beaufort": ("wind_speed",),
+    "gust_beaufort": ("wind_speed_of_gust",),
+}
+# upper wind speed bound in m/s of Beaufort forces 0 to 11
+BEAUFORT_LIMITS = [0.5, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7]
+# upper dew point bound in °C of each comfort level but the last
+DEW_POINT_COMFORT_LIMITS = [10.0, 13.0, 16.0, 18.0, 21.0, 24.0]
+DEW_POINT_COMFORT_LEVELS = (
+    "dry",
+    "comfortable",
+    "slightly humid",
+    "humid",
+    "muggy",
+    "oppressive",
+    "miserable",
+)
+
+Column = List[Optional[float]]
+
+
+def derived_names(keys: List[str | List[str]]) -> List[str]:
+    """
+    >>> derived_names(["air_temperature", ["derived", "wind_chill"]])
+    ['wind_chill']
+    """
+    return [
+        key[-1]
+        for key in keys
+        if isinstance(key, list) and len(key) == 2 and key[0] == DERIVED
+    ]
+
+
+def add_derived_metrics(forecast: METJSONForecast, names: List[str]) -> METJSONForecast:
+    """
+    A copy of ``forecast`` with the metrics ``names`` under ``data["derived"]`` of every
+    timestep. Metrics whose inputs are missing from a timestep are None.
+    """
+    timeseries = forecast["properties"]["timeseries"]
+    columns = derive_metrics(
+        [timestep["data"]["instant"]["details"] for timestep in timeseries], names
+    )
+    derived_timeseries = [
+        {
+            **timestep,
+            "data": {
+                **timestep["data"],
+                DERIVED: {name: columns[name][index] for name in names},
+            },
+        }
+        for index, timestep in enumerate(timeseries)
+    ]
+    return {
+        **forecast,
+        "properties": {**forecast["properties"], "timeseries": derived_timeseries},
+    }
+
+
+def derive_metrics(details: List[dict], names: List[str]) -> Dict[str, Column]:
+    """
+    >>> derive_metrics(
+    ...     [{"air_temperature": -5.0, "relative_humidity": 80.0, "wind_speed": 8.0}],
+    ...     ["wind_chill", "beaufort", "gust_beaufort"],
+    ... )
+    {'wind_chill': [-12.8], 'beaufort': [5], 'gust_beaufort': [None]}
+    """
+    inputs = {field for name in names for field in DERIVED_INPUTS[name]}
+    columns = {field: [detail.get(field) for detail in details] for field in inputs}
+    return {
+        name: _METRICS[name](*(columns[field] for field in DERIVED_INPUTS[name]))
+        for name in names
+    }
+
+
+def apparent_temperature(
+    temperature: Column, humidity: Column, wind_speed: Column
+) -> Column:
+    """
+    Steadman's apparent temperature for shade, as used by the Australian Bureau of
+    Meteorology.
+
+    >>> apparent_temperature([30.0, 10.0, None], [50.0, 90.0, 50.0], [2.0, 10.0, 1.0])
+    [31.6, 2.6, None]
+    """
+    return [
+        (
+            round(
+                t
+                + 0.33 * rh / 100 * 6.105 * math.exp(17.27 * t / (237.7 + t))
+                - 0.7 * ws
+                - 4.0,
+                1,
+            )
+            if None not in (t, rh, ws)
+            else None
+        )
+        for t, rh, ws in zip(temperature, humidity, wind_speed)
+    ]
+
+
+def wind_chill(temperature: Column, wind_speed: Column) -> Column:
+    """
+    The wind chill index, or the air temperature where it is not defined: above 10°C or
+    for winds below 4.8 km/h.
+
+    >>> wind_chill([-10.0, 5.0, 15.0, 0.0], [5.0, 1.0, 10.0, None])
+    [-17.4, 5.0, 15.0, None]
+    """
+    chills = []
+    for t, ws in zip(temperature, wind_speed):
+        if t is None or ws is None:
+            chills.append(None)
+            continue
+        wind_kmh = ws * 3.6
+        if t > 10 or wind_kmh < 4.8:
+            chills.append(t)
+            continue
+        wind_factor = wind_kmh**0.16
+        chills.append(
+            round(
+                13.12 + 0.6215 * t - 11.37 * wind_factor + 0.3965 * t * wind_factor, 1
+            )
+        )
+    return chills
+
+
+def heat_index(temperature: Column, humidity: Column) -> Column:
+    """
+    The US National Weather Service heat index, using the Rothfusz regression and its
+    adjustments above 80°F.
+
+    >>> heat_index([32.0, 20.0, 40.0, None], [70.0, 50.0, 10.0, 50.0])
+    [40.4, 19.4, 36.7, None]
+    """
+    indices = []
+    for t, rh in zip(temperature, humidity):
+        if t is None or rh is None:
+            indices.append(None)
+            continue
+        f = t * 9 / 5 + 32
+        index = 0.5 * (f + 61.0 + (f - 68.0) * 1.2 + rh * 0.094)
+        if (index + f) / 2 >= 80:
+            index = (
+                -42.379
+                + 2.04901523 * f
+                + 10.14333127 * rh
+                - 0.22475541 * f * rh
+                - 0.00683783 * f * f
+                - 0.05481717 * rh * rh
+                + 0.00122874 * f * f * rh
+                + 0.00085282 * f * rh * rh
+                - 0.00000199 * f * f * rh * rh
+            )
+            if rh < 13 and 80 <= f <= 112:
+                index -= (13 - rh) / 4 * math.sqrt((17 - abs(f - 95)) / 17)
+            elif rh > 85 and 80 <= f <= 87:
+                index += (rh - 85) / 10 * (87 - f) / 5
+        indices.append(round((index - 32) * 5 / 9, 1))
+    return indices
+
+
+def dew_point(temperature: Column, humidity: Column) -> Column:
+    """
+    The dew point from the Magnus formula, with the Alduchov and Eskridge constants.
+
+    >>> dew_point([20.0, -5.0, 20.0, None], [50.0, 90.0, 0.0, 50.0])
+    [9.3, -6.4, None, None]
+    """
+    dew_points = []
+    for t, rh in zip(temperature, humidity):
+        if t is None or not rh:
+            dew_points.append(None)
+            continue
+        gamma = math.log(rh / 100) + 17.625 * t / (243.04 + t)
+        dew_points.append(round(243.04 * gamma / (17.625 - gamma), 1))
+    return dew_points
+
+
+def dew_point_comfort(temperature: Column, humidity: Column) -> Column:
+    """
+    How muggy the air feels, as an index into ``DEW_POINT_COMFORT_LEVELS``.
+
+    >>> levels = dew_point_comfort([20.0, 28.0, 30.0], [50.0, 60.0, 80.0])
+    >>> [DEW_POINT_COMFORT_LEVELS[level] for level in levels]
+    ['dry', 'muggy', 'miserable']
+    """
+    return [
+        bisect_right(DEW_POINT_COMFORT_LIMITS, td) if td is not None else None
+        for td in dew_point(temperature, humidity)
+    ]
+
+
+def beaufort(wind_speed: Column) -> Column:
+    """
+    >>> beaufort([0.2, 3.4, 12.0, 40.0, None])
+    [0, 3, 6, 12, None]
+    """
+    return [
+        bisect_right(BEAUFORT_LIMITS, ws) if ws is not None else None
+        for ws in wind_speed
+    ]
+
+
+_METRICS = {
+    "apparent_temperature": apparent_temperature,
+    "wind_chill": wind_chill,
+    "heat_index": heat_index,
+    "dew_point": dew_point,
+    "dew_point_comfort": dew_point_comfort,
+    "beaufort": beaufort,
+    "gust_beaufort": beaufort,
+}
@@ -0,0 +1,204 @@
+"""
+Forecast steps as filtered by ``fetch_and_filter_forecast``, kept in memory and on disk
+so that repeated commands for a location skip decoding and filtering its forecast until
+the next model run.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..db import (
+    CappedTable,
+    create_size_total,
+    evict,
+    get_size_total,
+    migrate,
+    seed_size_total,
+    touch,
+    use_wal,
+)
+
+PARSED_FORECAST_DB = Path.home() / ".yr_cli_parsed_forecasts.sqlite"
+# forecasts kept parsed in memory, least recently used first
+MAX_MEMOISED_PARSED_FORECASTS = 64
+# parsed steps kept on disk, beyond which the least recently read are evicted
+MAX_PARSED_FORECAST_BYTES = 64 * 1024 * 1024
+SCHEMA_VERSION = 1
+PARSED_FORECASTS_TABLE = CappedTable(
+    "parsed_forecasts", "parsed_size", ("lat", "lon", "product", "keys")
+)
+
+ParsedSteps = Dict[str, dict]
+
+_parsed_forecasts: "OrderedDict[Tuple[float, float, str, str, str], ParsedSteps]" = (
+    OrderedDict()
+)
+# forecasts for several locations are fetched from threads
+_parsed_forecasts_lock = threading.Lock()
+
+
+def init_db():
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        use_wal(conn)
+        migrate(conn, SCHEMA_VERSION, _migrate)
+        _create_tables(conn)
+
+
+def _create_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS parsed_forecasts (
+            lat REAL,
+            lon REAL,
+            product TEXT,
+            keys TEXT,
+            updated_at TEXT,
+            steps JSON,
+            size INTEGER,
+            accessed_at REAL,
+            PRIMARY KEY (lat, lon, product, keys)
+        )
+    """
+    )
+    create_size_total(conn, PARSED_FORECASTS_TABLE)
+
+
+def _migrate(conn: sqlite3.Connection, version: int):
+    if version < 1:
+        # steps parsed before their sizes were recorded are parsed again when next read
+        conn.execute("DROP TABLE IF EXISTS parsed_forecasts")
+        _create_tables(conn)
+        seed_size_total(conn, PARSED_FORECASTS_TABLE)
+
+
+def get_parsed_forecast(
+    lat: float,
+    lon: float,
+    product: str,
+    keys: List[str | List[str]],
+    updated_at: str,
+) -> Optional[ParsedSteps]:
+    """Steps filtered for ``keys`` from the model run ``updated_at``, keyed by time."""
+    key = (lat, lon, product, _keys_signature(keys), updated_at)
+    with _parsed_forecasts_lock:
+        if key in _parsed_forecasts:
+            _parsed_forecasts.move_to_end(key)
+            return _parsed_forecasts[key]
+    init_db()
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        row = conn.execute(
+            "SELECT steps, accessed_at FROM parsed_forecasts WHERE lat = ? "
+            "AND lon = ? AND product = ? AND keys = ? AND updated_at = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        touch(conn, PARSED_FORECASTS_TABLE, key[:4], row[1])
+    steps = json.loads(row[0])
+    _memoise(key, steps)
+    return steps
+
+
+def get_parsed_forecasts(
+    keys: List[str | List[str]],
+    versions: Iterable[Tuple[float, float, str, str]],
+) -> Dict[Tuple[float, float, str], ParsedSteps]:
+    """
+    Steps filtered for ``keys`` of many (lat, lon, product, updated_at) model runs over a
+    single connection, keyed by (lat, lon, product). Runs not kept are left out, and
+    those found aren't memoised, as there can be more than fit in memory.
+    """
+    signature = _keys_signature(keys)
+    init_db()
+    parsed_forecasts = {}
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        for lat, lon, product, updated_at in versions:
+            row = conn.execute(
+                "SELECT steps, accessed_at FROM parsed_forecasts WHERE lat = ? "
+                "AND lon = ? AND product = ? AND keys = ? AND updated_at = ?",
+                (lat, lon, product, signature, updated_at),
+            ).fetchone()
+            if row is None:
+                continue
+            touch(conn, PARSED_FORECASTS_TABLE, (lat, lon, product, signature), row[1])
+            parsed_forecasts[(lat, lon, product)] = json.loads(row[0])
+    return parsed_forecasts
+
+
+def store_parsed_forecast(
+    lat: float,
+    lon: float,
+    product: str,
+    keys: List[str | List[str]],
+    updated_at: str,
+    steps: ParsedSteps,
+):
+    """Keep ``steps``, replacing those parsed from earlier model runs."""
+    _memoise((lat, lon, product, _keys_signature(keys), updated_at), steps)
+    store_parsed_forecasts(keys, [(lat, lon, product, updated_at, steps)])
+
+
+def store_parsed_forecasts(
+    keys: List[str | List[str]],
+    forecasts: Iterable[Tuple[float, float, str, str, ParsedSteps]],
+):
+    """
+    Keep the steps filtered for ``keys`` of many (lat, lon, product, updated_at, steps)
+    model runs in one transaction.
+    """
+    signature = _keys_signature(keys)
+    now = time.time()
+    rows = []
+    for lat, lon, product, updated_at, steps in forecasts:
+        body = json.dumps(steps, separators=(",", ":"))
+        rows.append((lat, lon, product, signature, updated_at, body, len(body), now))
+    if not rows:
+        return
+    init_db()
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        conn.executemany(
+            "INSERT INTO parsed_forecasts "
+            "(lat, lon, product, keys, updated_at, steps, size, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (lat, lon, product, keys) DO UPDATE SET "
+            "updated_at = excluded.updated_at, steps = excluded.steps, "
+            "size = excluded.size, accessed_at = excluded.accessed_at",
+            rows,
+        )
+        evict(conn, PARSED_FORECASTS_TABLE, MAX_PARSED_FORECAST_BYTES)
+
+
+def clear_parsed_forecasts() -> bool:
+    init_db()
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        conn.execute("DELETE FROM parsed_forecasts")
+    with _parsed_forecasts_lock:
+        _parsed_forecasts.clear()
+    return True
+
+
+def get_parsed_forecasts_size() -> int:
+    init_db()
+    with sqlite3.connect(PARSED_FORECAST_DB) as conn:
+        return get_size_total(conn, PARSED_FORECASTS_TABLE)
+
+
+def _keys_signature(keys: List[str | List[str]]) -> str:
+    """
+    >>> _keys_signature(["a", ["b", "c"]])
+    '["a",["b","c"]]'
+    """
+    return json.dumps(keys, separators=(",", ":"))
+
+
+def _memoise(key: Tuple[float, float, str, str, str], steps: ParsedSteps):
+    with _parsed_forecasts_lock:
+        _parsed_forecasts[key] = steps
+        _parsed_forecasts.move_to_end(key)
+        while len(_parsed_forecasts) > MAX_MEMOISED_PARSED_FORECASTS:
+            _parsed_forecasts.popitem(last=False)
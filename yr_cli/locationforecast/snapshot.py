@@ -0,0 +1,270 @@
+"""
+Fixed-layout binary snapshots of filtered forecasts for many locations.
+
+Worker processes ``mmap`` the same snapshot file, so values are shared between
+processes and read without copying or parsing. All sections are 8-byte aligned and
+little-endian::
+
+    header     magic, version, counts and section offsets
+    fields     name and kind of each field, 40 bytes each
+    index      location key, lat, lon and step range, sorted by key, 64 bytes each
+    times      int64 UTC epoch seconds of every step, grouped by location
+    values     one float64 array per field, parallel to times
+
+Symbol codes are stored as their position in ``WeatherSymbol`` and missing values as
+NaN.
+"""
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, get_args
+
+from .data import _to_nearest_hour, get_step_value
+from .derived import add_derived_metrics, derived_names
+from .type import METJSONForecast, WeatherSymbol
+
+MAGIC = b"YRSNAP\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQQQQ")
+FIELD = struct.Struct("<32sB7x")
+INDEX = struct.Struct("<32sddQQ")
+FIELD_FLOAT, FIELD_SYMBOL = 0, 1
+SYMBOLS: Tuple[str, ...] = get_args(WeatherSymbol)
+_SYMBOL_INDEX = {symbol: index for index, symbol in enumerate(SYMBOLS)}
+
+
+def location_key(lat: float, lon: float) -> str:
+    """
+    >>> location_key(-33.93213, 18.8602)
+    '-33.9321,18.8602'
+    """
+    return f"{lat:.4f},{lon:.4f}"
+
+
+def write_snapshot(
+    path: str,
+    forecasts: Iterable[Tuple[float, float, METJSONForecast]],
+    keys: List[str | List[str]],
+) -> int:
+    """
+    Write every timestep of each ``(lat, lon, forecast)`` to a snapshot at ``path``,
+    keeping the fields selected by ``keys`` as in ``filter_location_forecast``, and
+    return the number of locations written. ``forecasts`` is consumed one at a time,
+    keeping only its encoded values, and a later forecast for a location replaces an
+    earlier one.
+    """
+    key_paths = [key if isinstance(key, list) else [key] for key in keys]
+    names = [key_path[-1] for key_path in key_paths]
+    kinds = [FIELD_SYMBOL if name == "symbol_code" else FIELD_FLOAT for name in names]
+    derived = derived_names(keys)
+
+    locations: Dict[bytes, Tuple[float, float, array, List[array]]] = {}
+    for lat, lon, forecast in forecasts:
+        if derived:
+            forecast = add_derived_metrics(forecast, derived)
+        timeseries = forecast["properties"]["timeseries"]
+        locations[location_key(lat, lon).encode()] = (
+            lat,
+            lon,
+            array(
+                "q",
+                (
+                    int(datetime.fromisoformat(timestep["time"]).timestamp())
+                    for timestep in timeseries
+                ),
+            ),
+            [
+                array(
+                    "d",
+                    (
+                        _encode_value(timestep["data"], key_path, kind)
+                        for timestep in timeseries
+                    ),
+                )
+                for key_path, kind in zip(key_paths, kinds)
+            ],
+        )
+
+    keys_in_order = sorted(locations)
+    index_entries = []
+    step_count = 0
+    for key in keys_in_order:
+        lat, lon, times, _ = locations[key]
+        index_entries.append(INDEX.pack(key, lat, lon, step_count, len(times)))
+        step_count += len(times)
+
+    fields_offset = HEADER.size
+    index_offset = fields_offset + FIELD.size * len(names)
+    times_offset = index_offset + INDEX.size * len(index_entries)
+    values_offset = times_offset + 8 * step_count
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(index_entries),
+                len(names),
+                step_count,
+                fields_offset,
+                index_offset,
+                times_offset,
+                values_offset,
+            )
+        )
+        for name, kind in zip(names, kinds):
+            f.write(FIELD.pack(name.encode(), kind))
+        f.writelines(index_entries)
+        # sections are written a location at a time rather than joined in memory
+        for key in keys_in_order:
+            f.write(_little_endian(locations[key][2]))
+        for field_index in range(len(names)):
+            for key in keys_in_order:
+                f.write(_little_endian(locations[key][3][field_index]))
+    return len(index_entries)
+
+
+class ForecastSnapshot:
+    """Read-only view of a snapshot file written by ``write_snapshot``."""
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise RuntimeError(
+                "Forecast snapshots can only be read on little-endian hosts"
+            )
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.location_count,
+            field_count,
+            step_count,
+            fields_offset,
+            self._index_offset,
+            times_offset,
+            values_offset,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} forecast snapshot")
+        self.fields: List[Tuple[str, int]] = []
+        for field_index in range(field_count):
+            name, kind = FIELD.unpack_from(
+                self._mmap, fields_offset + field_index * FIELD.size
+            )
+            self.fields.append((name.rstrip(b"\x00").decode(), kind))
+        self._view = view = memoryview(self._mmap)
+        self._times = view[times_offset:values_offset].cast("q")
+        field_bytes = 8 * step_count
+        self._values = [
+            view[
+                values_offset
+                + field_index * field_bytes : values_offset
+                + (field_index + 1) * field_bytes
+            ].cast("d")
+            for field_index in range(field_count)
+        ]
+
+    def close(self):
+        self._times.release()
+        for field_values in self._values:
+            field_values.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def locations(self) -> List[Tuple[str, float, float]]:
+        entries = (
+            self._index_entry(position) for position in range(self.location_count)
+        )
+        return [
+            (key.rstrip(b"\x00").decode(), lat, lon) for key, lat, lon, _, _ in entries
+        ]
+
+    def get_values(self, lat: float, lon: float, time: datetime) -> Optional[dict]:
+        """Fields at the forecast step nearest ``time``, or None if not in the snapshot."""
+        steps = self._find_steps(location_key(lat, lon))
+        if steps is None:
+            return None
+        start, stop = steps
+        timestamp = int(_to_nearest_hour(time).timestamp())
+        position = bisect_left(self._times, timestamp, start, stop)
+        if position == stop or self._times[position] != timestamp:
+            return None
+        return self._row(position)
+
+    def filter(
+        self, lat: float, lon: float, times: List[datetime]
+    ) -> Dict[datetime, dict]:
+        """The equivalent of ``filter_location_forecast`` over the snapshot."""
+        filtered_results = {}
+        for time in times:
+            values = self.get_values(lat, lon, time)
+            if values is None:
+                raise ValueError(f"Time {time} not found")
+            filtered_results[time] = values
+        return filtered_results
+
+    def _find_steps(self, key: str) -> Optional[Tuple[int, int]]:
+        encoded_key = key.encode().ljust(32, b"\x00")
+        low, high = 0, self.location_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < encoded_key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.location_count:
+            return None
+        entry_key, _, _, start, count = self._index_entry(low)
+        return (start, start + count) if entry_key == encoded_key else None
+
+    def _index_entry(self, position: int) -> tuple:
+        return INDEX.unpack_from(self._mmap, self._index_offset + position * INDEX.size)
+
+    def _row(self, position: int) -> dict:
+        row = {}
+        for (name, kind), field_values in zip(self.fields, self._values):
+            value = field_values[position]
+            if kind == FIELD_SYMBOL:
+                value = None if math.isnan(value) else SYMBOLS[int(value)]
+            row[name] = value
+        return row
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _encode_value(data: dict, key_path: List[str], kind: int) -> float:
+    """
+    >>> _encode_value({"a": {"b": 1.5}}, ["a", "b"], FIELD_FLOAT)
+    1.5
+    >>> _encode_value({"a": {}}, ["a", "b"], FIELD_FLOAT)
+    nan
+    >>> _encode_value({"a": None}, ["a"], FIELD_FLOAT)
+    nan
+    >>> _encode_value({"s": "fog"}, ["s"], FIELD_SYMBOL) == SYMBOLS.index("fog")
+    True
+    """
+    try:
+        value = get_step_value(data, key_path)
+    except (KeyError, TypeError):
+        return math.nan
+    if value is None:
+        return math.nan
+    if kind == FIELD_SYMBOL:
+        return float(_SYMBOL_INDEX.get(value, math.nan))
+    return float(value)
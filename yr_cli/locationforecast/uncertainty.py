@@ -0,0 +1,101 @@
+"""
+How certain a forecast is, from fields of the complete product: the likely range of
+precipitation, the probabilities of precipitation and thunder, and the 10th and 90th
+percentiles of air temperature. Select ``UNCERTAINTY_KEYS`` alongside other keys so that
+they're filtered in the same pass.
+"""
+
+from typing import List, Optional, TypedDict
+
+UNCERTAINTY_KEYS = [
+    ["next_6_hours", "details", "precipitation_amount_min"],
+    ["next_6_hours", "details", "precipitation_amount_max"],
+    ["next_6_hours", "details", "probability_of_precipitation"],
+    ["next_1_hours", "details", "probability_of_thunder"],
+    ["instant", "details", "air_temperature_percentile_10"],
+    ["instant", "details", "air_temperature_percentile_90"],
+]
+UNCERTAINTY_FIELDS = [key[-1] for key in UNCERTAINTY_KEYS]
+# read where a step lacks the key path, as the six-hourly steps at the end of a forecast
+# have no next_1_hours, and in some regions MET gives thunder over six hours instead
+UNCERTAINTY_FALLBACKS = {
+    ("next_1_hours", "details", "probability_of_thunder"): [
+        ["next_6_hours", "details", "probability_of_thunder"]
+    ],
+}
+SPARKLINE_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+class UncertaintySummary(TypedDict):
+    # the lowest 10th and highest 90th percentile
+    air_temperature_percentile_10: Optional[float]
+    air_temperature_percentile_90: Optional[float]
+    # the range of the wettest six hours
+    precipitation_amount_min: Optional[float]
+    precipitation_amount_max: Optional[float]
+    # the highest probabilities, in %
+    probability_of_precipitation: Optional[float]
+    probability_of_thunder: Optional[float]
+
+
+def has_uncertainty(data: dict) -> bool:
+    return any(data.get(field) is not None for field in UNCERTAINTY_FIELDS)
+
+
+def uncertainty_values(steps: List[dict], field: str) -> List[float]:
+    """
+    The values of a field through steps, skipping those the forecast doesn't give.
+
+    >>> uncertainty_values([{"probability_of_thunder": 2.3}, {}], "probability_of_thunder")
+    [2.3]
+    """
+    return [data[field] for data in steps if data.get(field) is not None]
+
+
+def summarise_uncertainty(steps: List[dict]) -> Optional[UncertaintySummary]:
+    """
+    Uncertainty over filtered forecast steps, such as those of a day, or None if they
+    weren't filtered for it. A field is None where no step gives it.
+
+    >>> summary = summarise_uncertainty([
+    ...     {"precipitation_amount_min": 0.1, "precipitation_amount_max": 0.7,
+    ...      "probability_of_precipitation": 6.9, "probability_of_thunder": 2.3,
+    ...      "air_temperature_percentile_10": 18.5, "air_temperature_percentile_90": 20.8},
+    ...     {"precipitation_amount_min": 1.1, "precipitation_amount_max": 5.2,
+    ...      "probability_of_precipitation": 85.9, "probability_of_thunder": None,
+    ...      "air_temperature_percentile_10": 9.1, "air_temperature_percentile_90": 13.4},
+    ... ])
+    >>> summary["air_temperature_percentile_10"], summary["probability_of_thunder"]
+    (9.1, 2.3)
+    >>> summarise_uncertainty([{"air_temperature_percentile_10": 9.1}])["probability_of_thunder"]
+    >>> summarise_uncertainty([{"air_temperature": 14.0}]) is None
+    True
+    """
+    steps = [data for data in steps if has_uncertainty(data)]
+    if not steps:
+        return None
+
+    def aggregate(field: str, function) -> Optional[float]:
+        values = uncertainty_values(steps, field)
+        return function(values) if values else None
+
+    return UncertaintySummary(
+        air_temperature_percentile_10=aggregate("air_temperature_percentile_10", min),
+        air_temperature_percentile_90=aggregate("air_temperature_percentile_90", max),
+        precipitation_amount_min=aggregate("precipitation_amount_min", max),
+        precipitation_amount_max=aggregate("precipitation_amount_max", max),
+        probability_of_precipitation=aggregate("probability_of_precipitation", max),
+        probability_of_thunder=aggregate("probability_of_thunder", max),
+    )
+
+
+def sparkline(values: List[float], maximum: float = 100.0) -> str:
+    """
+    >>> sparkline([0, 25, 50, 100])
+    '▁▃▅█'
+    """
+    top = len(SPARKLINE_BLOCKS) - 1
+    return "".join(
+        SPARKLINE_BLOCKS[max(0, min(top, round(value / maximum * top)))]
+        for value in values
+    )
@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from ..api import get_nowcast
+from .type import METJSONNowcast
+
+# how long a command will wait for the nowcast once it has the forecast
+NOWCAST_GRACE_SECONDS = 0.25
+# south, west, north and east bounds of the Nordic radar area that nowcasts cover
+NOWCAST_AREA = (53.0, 2.0, 72.0, 33.0)
+
+
+def fetch_nowcast_in_background(
+    selected_location: dict, grace_seconds: float = NOWCAST_GRACE_SECONDS
+) -> Callable[[], Optional[METJSONNowcast]]:
+    """
+    Start fetching the nowcast and return a function giving it if it arrives within
+    ``grace_seconds`` of the function being called, so that the grace starts once the
+    command has its forecast rather than counting the time spent fetching that.
+    Nowcasts are only available for the Nordic area and are best-effort, so any failure
+    or delay gives ``None``. Locations outside that area give ``None`` without fetching
+    or waiting.
+    """
+    if not in_nowcast_area(
+        float(selected_location["lat"]), float(selected_location["lon"])
+    ):
+        return lambda: None
+
+    future: Future = Future()
+
+    def fetch():
+        try:
+            future.set_result(
+                get_nowcast(
+                    lat=float(selected_location["lat"]),
+                    lon=float(selected_location["lon"]),
+                )
+            )
+        except Exception as e:
+            future.set_exception(e)
+
+    def get_result() -> Optional[METJSONNowcast]:
+        try:
+            return future.result(timeout=grace_seconds)
+        except Exception:
+            return None
+
+    # a daemon thread so that a slow nowcast never holds up the process exiting; one
+    # arriving within the grace is in the nowcast cache for the next few minutes
+    threading.Thread(target=fetch, daemon=True).start()
+    return get_result
+
+
+def in_nowcast_area(lat: float, lon: float) -> bool:
+    """
+    >>> in_nowcast_area(59.9133, 10.7389)
+    True
+    >>> in_nowcast_area(-33.9321, 18.8602)
+    False
+    """
+    south, west, north, east = NOWCAST_AREA
+    return south <= lat <= north and west <= lon <= east
+
+
+def merge_nowcast(
+    forecast_timesteps: Dict[datetime, dict], nowcast: Optional[METJSONNowcast]
+) -> Dict[datetime, dict]:
+    """
+    Add the precipitation for the hour implied by the nowcast's five-minute rates as
+    ``nowcast_precipitation_amount`` to forecast rows covered by the nowcast. The
+    forecast's ``precipitation_amount`` is kept, as it may be for more than an hour.
+
+    >>> from datetime import timezone
+    >>> nowcast = {"properties": {"meta": {"radar_coverage": "ok"}, "timeseries": [
+    ...     {"time": f"2024-01-01T10:{minute:0>2}:00Z",
+    ...      "data": {"instant": {"details": {"precipitation_rate": 1.2}}}}
+    ...     for minute in range(0, 60, 5)
+    ... ]}}
+    >>> forecast = {
+    ...     datetime(2024, 1, 1, 10, tzinfo=timezone.utc): {"precipitation_amount": 3.0},
+    ...     datetime(2024, 1, 1, 11, tzinfo=timezone.utc): {"precipitation_amount": 0.5},
+    ... }
+    >>> [row.get("nowcast_precipitation_amount")
+    ...  for row in merge_nowcast(forecast, nowcast).values()]
+    [1.2, None]
+    >>> nowcast["properties"]["meta"]["radar_coverage"] = "temporarily unavailable"
+    >>> merge_nowcast(forecast, nowcast) == forecast
+    True
+    """
+    if not nowcast or nowcast["properties"]["meta"].get("radar_coverage") != "ok":
+        return forecast_timesteps
+    rates = [
+        (
+            datetime.fromisoformat(timestep["time"]),
+            timestep["data"]["instant"]["details"].get("precipitation_rate"),
+        )
+        for timestep in nowcast["properties"]["timeseries"]
+    ]
+    merged = dict(forecast_timesteps)
+    for forecast_time, data in forecast_timesteps.items():
+        hour_rates = [
+            rate
+            for time, rate in rates
+            if forecast_time <= time < forecast_time + timedelta(hours=1)
+            and rate is not None
+        ]
+        if hour_rates:
+            # mean rate over the covered part of the hour, as an hourly amount
+            amount = round(sum(hour_rates) / len(hour_rates), 1)
+            merged[forecast_time] = {**data, "nowcast_precipitation_amount": amount}
+    return merged
@@ -0,0 +1,68 @@
+"""https://api.met.no/weatherapi/nowcast/2.0/swagger"""
+
+from typing import List, Literal, Optional, TypedDict
+
+from ..locationforecast.type import PointGeometry, WeatherSymbol
+
+
+class NowcastUnits(TypedDict, total=False):
+    air_temperature: str
+    precipitation_amount: str
+    precipitation_rate: str
+    relative_humidity: str
+    wind_from_direction: str
+    wind_speed: str
+    wind_speed_of_gust: str
+
+
+class NowcastTimeInstant(TypedDict, total=False):
+    air_temperature: float
+    precipitation_rate: float
+    relative_humidity: float
+    wind_from_direction: float
+    wind_speed: float
+    wind_speed_of_gust: float
+
+
+class NowcastTimePeriod(TypedDict, total=False):
+    precipitation_amount: float
+
+
+class NowcastSummary(TypedDict):
+    symbol_code: WeatherSymbol
+
+
+class NowcastTimeStepInstant(TypedDict):
+    details: NowcastTimeInstant
+
+
+class NowcastTimeStepNext1Hours(TypedDict):
+    summary: NowcastSummary
+    details: NowcastTimePeriod
+
+
+class NowcastTimeStepData(TypedDict):
+    instant: NowcastTimeStepInstant
+    next_1_hours: Optional[NowcastTimeStepNext1Hours]
+
+
+class NowcastTimeStep(TypedDict):
+    time: str
+    data: NowcastTimeStepData
+
+
+class NowcastMeta(TypedDict):
+    updated_at: str
+    units: NowcastUnits
+    radar_coverage: Literal["ok", "temporarily unavailable", "not available"]
+
+
+class Nowcast(TypedDict):
+    meta: NowcastMeta
+    timeseries: List[NowcastTimeStep]
+
+
+class METJSONNowcast(TypedDict):
+    type: Literal["Feature"]
+    geometry: PointGeometry
+    properties: Nowcast
@@ -0,0 +1,207 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.parse import urlparse
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RetryError
+
+RATE_LIMIT_DB = Path.home() / ".yr_cli_ratelimit.sqlite"
+# requests per second allowed by each upstream's usage policy
+HOST_RATES = {
+    "nominatim.openstreetmap.org": 1.0,
+    "api.met.no": 20.0,
+}
+DEFAULT_RATE = 10.0
+# the lowest fraction of its allowed rate a host is backed off to after throttling
+MIN_RATE_FRACTION = 1 / 16
+THROTTLED_STATUS_CODES = {429, 503}
+MAX_RETRIES = 3
+# longer waits, such as a Retry-After of minutes, fail rather than hang the command
+MAX_WAIT_SECONDS = 30.0
+
+_host_locks = defaultdict(threading.Lock)
+
+
+def init_db():
+    with _connect() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                rate REAL,
+                tokens REAL,
+                updated_at REAL,
+                blocked_until REAL DEFAULT 0,
+                requests INTEGER DEFAULT 0,
+                throttled INTEGER DEFAULT 0,
+                wait_seconds REAL DEFAULT 0
+            )
+        """
+        )
+
+
+def acquire(host: str, max_wait: float = MAX_WAIT_SECONDS) -> float:
+    """
+    Block until the token bucket for ``host`` allows a request and return the time
+    waited. Buckets are rows in a SQLite database, so the limit holds across threads and
+    across processes on the same machine. Raises ``RetryError`` without waiting if the
+    request would be held for more than ``max_wait`` seconds in total.
+    """
+    init_db()
+    waited = 0.0
+    with _host_locks[host]:
+        while True:
+            with _connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rate, tokens, updated_at, blocked_until = _get_bucket(conn, host)
+                now = time.time()
+                # a bucket holds at most one second's worth of requests
+                tokens = min(max(rate, 1.0), tokens + (now - updated_at) * rate)
+                if blocked_until <= now and tokens >= 1:
+                    conn.execute(
+                        "UPDATE buckets SET tokens = ?, updated_at = ?, "
+                        "requests = requests + 1, wait_seconds = wait_seconds + ? "
+                        "WHERE host = ?",
+                        (tokens - 1, now, waited, host),
+                    )
+                    return waited
+                conn.execute(
+                    "UPDATE buckets SET tokens = ?, updated_at = ? WHERE host = ?",
+                    (tokens, now, host),
+                )
+            wait = max(blocked_until - now, (1 - tokens) / rate, 0.0)
+            if waited + wait > max_wait:
+                raise RetryError(
+                    f"{host} asked for requests to wait {wait:.0f}s, "
+                    f"more than the {max_wait:.0f}s allowed"
+                )
+            time.sleep(wait)
+            waited += wait
+
+
+def record_response(host: str, response: Response):
+    """Adapt the rate for ``host``: halve it when throttled, recover it gradually."""
+    init_db()
+    max_rate = HOST_RATES.get(host, DEFAULT_RATE)
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rate, _, _, blocked_until = _get_bucket(conn, host)
+        if response.status_code in THROTTLED_STATUS_CODES:
+            now = time.time()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"), now)
+            conn.execute(
+                "UPDATE buckets SET rate = ?, tokens = 0, updated_at = ?, "
+                "blocked_until = ?, throttled = throttled + 1 WHERE host = ?",
+                (
+                    max(rate / 2, max_rate * MIN_RATE_FRACTION),
+                    now,
+                    max(blocked_until, now + (retry_after or 1 / rate)),
+                    host,
+                ),
+            )
+        elif rate < max_rate:
+            conn.execute(
+                "UPDATE buckets SET rate = ? WHERE host = ?",
+                (min(max_rate, rate + max_rate * MIN_RATE_FRACTION), host),
+            )
+
+
+def get_rate_limit_stats() -> List[dict]:
+    init_db()
+    with _connect() as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT host, rate, requests, throttled, wait_seconds, blocked_until "
+            "FROM buckets ORDER BY host"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header, given as seconds or an HTTP date.
+
+    >>> parse_retry_after("120", 0)
+    120.0
+    >>> parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", 30)
+    30.0
+    >>> parse_retry_after("soon", 0) is None
+    True
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    Transport adapter that paces requests per host and retries throttled responses.
+    Mounted on a ``CachedSession`` it only sees requests that miss the cache.
+    """
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        host = urlparse(request.url).hostname
+        for attempt in range(MAX_RETRIES + 1):
+            acquire(host)
+            response = super().send(request, **kwargs)
+            record_response(host, response)
+            if (
+                response.status_code not in THROTTLED_STATUS_CODES
+                or attempt == MAX_RETRIES
+            ):
+                return response
+            response.close()
+        return response
+
+
+def mount_rate_limiter(session: Session) -> Session:
+    adapter = RateLimitedAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """A connection that commits or rolls back on leaving, and is then closed."""
+    # autocommit mode, so that transactions are only opened with BEGIN IMMEDIATE
+    conn = sqlite3.connect(RATE_LIMIT_DB, timeout=30, isolation_level=None)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _get_bucket(conn: sqlite3.Connection, host: str) -> tuple:
+    row = conn.execute(
+        "SELECT rate, tokens, updated_at, blocked_until FROM buckets WHERE host = ?",
+        (host,),
+    ).fetchone()
+    if row:
+        return row
+    rate = HOST_RATES.get(host, DEFAULT_RATE)
+    now = time.time()
+    conn.execute(
+        "INSERT INTO buckets (host, rate, tokens, updated_at) VALUES (?, ?, ?, ?)",
+        (host, rate, max(rate, 1.0), now),
+    )
+    return rate, max(rate, 1.0), now, 0.0
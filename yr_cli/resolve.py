@@ -0,0 +1,166 @@
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Literal, NamedTuple, Optional, Tuple
+
+from .api import get_openstreetmap_locations
+from .cache import cache_location, get_cached_location, get_cached_locations
+
+PickPolicy = Literal["prompt", "best", "first"]
+PICK_POLICIES = ("prompt", "best", "first")
+# policies that choose without asking, for commands resolving several locations
+UNATTENDED_PICK_POLICIES = ("best", "first")
+# the best candidate is only picked when it leads the next by this fraction of its score
+DEFAULT_MIN_CONFIDENCE = 0.25
+RANK_WEIGHTS = {"importance": 0.4, "type": 0.25, "population": 0.15, "name": 0.2}
+PLACE_TYPE_WEIGHTS = {
+    "city": 1.0,
+    "town": 0.8,
+    "village": 0.6,
+    "suburb": 0.5,
+    "administrative": 0.5,
+    "hamlet": 0.4,
+}
+OTHER_PLACE_TYPE_WEIGHT = 0.2
+# populations of this size or more get the full population weight
+MAX_RANKED_POPULATION = 10_000_000
+MAX_RESOLVE_WORKERS = 8
+
+
+class Resolution(NamedTuple):
+    query: str
+    location: Optional[dict]
+    confidence: float
+
+
+def default_pick_policy() -> PickPolicy:
+    return "prompt" if sys.stdin.isatty() else "best"
+
+
+def rank_locations(query: str, locations: List[dict]) -> List[Tuple[float, dict]]:
+    """
+    Score candidate locations by importance, place type, population and how well their
+    name matches ``query``, best first.
+
+    >>> ranked = rank_locations("springs", [
+    ...     {"name": "Springs Road", "type": "residential", "importance": 0.1},
+    ...     {"name": "Springs", "type": "town", "importance": 0.45,
+    ...      "extratags": {"population": "186394"}},
+    ... ])
+    >>> [(round(score, 3), location["name"]) for score, location in ranked]
+    [(0.693, 'Springs'), (0.19, 'Springs Road')]
+    """
+    return sorted(
+        ((_score_location(query, location), location) for location in locations),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+
+def pick_location(
+    query: str,
+    locations: List[dict],
+    policy: PickPolicy = "best",
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+) -> Resolution:
+    """
+    Choose between search results without prompting. With the ``best`` policy the
+    confidence is the lead of the best ranked candidate over the next, as a fraction
+    of its score, and no location is picked below ``min_confidence``.
+
+    >>> candidates = [
+    ...     {"name": "Paarl", "type": "town", "importance": 0.5},
+    ...     {"name": "Paarl", "type": "town", "importance": 0.48},
+    ... ]
+    >>> pick_location("paarl", candidates).location is None
+    True
+    >>> pick_location("paarl", candidates, "first").location["importance"]
+    0.5
+    """
+    if policy not in UNATTENDED_PICK_POLICIES:
+        raise ValueError(f"Pick policy {policy!r} can't be used without prompting")
+    if not locations:
+        return Resolution(query, None, 0.0)
+    if policy == "first" or len(locations) == 1:
+        return Resolution(query, locations[0], 1.0)
+    (best_score, best), (next_score, _) = rank_locations(query, locations)[:2]
+    confidence = (best_score - next_score) / best_score if best_score else 0.0
+    return Resolution(query, best if confidence >= min_confidence else None, confidence)
+
+
+def resolve_location(
+    query: str,
+    limit: int,
+    country_code: str,
+    policy: PickPolicy = "best",
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    no_cache: bool = False,
+) -> Resolution:
+    """Resolve ``query`` without prompting, caching the pick."""
+    if not no_cache:
+        cached_location = get_cached_location(query)
+        if cached_location:
+            return Resolution(query, cached_location, 1.0)
+    locations = get_openstreetmap_locations(query, limit, country_code)
+    resolution = pick_location(query, locations, policy, min_confidence)
+    if resolution.location and not no_cache:
+        cache_location(query, resolution.location)
+    return resolution
+
+
+def resolve_locations(
+    queries: List[str],
+    limit: int,
+    country_code: str,
+    policy: PickPolicy = "best",
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    no_cache: bool = False,
+    max_workers: int = MAX_RESOLVE_WORKERS,
+) -> List[Resolution]:
+    """
+    Resolve many queries concurrently, in order. Cached queries are looked up together
+    and searches for the rest are still paced by the Nominatim rate limit.
+    """
+    cached_locations = {} if no_cache else get_cached_locations(queries)
+    uncached_queries = [
+        query for query in dict.fromkeys(queries) if query not in cached_locations
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        searched = dict(
+            zip(
+                uncached_queries,
+                executor.map(
+                    lambda query: resolve_location(
+                        query, limit, country_code, policy, min_confidence, no_cache
+                    ),
+                    uncached_queries,
+                ),
+            )
+        )
+    return [
+        (
+            Resolution(query, cached_locations[query], 1.0)
+            if query in cached_locations
+            else searched[query]
+        )
+        for query in queries
+    ]
+
+
+def _score_location(query: str, location: dict) -> float:
+    place_type = location.get("type") or location.get("addresstype")
+    try:
+        population = float((location.get("extratags") or {}).get("population"))
+    except (TypeError, ValueError):
+        population = 0.0
+    name = location.get("name", "").casefold()
+    query = query.strip().casefold()
+    components = {
+        "importance": float(location.get("importance") or 0.0),
+        "type": PLACE_TYPE_WEIGHTS.get(place_type, OTHER_PLACE_TYPE_WEIGHT),
+        "population": min(
+            1.0, math.log10(population + 1) / math.log10(MAX_RANKED_POPULATION)
+        ),
+        "name": 1.0 if name == query else 0.5 if name.startswith(query) else 0.0,
+    }
+    return sum(RANK_WEIGHTS[key] * value for key, value in components.items())
@@ -0,0 +1,248 @@
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .db import (
+    CappedTable,
+    create_size_total,
+    evict,
+    get_size_total,
+    migrate,
+    seed_size_total,
+    touch,
+    use_wal,
+)
+from .locationforecast.type import METJSONForecast
+
+FORECAST_STORE_DB = Path.home() / ".yr_cli_forecasts.sqlite"
+# least recently read forecasts are evicted once compressed bodies exceed this size
+MAX_STORE_BYTES = 256 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+SCHEMA_VERSION = 1
+FORECASTS_TABLE = CappedTable("forecasts", "store_size", ("lat", "lon", "product"))
+# the requests-cache database forecasts were cached in before this store, which is
+# left in place for users to remove, or removed by clear-cache
+LEGACY_CACHE_PATH = Path.home() / ".met_cache.sqlite"
+
+_units_by_id = {}
+
+
+class StoredForecast(NamedTuple):
+    forecast: METJSONForecast
+    updated_at: str
+    expires: float
+    last_modified: Optional[str]
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires > time.time()
+
+
+def init_db():
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        use_wal(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                id INTEGER PRIMARY KEY,
+                units JSON UNIQUE
+            )
+        """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS forecasts (
+                lat REAL,
+                lon REAL,
+                product TEXT,
+                updated_at TEXT,
+                expires REAL,
+                last_modified TEXT,
+                units_id INTEGER REFERENCES units (id),
+                body BLOB,
+                size INTEGER,
+                accessed_at REAL,
+                PRIMARY KEY (lat, lon, product)
+            )
+        """
+        )
+        create_size_total(conn, FORECASTS_TABLE)
+        migrate(conn, SCHEMA_VERSION, _migrate)
+
+
+def _migrate(conn: sqlite3.Connection, version: int):
+    if version < 1:
+        seed_size_total(conn, FORECASTS_TABLE)
+
+
+def get_stored_forecast(
+    lat: float, lon: float, product: str
+) -> Optional[StoredForecast]:
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        row = conn.execute(
+            "SELECT updated_at, expires, last_modified, units_id, body, accessed_at "
+            "FROM forecasts WHERE lat = ? AND lon = ? AND product = ?",
+            (lat, lon, product),
+        ).fetchone()
+        if row is None:
+            return None
+        updated_at, expires, last_modified, units_id, body, accessed_at = row
+        touch(conn, FORECASTS_TABLE, (lat, lon, product), accessed_at)
+        forecast = json.loads(zlib.decompress(body))
+        forecast["properties"]["meta"]["units"] = _get_units(conn, units_id)
+    return StoredForecast(forecast, updated_at, expires, last_modified)
+
+
+def get_stored_version(
+    lat: float, lon: float, product: str
+) -> Optional[Tuple[str, float]]:
+    """The model run (``updated_at``) and expiry of a stored forecast, without its body."""
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        return conn.execute(
+            "SELECT updated_at, expires FROM forecasts "
+            "WHERE lat = ? AND lon = ? AND product = ?",
+            (lat, lon, product),
+        ).fetchone()
+
+
+def store_forecast(
+    lat: float,
+    lon: float,
+    product: str,
+    forecast: METJSONForecast,
+    expires: float,
+    last_modified: Optional[str],
+):
+    init_db()
+    meta = forecast["properties"]["meta"]
+    # units are the same for every response of a product, so are stored once
+    units = json.dumps(meta["units"], sort_keys=True)
+    stripped = {
+        **forecast,
+        "properties": {
+            **forecast["properties"],
+            "meta": {key: value for key, value in meta.items() if key != "units"},
+        },
+    }
+    body = zlib.compress(
+        json.dumps(stripped, separators=(",", ":")).encode(), COMPRESSION_LEVEL
+    )
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        conn.execute("INSERT OR IGNORE INTO units (units) VALUES (?)", (units,))
+        (units_id,) = conn.execute(
+            "SELECT id FROM units WHERE units = ?", (units,)
+        ).fetchone()
+        conn.execute(
+            "INSERT INTO forecasts (lat, lon, product, updated_at, expires, "
+            "last_modified, units_id, body, size, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (lat, lon, product) DO UPDATE SET "
+            "updated_at = excluded.updated_at, expires = excluded.expires, "
+            "last_modified = excluded.last_modified, units_id = excluded.units_id, "
+            "body = excluded.body, size = excluded.size, "
+            "accessed_at = excluded.accessed_at",
+            (
+                lat,
+                lon,
+                product,
+                meta["updated_at"],
+                expires,
+                last_modified,
+                units_id,
+                body,
+                len(body),
+                time.time(),
+            ),
+        )
+        evict(conn, FORECASTS_TABLE, MAX_STORE_BYTES)
+
+
+def refresh_stored_forecast(lat: float, lon: float, product: str, expires: float):
+    """Extend the expiry of a stored forecast after the server reports it unchanged."""
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        conn.execute(
+            "UPDATE forecasts SET expires = ? WHERE lat = ? AND lon = ? AND product = ?",
+            (expires, lat, lon, product),
+        )
+
+
+def iter_stored_forecasts(
+    product: str,
+) -> Iterator[Tuple[float, float, METJSONForecast]]:
+    """Every unexpired stored forecast of ``product`` as (lat, lon, forecast)."""
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        rows = conn.execute(
+            "SELECT lat, lon, units_id, body FROM forecasts "
+            "WHERE product = ? AND expires > ?",
+            (product, time.time()),
+        )
+        for lat, lon, units_id, body in rows:
+            forecast = json.loads(zlib.decompress(body))
+            forecast["properties"]["meta"]["units"] = _get_units(conn, units_id)
+            yield lat, lon, forecast
+
+
+def get_stored_versions() -> Dict[Tuple[float, float], Tuple[str, str]]:
+    """
+    The product and model run (``updated_at``) of the unexpired forecast stored for
+    every point, preferring the complete product where both are stored.
+    """
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        rows = conn.execute(
+            "SELECT lat, lon, product, updated_at FROM forecasts WHERE expires > ? "
+            "ORDER BY product = 'complete'",
+            (time.time(),),
+        ).fetchall()
+    return {(lat, lon): (product, updated_at) for lat, lon, product, updated_at in rows}
+
+
+def iter_stored_forecasts_by_key(
+    keys: Iterable[Tuple[float, float, str]],
+) -> Iterator[Tuple[Tuple[float, float, str], StoredForecast]]:
+    """
+    Stored forecasts for many (lat, lon, product) keys over a single connection, parsed
+    one at a time as they are consumed.
+    """
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        for key in keys:
+            row = conn.execute(
+                "SELECT updated_at, expires, last_modified, units_id, body "
+                "FROM forecasts WHERE lat = ? AND lon = ? AND product = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                continue
+            updated_at, expires, last_modified, units_id, body = row
+            forecast = json.loads(zlib.decompress(body))
+            forecast["properties"]["meta"]["units"] = _get_units(conn, units_id)
+            yield key, StoredForecast(forecast, updated_at, expires, last_modified)
+
+
+def get_store_size() -> int:
+    init_db()
+    with sqlite3.connect(FORECAST_STORE_DB) as conn:
+        return get_size_total(conn, FORECASTS_TABLE)
+
+
+def clear_legacy_cache() -> bool:
+    LEGACY_CACHE_PATH.unlink(missing_ok=True)
+    return True
+
+
+def _get_units(conn: sqlite3.Connection, units_id: int) -> dict:
+    key = (FORECAST_STORE_DB, units_id)
+    if key not in _units_by_id:
+        (units,) = conn.execute(
+            "SELECT units FROM units WHERE id = ?", (units_id,)
+        ).fetchone()
+        _units_by_id[key] = json.loads(units)
+    return dict(_units_by_id[key])
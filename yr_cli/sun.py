@@ -0,0 +1,215 @@
+"""
+Sunrise and sunset from the NOAA sunrise equation, computed locally rather than with
+MET's sunrise API. Results are memoised per grid cell and UTC date, since sunrise
+moves by under a minute across a cell.
+"""
+
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Literal, NamedTuple, Optional, Sequence, Tuple
+
+# size in degrees of the grid cells that share sun times
+SUN_GRID_DEGREES = 0.1
+# the sun's centre is this far below the horizon at sunrise, allowing for refraction
+SUNRISE_ELEVATION = -0.833
+J2000 = datetime(2000, 1, 1, 12, tzinfo=timezone.utc)
+OBLIQUITY = 23.4397
+# the memo is cleared when it holds this many cell-days
+MAX_MEMOISED_SUN_TIMES = 100_000
+# solar noon can fall on the previous or next UTC date far from Greenwich
+DAY_OFFSETS = (-1, 0, 1)
+
+
+class SunTimes(NamedTuple):
+    sunrise: Optional[datetime]
+    sunset: Optional[datetime]
+    # set on days the sun doesn't rise or set
+    polar: Optional[Literal["day", "night"]]
+
+
+_sun_times_memo: Dict[Tuple[float, float, date], SunTimes] = {}
+
+
+def get_sun_times(lat: float, lon: float, day: date) -> SunTimes:
+    """
+    UTC sunrise and sunset for the solar noon falling on ``day`` in UTC.
+
+    >>> sun = get_sun_times(-33.9249, 18.4241, date(2024, 6, 21))
+    >>> sun.sunrise.strftime("%H:%M"), sun.sunset.strftime("%H:%M")
+    ('05:51', '15:44')
+    >>> get_sun_times(69.6492, 18.9553, date(2024, 6, 21)).polar
+    'day'
+    >>> get_sun_times(69.6492, 18.9553, date(2024, 12, 21)).polar
+    'night'
+    """
+    return _get_cell_sun_times(*_grid_cell(lat, lon), day)
+
+
+def get_sun_times_batch(
+    points: Iterable[Tuple[float, float]], day: date
+) -> List[SunTimes]:
+    """
+    Sun times on ``day`` for many points, computing each uncached grid cell once in a
+    single pass over columns of cell coordinates.
+    """
+    cells = [_grid_cell(lat, lon) for lat, lon in points]
+    cached: Dict[Tuple[float, float], SunTimes] = {}
+    missing = []
+    for cell in dict.fromkeys(cells):
+        sun_times = _sun_times_memo.get((*cell, day))
+        if sun_times is None:
+            missing.append(cell)
+        else:
+            cached[cell] = sun_times
+    computed = _compute_sun_times(
+        [lat for lat, _ in missing], [lon for _, lon in missing], day
+    )
+    for cell, sun_times in zip(missing, computed):
+        _memoise((*cell, day), sun_times)
+        cached[cell] = sun_times
+    return [cached[cell] for cell in cells]
+
+
+def is_daylight(lat: float, lon: float, time: datetime) -> bool:
+    """
+    >>> is_daylight(-33.9249, 18.4241, datetime(2024, 6, 21, 12, tzinfo=timezone.utc))
+    True
+    >>> is_daylight(-33.9249, 18.4241, datetime(2024, 6, 21, 20, tzinfo=timezone.utc))
+    False
+    """
+    utc_time = time.astimezone(timezone.utc)
+    return _is_daylight(
+        utc_time,
+        [
+            get_sun_times(lat, lon, utc_time.date() + timedelta(days=offset))
+            for offset in DAY_OFFSETS
+        ],
+    )
+
+
+def is_daylight_batch(
+    points: Sequence[Tuple[float, float]], times: Sequence[datetime]
+) -> List[List[bool]]:
+    """
+    ``is_daylight`` for each point at each of ``times``, computing the sun times of
+    every day once for all points with ``get_sun_times_batch``.
+
+    >>> noon, night = (datetime(2024, 6, 21, hour, tzinfo=timezone.utc) for hour in (12, 20))
+    >>> is_daylight_batch([(-33.9249, 18.4241), (69.6492, 18.9553)], [noon, night])
+    [[True, False], [True, True]]
+    """
+    utc_times = [time.astimezone(timezone.utc) for time in times]
+    days = {
+        utc_time.date() + timedelta(days=offset)
+        for utc_time in utc_times
+        for offset in DAY_OFFSETS
+    }
+    sun_times_by_day = {day: get_sun_times_batch(points, day) for day in sorted(days)}
+    return [
+        [
+            _is_daylight(
+                utc_time,
+                [
+                    sun_times_by_day[utc_time.date() + timedelta(days=offset)][point]
+                    for offset in DAY_OFFSETS
+                ],
+            )
+            for utc_time in utc_times
+        ]
+        for point in range(len(points))
+    ]
+
+
+def _is_daylight(utc_time: datetime, sun_times: List[SunTimes]) -> bool:
+    """Whether the sun is up, given the sun times of the days in ``DAY_OFFSETS``."""
+    for day_sun_times in sun_times:
+        if (
+            day_sun_times.sunrise
+            and day_sun_times.sunrise <= utc_time < day_sun_times.sunset
+        ):
+            return True
+    return sun_times[DAY_OFFSETS.index(0)].polar == "day"
+
+
+def _grid_cell(lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Centre of the grid cell containing a point.
+
+    >>> _grid_cell(-33.9249, 18.4241)
+    (-33.95, 18.45)
+    """
+    return tuple(
+        round((math.floor(value / SUN_GRID_DEGREES) + 0.5) * SUN_GRID_DEGREES, 6)
+        for value in (lat, lon)
+    )
+
+
+def _get_cell_sun_times(lat: float, lon: float, day: date) -> SunTimes:
+    key = (lat, lon, day)
+    if key not in _sun_times_memo:
+        (sun_times,) = _compute_sun_times([lat], [lon], day)
+        _memoise(key, sun_times)
+    return _sun_times_memo[key]
+
+
+def _memoise(key: Tuple[float, float, date], sun_times: SunTimes):
+    if len(_sun_times_memo) >= MAX_MEMOISED_SUN_TIMES:
+        _sun_times_memo.clear()
+    _sun_times_memo[key] = sun_times
+
+
+def _compute_sun_times(
+    lats: List[float], lons: List[float], day: date
+) -> List[SunTimes]:
+    days_since_j2000 = (day - J2000.date()).days
+    # mean solar time of solar noon at each longitude
+    mean_noons = [days_since_j2000 - lon / 360 for lon in lons]
+    anomalies = [
+        math.radians((357.5291 + 0.98560028 * noon) % 360) for noon in mean_noons
+    ]
+    ecliptic_longitudes = [
+        math.radians(
+            (
+                math.degrees(anomaly)
+                + 1.9148 * math.sin(anomaly)
+                + 0.02 * math.sin(2 * anomaly)
+                + 0.0003 * math.sin(3 * anomaly)
+                + 180
+                + 102.9372
+            )
+            % 360
+        )
+        for anomaly in anomalies
+    ]
+    transits = [
+        noon + 0.0053 * math.sin(anomaly) - 0.0069 * math.sin(2 * ecliptic_longitude)
+        for noon, anomaly, ecliptic_longitude in zip(
+            mean_noons, anomalies, ecliptic_longitudes
+        )
+    ]
+    declination_sines = [
+        math.sin(ecliptic_longitude) * math.sin(math.radians(OBLIQUITY))
+        for ecliptic_longitude in ecliptic_longitudes
+    ]
+    sun_times = []
+    for lat, transit, declination_sine in zip(lats, transits, declination_sines):
+        latitude = math.radians(lat)
+        declination_cosine = math.sqrt(1 - declination_sine**2)
+        hour_angle_cosine = (
+            math.sin(math.radians(SUNRISE_ELEVATION))
+            - math.sin(latitude) * declination_sine
+        ) / (math.cos(latitude) * declination_cosine)
+        if hour_angle_cosine > 1:
+            sun_times.append(SunTimes(None, None, "night"))
+        elif hour_angle_cosine < -1:
+            sun_times.append(SunTimes(None, None, "day"))
+        else:
+            half_day = math.degrees(math.acos(hour_angle_cosine)) / 360
+            sun_times.append(
+                SunTimes(
+                    J2000 + timedelta(days=transit - half_day),
+                    J2000 + timedelta(days=transit + half_day),
+                    None,
+                )
+            )
+    return sun_times
@@ -1,9 +1,58 @@
 import os
+import struct
+import sys
+from typing import Tuple
+
+try:
+    import fcntl
+    import termios
+except ImportError:
+    # not available on Windows
+    fcntl = termios = None
+
+# pixel width and height of a terminal cell when the terminal doesn't report it
+DEFAULT_CELL_SIZE = (10, 20)
+GRAPHICS_OUTPUT_METHODS = ("iterm2", "kitty", "sixel")
+# TERM prefixes of terminals known to display sixel graphics
+SIXEL_TERMS = ("foot", "mlterm", "contour", "yaft")
 
 
 def is_iterm2():
     return "ITERM_SESSION_ID" in os.environ
 
 
+def is_kitty():
+    return os.environ.get("TERM") == "xterm-kitty" or "KITTY_WINDOW_ID" in os.environ
+
+
+def is_sixel():
+    return os.environ.get("TERM", "").startswith(SIXEL_TERMS)
+
+
 def get_output_method():
-    return "iterm2" if is_iterm2() else "rich"
+    if not sys.stdout.isatty():
+        return "plain"
+    if is_iterm2():
+        return "iterm2"
+    if is_kitty():
+        return "kitty"
+    if is_sixel():
+        return "sixel"
+    return "rich"
+
+
+def get_cell_size() -> Tuple[int, int]:
+    """Pixel width and height of a cell of the terminal on stdout."""
+    if fcntl is None:
+        return DEFAULT_CELL_SIZE
+    try:
+        rows, columns, width, height = struct.unpack(
+            "HHHH",
+            fcntl.ioctl(sys.stdout.fileno(), termios.TIOCGWINSZ, bytes(8)),
+        )
+    except (OSError, ValueError):
+        return DEFAULT_CELL_SIZE
+    # terminals that don't report their size in pixels leave it as zero
+    if not (rows and columns and width and height):
+        return DEFAULT_CELL_SIZE
+    return width // columns, height // rows